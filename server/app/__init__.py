@@ -5,16 +5,25 @@ from app.routes.project_routes import project_bp
 from app.routes.video_routes import video_bp
 from app.routes.playlist_routes import playlist_bp
 from app.routes.admin_project_routes import admin_project_bp
+from app.routes.search_routes import search_bp
+from app.routes.health_routes import health_bp
+from app.routes.metrics_routes import metrics_bp
 from app.errors.handlers import register_error_handlers
+from app.utils.metrics import init_metrics
 import os
 
 
 def create_app():
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object('config.Config')
-    CORS(app, origins=["https://learn-tech-brown.vercel.app"], supports_credentials=True)
-
-    # Initialize MongoDB
+    CORS(
+        app,
+        origins=["https://learn-tech-brown.vercel.app"],
+        supports_credentials=True,
+        expose_headers=["X-Next-After", "Link"]
+    )
+
+    # Configure MongoDB; the client connects lazily on first use
     init_mongo(app)
 
     # Register blueprints
@@ -22,13 +31,24 @@ def create_app():
     app.register_blueprint(video_bp)
     app.register_blueprint(playlist_bp)
     app.register_blueprint(admin_project_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(metrics_bp)
+
+    # Per-route latency, status and size metrics, served on /metrics
+    init_metrics(app)
 
     # Register error handlers
     register_error_handlers(app)
 
     # Register CLI commands
-    from app.commands.ingest_and_summarize import ingest_and_summarize_command
+    from app.commands.ingest_and_summarize import ingest_and_summarize_command, ingest_worker_command
     app.cli.add_command(ingest_and_summarize_command)
+    app.cli.add_command(ingest_worker_command)
+    from app.commands.embed_videos import embed_videos_command
+    app.cli.add_command(embed_videos_command)
+    from app.commands.sync_indexes import sync_indexes_command
+    app.cli.add_command(sync_indexes_command)
 
     @app.route('/')
     def home():
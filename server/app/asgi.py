@@ -0,0 +1,42 @@
+from quart import Quart
+from quart_cors import cors
+from app.utils.mongo import init_mongo
+from app.routes.async_routes import project_bp, video_bp, playlist_bp, admin_project_bp
+
+
+def create_async_app():
+    """Optional async serving mode: the catalogue and admin blueprints as
+    async views on PyMongo's async client, for an ASGI server such as
+    hypercorn. Search, export, related videos and /healthz stay on the sync
+    app (create_app), which remains the default.
+    """
+    app = Quart(__name__, instance_relative_config=True)
+    app.config.from_object('config.Config')
+    app = cors(
+        app,
+        allow_origin="https://learn-tech-brown.vercel.app",
+        allow_credentials=True,
+        expose_headers=["X-Next-After", "Link"]
+    )
+
+    # Same settings as sync mode; the async client connects lazily on first use
+    init_mongo(app)
+
+    app.register_blueprint(project_bp)
+    app.register_blueprint(video_bp)
+    app.register_blueprint(playlist_bp)
+    app.register_blueprint(admin_project_bp)
+
+    @app.errorhandler(404)
+    async def not_found(error):
+        return {"error": "Not found"}, 404
+
+    @app.errorhandler(500)
+    async def internal_error(error):
+        return {"error": "Internal server error"}, 500
+
+    @app.route('/')
+    async def home():
+        return {"message": "GENAI Backend is running!"}
+
+    return app
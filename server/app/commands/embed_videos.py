@@ -0,0 +1,32 @@
+import click
+from flask.cli import with_appcontext
+from pymongo import UpdateOne
+from app.utils.mongo import get_videos_collection
+from app.utils.bulk import BulkWriter
+from app.utils.cache import bump_version
+from app.utils.embeddings import get_embedder, embed_video
+
+
+def embed_missing_videos(batch_size=100):
+    """Embed summarized videos that have no vector from the current model yet."""
+    model = get_embedder()[0]
+    videos = get_videos_collection()
+    query = {"summary": {"$exists": True, "$ne": ""}, "embedding_model": {"$ne": model}}
+    writer = BulkWriter(videos, batch_size)
+    count = 0
+    for video in videos.find(query, {"title": 1, "summary": 1}):
+        # updated_at moves, stamped on write, so running servers pick the vector up incrementally
+        writer.add(UpdateOne({"_id": video["_id"]}, {"$set": embed_video(video), "$currentDate": {"updated_at": True}}))
+        count += 1
+    writer.flush()
+    if count:
+        bump_version("videos")
+    print(f"Embedded {count} video(s) with {model}.")
+    return count
+
+@click.command('embed_videos')
+@click.option('--batch-size', default=100, show_default=True, help='Videos per bulk write.')
+@with_appcontext
+def embed_videos_command(batch_size):
+    """Backfill related-video embeddings for already summarized videos."""
+    embed_missing_videos(batch_size)
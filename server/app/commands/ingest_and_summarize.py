@@ -1,25 +1,136 @@
 import click
 from flask.cli import with_appcontext
 import os
-from app.utils.mongo import get_videos_collection, get_playlists_collection
+from app.utils.mongo import (
+    get_videos_collection,
+    get_playlists_collection,
+    get_llm_cache_collection,
+    get_ingest_jobs_collection,
+    get_api_usage_collection
+)
+from app.utils.pipeline import Stage, Pipeline
+from app.utils.bulk import BulkWriter
+from app.utils.cache import bump_version
+from app.utils.llm_cache import LLMCache
+from app.utils.chunking import count_tokens, iter_transcript_chunks
+from app.utils.embeddings import embed_video
+from app.utils.quota import QuotaLedger, PRIORITIES, estimate_video_cost, plan_jobs
+from app.utils.recorder import Recorder, youtube_key, transcript_key, gemini_key
+from app.utils.metrics import REGISTRY, stage_latency, stage_items, api_calls, api_latency, api_wait
+from app.utils.job_queue import (
+    JobQueue,
+    ACTIVE_STATES,
+    PENDING,
+    DETAILS_FETCHED,
+    TRANSCRIBED,
+    CHUNKS_SUMMARIZED,
+    DONE,
+    SKIPPED,
+    FAILED
+)
+from app.utils.rate_limiter import RateLimiter, RetryableError, QuotaExceededError, NotModified, parse_retry_after
+from pymongo import UpdateOne
 from youtube_transcript_api import YouTubeTranscriptApi
 import requests
 from dotenv import load_dotenv
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+import json
 import logging
+import socket
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
-import math
 import isodate
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # --- CONFIG ---
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1/models/gemini-1.5-flash:generateContent"
+GEMINI_API_URL = os.getenv("GEMINI_API_URL", "https://generativelanguage.googleapis.com/v1/models/gemini-1.5-flash:generateContent")
+# Point the YouTube and transcript clients elsewhere, e.g. at benchmarks/fake_apis.py
+YOUTUBE_API_ENDPOINT = os.getenv("YOUTUBE_API_ENDPOINT")
+TRANSCRIPT_API_URL = os.getenv("TRANSCRIPT_API_URL")
+# Append every YouTube, transcript and Gemini exchange to this cassette for offline replay
+INGEST_RECORD_FILE = os.getenv("INGEST_RECORD_FILE")
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 3000))
+# Tokens of trailing transcript repeated at the start of the next chunk
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 100))
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", 2))
 MIN_VIDEO_DURATION_SEC = 30
+VIDEO_TYPES = {"concept", "project"}
+# Titles classified per Gemini call, and tags sent along with each title
+CLASSIFY_BATCH_SIZE = int(os.getenv("CLASSIFY_BATCH_SIZE", 25))
+CLASSIFY_MAX_TAGS = 5
+# videos.list accepts at most 50 ids per call
+YOUTUBE_MAX_IDS = 50
+# Number of worker threads per pipeline stage
+INGEST_CONCURRENCY = {
+    "playlists": int(os.getenv("INGEST_PLAYLIST_WORKERS", 2)),
+    "details": int(os.getenv("INGEST_DETAILS_WORKERS", 4)),
+    "classify": int(os.getenv("INGEST_CLASSIFY_WORKERS", 2)),
+    "transcript": int(os.getenv("INGEST_TRANSCRIPT_WORKERS", 4)),
+    "summarize": int(os.getenv("INGEST_SUMMARIZE_WORKERS", 4)),
+    "reduce": int(os.getenv("INGEST_REDUCE_WORKERS", 2)),
+}
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 100))
+# Number of video upserts buffered before a bulk_write
+INGEST_WRITE_BATCH = int(os.getenv("INGEST_WRITE_BATCH", 50))
+# A job is marked failed after this many unsuccessful attempts
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", 3))
+# Worker leases on jobs and playlists; holders renew them every third of this
+INGEST_LEASE_SEC = int(os.getenv("INGEST_LEASE_SEC", 300))
+INGEST_RETRY_DELAY_SEC = int(os.getenv("INGEST_RETRY_DELAY_SEC", 60))
+# Jobs a single worker may hold leases on at once, rounded up to whole
+# details batches so freed slots refill full batches
+INGEST_MAX_IN_FLIGHT = -(-int(os.getenv("INGEST_MAX_IN_FLIGHT", 100)) // YOUTUBE_MAX_IDS) * YOUTUBE_MAX_IDS
+# Longest a partially filled batch waits for free slots before it is admitted
+INGEST_ADMIT_WAIT_SEC = float(os.getenv("INGEST_ADMIT_WAIT_SEC", 5))
+# Playlists paged by any worker more recently than this are not paged again
+PLAYLIST_DISCOVERY_INTERVAL_SEC = int(os.getenv("PLAYLIST_DISCOVERY_INTERVAL_SEC", 600))
+# Incremental syncs stop paging early; every playlist is still paged in full this often
+PLAYLIST_FULL_SYNC_SEC = int(os.getenv("PLAYLIST_FULL_SYNC_SEC", 7 * 24 * 3600))
+# Prometheus textfile written after each run (e.g. for node_exporter); unset to skip
+INGEST_METRICS_FILE = os.getenv("INGEST_METRICS_FILE")
+
+# LLM response cache, keyed by a hash of the model URL and prompt
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SEC = int(os.getenv("LLM_CACHE_TTL_DAYS", 30)) * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50000))
+
+# Outbound API limits; calls wait for capacity instead of sleeping blindly
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", 15))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", 1000000))
+GEMINI_OUTPUT_TOKENS = 300
+YOUTUBE_RPM = int(os.getenv("YOUTUBE_RPM", 600))
+TRANSCRIPT_RPM = int(os.getenv("TRANSCRIPT_RPM", 60))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", 5))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# YouTube 403 reasons: the daily quota is gone until it resets, versus
+# short-lived throttles that clear after a backoff
+YOUTUBE_QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+YOUTUBE_RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+gemini_limiter = RateLimiter("Gemini", GEMINI_RPM, GEMINI_TPM, max_retries=API_MAX_RETRIES)
+youtube_limiter = RateLimiter("YouTube", YOUTUBE_RPM, max_retries=API_MAX_RETRIES)
+transcript_limiter = RateLimiter("Transcript", TRANSCRIPT_RPM, max_retries=API_MAX_RETRIES)
+recorder = Recorder(INGEST_RECORD_FILE) if INGEST_RECORD_FILE else None
+
+# Daily API budgets (0 for no limit); days roll over at midnight QUOTA_TIMEZONE
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", 10000))
+GEMINI_DAILY_TOKENS = int(os.getenv("GEMINI_DAILY_TOKENS", 0))
+GEMINI_DAILY_REQUESTS = int(os.getenv("GEMINI_DAILY_REQUESTS", 0))
+QUOTA_TIMEZONE = os.getenv("QUOTA_TIMEZONE", "America/Los_Angeles")
+# Order queued videos are scheduled in: oldest, newest, shortest or underpopulated
+INGEST_PRIORITY = os.getenv("INGEST_PRIORITY", "underpopulated")
+# Queued jobs considered when planning one run
+INGEST_PLAN_MAX_CANDIDATES = int(os.getenv("INGEST_PLAN_MAX_CANDIDATES", 5000))
+
+# Reduce tree: input budget per combine call and concurrent combine calls overall
+REDUCE_MAX_INPUT_TOKENS = int(os.getenv("REDUCE_MAX_INPUT_TOKENS", CHUNK_SIZE))
+REDUCE_CONCURRENCY = int(os.getenv("REDUCE_CONCURRENCY", 4))
+_reduce_executor = ThreadPoolExecutor(max_workers=REDUCE_CONCURRENCY, thread_name_prefix="reduce-call")
 
 # --- LOGGING ---
 logging.basicConfig(filename='ingest_errors.log', level=logging.ERROR, format='%(asctime)s %(levelname)s:%(message)s')
@@ -35,9 +146,64 @@ def check_env_vars():
     if missing:
         raise EnvironmentError(f"Missing required environment variables: {', '.join(missing)}")
 
-def fetch_playlist_videos(youtube, playlist_id):
+def youtube_error_reason(error):
+    """The first ``error.errors[].reason`` of a YouTube API HttpError, or None."""
+    try:
+        return json.loads(error.content)["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+def execute_youtube_request(request):
+    """Execute a googleapiclient request through the shared YouTube rate limiter."""
+    def execute():
+        started = time.perf_counter()
+        not_modified = False
+        try:
+            response = request.execute()
+        except HttpError as e:
+            if recorder:
+                recorder.record("youtube", youtube_key(request.uri), e.resp.status, e.content.decode("utf-8", "replace"),
+                                time.perf_counter() - started, e.resp.get("retry-after"))
+            if e.resp.status == 304:
+                not_modified = True
+                raise NotModified(f"YouTube API: not modified since ETag {request.headers.get('If-None-Match')}")
+            reason = youtube_error_reason(e) if e.resp.status == 403 else None
+            if e.resp.status in RETRYABLE_STATUSES or reason in YOUTUBE_RATE_LIMIT_REASONS:
+                raise RetryableError(f"YouTube API error: HTTP {e.resp.status} {reason or ''}".strip(),
+                                     parse_retry_after(e.resp.get("retry-after")))
+            if reason in YOUTUBE_QUOTA_REASONS:
+                raise QuotaExceededError(f"YouTube API quota exhausted: {reason}")
+            raise
+        finally:
+            # A 304 is not charged; every other attempt costs a quota unit, failed or not.
+            if not not_modified:
+                charge_quota("youtube", units=1)
+        if recorder:
+            recorder.record("youtube", youtube_key(request.uri), 200, response, time.perf_counter() - started)
+        return response
+    return youtube_limiter.call(execute)
+
+def fetch_playlist_videos(youtube, playlist_id, sync=None, known_ids=None):
+    """Page through a playlist's items.
+
+    ``sync`` is the state stored by the previous sync of this playlist
+    (see new_sync_state) and ``known_ids(video_ids)`` returns the ids that
+    are already ingested or queued. With both, the first page is requested
+    conditionally on its ETag, so an unchanged playlist costs a single 304,
+    and paging stops at the first page that reaches known items once as many
+    new items have turned up as the item count grew by. Without them, or when
+    a full sync is due, every page is fetched.
+
+    Returns ``(videos, known, sync)``: the items of the pages fetched, the
+    subset of their ids already known, and the state to store, or None when
+    nothing should be stored (unchanged playlist or an error).
+    """
     videos = []
+    known = set()
+    incremental = bool(sync) and known_ids is not None and not full_sync_due(sync)
     nextPageToken = None
+    first_page = None
+    new_found = 0
     while True:
         try:
             pl_request = youtube.playlistItems().list(
@@ -46,42 +212,81 @@ def fetch_playlist_videos(youtube, playlist_id):
                 maxResults=50,
                 pageToken=nextPageToken
             )
-            pl_response = pl_request.execute()
+            if incremental and nextPageToken is None and sync.get("etag"):
+                pl_request.headers["If-None-Match"] = sync["etag"]
+            pl_response = execute_youtube_request(pl_request)
+        except NotModified:
+            print(f"Playlist {playlist_id} is unchanged since its last sync.")
+            return [], set(), None
         except Exception as e:
             logging.error(f"YouTube API error for playlist {playlist_id}: {e}")
-            if hasattr(e, 'resp') and hasattr(e.resp, 'status') and e.resp.status == 403:
+            if isinstance(e, QuotaExceededError):
                 logging.error("Quota limit reached for YouTube API.")
                 break
-            return []
+            return [], set(), None
+        first_page = first_page or pl_response
+        page = []
         for item in pl_response['items']:
             video_id = item['contentDetails']['videoId']
             title = item['snippet']['title']
             published_at = item['contentDetails'].get('videoPublishedAt', item['snippet']['publishedAt'])
-            videos.append({
+            page.append({
                 "videoId": video_id,
                 "title": title,
                 "publishedAt": published_at
             })
+        videos.extend(page)
         nextPageToken = pl_response.get('nextPageToken')
         if not nextPageToken:
-            break
-    return videos
+            return videos, known | _page_known_ids(page, known_ids), new_sync_state(sync, first_page, videos, True)
+        page_known = _page_known_ids(page, known_ids)
+        known |= page_known
+        new_found += len(page) - len(page_known)
+        if incremental and _reached_known_items(page, page_known, sync, first_page, new_found):
+            print(f"Playlist {playlist_id}: reached already known items, stopping after {len(videos)} item(s).")
+            return videos, known, new_sync_state(sync, first_page, videos, False)
+    # Quota ran out part way; keep what was listed but do not move the sync state
+    return videos, known | _page_known_ids(videos, known_ids), None
 
-def fetch_video_details(youtube, video_id):
-    try:
-        vid_request = youtube.videos().list(
-            part="contentDetails,snippet",
-            id=video_id
-        )
-        vid_response = vid_request.execute()
-    except Exception as e:
-        logging.error(f"YouTube API error for video {video_id}: {e}")
-        if hasattr(e, 'resp') and hasattr(e.resp, 'status') and e.resp.status == 403:
-            logging.error("Quota limit reached for YouTube API.")
-        return None
-    if not vid_response['items']:
-        return None
-    item = vid_response['items'][0]
+def _page_known_ids(page, known_ids):
+    if known_ids is None or not page:
+        return set()
+    return set(known_ids([vid["videoId"] for vid in page]))
+
+def _reached_known_items(page, page_known, sync, first_page, new_found):
+    watermark = sync.get("lastPublishedAt")
+    reached = any(
+        vid["videoId"] in page_known and (not watermark or (vid["publishedAt"] or "") <= watermark)
+        for vid in page
+    )
+    total = first_page.get("pageInfo", {}).get("totalResults")
+    if total is None or sync.get("itemCount") is None:
+        return False
+    # Only stop once the items added since the last sync can all have been seen
+    return reached and new_found >= total - sync["itemCount"]
+
+def full_sync_due(sync):
+    synced = (sync or {}).get("fullSyncAt")
+    return synced is None or synced < datetime.utcnow() - timedelta(seconds=PLAYLIST_FULL_SYNC_SEC)
+
+def new_sync_state(sync, first_page, videos, complete):
+    """Sync state to store on the playlist: first page ETag, item count and publishedAt watermark."""
+    published = [vid["publishedAt"] for vid in videos if vid.get("publishedAt")]
+    if sync and sync.get("lastPublishedAt"):
+        published.append(sync["lastPublishedAt"])
+    state = {
+        "etag": first_page.get("etag"),
+        "itemCount": first_page.get("pageInfo", {}).get("totalResults", len(videos) if complete else None),
+        "lastPublishedAt": max(published) if published else None,
+        "syncedAt": datetime.utcnow(),
+        "fullSyncAt": (sync or {}).get("fullSyncAt"),
+    }
+    if complete and not (sync and sync.get("fullSyncAt") and not full_sync_due(sync)):
+        state["fullSyncAt"] = datetime.utcnow()
+    return state
+
+def parse_video_item(item):
+    video_id = item['id']
     duration = item['contentDetails']['duration']  # ISO 8601 format
     # Convert ISO 8601 duration to HH:MM:SS
     try:
@@ -103,15 +308,87 @@ def fetch_video_details(youtube, video_id):
         "youtubeUrl": f"https://youtu.be/{video_id}"
     }
 
+def is_transient_error(error):
+    """Whether ``error`` is the API's fault (quota, outage, retries used up) rather than the video's."""
+    if isinstance(error, (RetryableError, QuotaExceededError)):
+        return True
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status == 403:
+        return youtube_error_reason(error) in YOUTUBE_QUOTA_REASONS | YOUTUBE_RATE_LIMIT_REASONS
+    return status in RETRYABLE_STATUSES
+
+def fetch_videos_details(youtube, video_ids, unavailable=None):
+    """Resolve details for many videos, YOUTUBE_MAX_IDS ids per videos.list call.
+
+    Returns a dict of videoId -> details; ids that could not be resolved are
+    left out. Ids whose call failed (quota, outage) rather than coming back
+    empty are added to the ``unavailable`` set, if given.
+    """
+    details = {}
+    for i in range(0, len(video_ids), YOUTUBE_MAX_IDS):
+        batch = video_ids[i:i+YOUTUBE_MAX_IDS]
+        try:
+            vid_request = youtube.videos().list(
+                part="contentDetails,snippet",
+                id=",".join(batch),
+                maxResults=YOUTUBE_MAX_IDS
+            )
+            vid_response = execute_youtube_request(vid_request)
+        except Exception as e:
+            logging.error(f"YouTube API error for videos {','.join(batch)}: {e}")
+            if isinstance(e, QuotaExceededError):
+                logging.error("Quota limit reached for YouTube API.")
+                if unavailable is not None:
+                    unavailable.update(video_ids[i:])
+                break
+            if unavailable is not None:
+                unavailable.update(batch)
+            continue
+        for item in vid_response.get('items', []):
+            details[item['id']] = parse_video_item(item)
+    return details
+
+def fetch_video_details(youtube, video_id):
+    return fetch_videos_details(youtube, [video_id]).get(video_id)
+
+def _get_transcript(video_id, languages):
+    started = time.perf_counter()
+    key = transcript_key(video_id, languages)
+    if TRANSCRIPT_API_URL:
+        try:
+            response = requests.get(f"{TRANSCRIPT_API_URL}/{video_id}", params={"languages": ",".join(languages)}, timeout=30)
+        except (requests.Timeout, requests.ConnectionError) as e:
+            if recorder:
+                recorder.record("transcript", key, 0, str(e), time.perf_counter() - started)
+            raise RetryableError(f"Transcript API request failed: {e}")
+        if recorder:
+            recorder.record("transcript", key, response.status_code, response.text,
+                            time.perf_counter() - started, response.headers.get("Retry-After"))
+        if response.status_code in RETRYABLE_STATUSES:
+            raise RetryableError(f"Transcript API error: HTTP {response.status_code}",
+                                 parse_retry_after(response.headers.get("Retry-After")))
+        if response.status_code != 200:
+            raise Exception(f"Transcript API error: HTTP {response.status_code}")
+        return response.json()
+    try:
+        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
+    except Exception as e:
+        if recorder:
+            recorder.record("transcript", key, 404, str(e), time.perf_counter() - started)
+        raise
+    if recorder:
+        recorder.record("transcript", key, 200, transcript, time.perf_counter() - started)
+    return transcript
+
 def fetch_transcript(video_id):
     try:
         # Try English first
         try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
+            transcript = transcript_limiter.call(_get_transcript, video_id, ['en'])
             return transcript
         except Exception:
             # Try Hindi if English is not available
-            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['hi'])
+            transcript = transcript_limiter.call(_get_transcript, video_id, ['hi'])
             return transcript
     except Exception as e:
         logging.error(f"Transcript not available for {video_id}: {e}")
@@ -120,17 +397,70 @@ def fetch_transcript(video_id):
 def transcript_to_text(transcript):
     return " ".join([item['text'] for item in transcript])
 
-def chunk_transcript(transcript, chunk_size=CHUNK_SIZE):
-    words = []
-    for item in transcript:
-        words.extend(item['text'].split())
-    total_words = len(words)
-    # Roughly estimate 1 token ≈ 0.75 words
-    words_per_chunk = int(chunk_size * 0.75)
-    return [" ".join(words[i:i+words_per_chunk]) for i in range(0, total_words, words_per_chunk)]
+def chunk_transcript(transcript, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    # Chunks break on segment boundaries and are sized by counted tokens.
+    return [chunk["text"] for chunk in iter_transcript_chunks(transcript, chunk_size, overlap)]
 
-def summarize_with_gemini(text, title):
-    prompt = f"Summarize the following YouTube video transcript for the video titled '{title}' in less than 200 words.\n\n{text}\n\nSummary:"
+_llm_cache = None
+
+def get_llm_cache():
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache(get_llm_cache_collection(), LLM_CACHE_TTL_SEC, LLM_CACHE_MAX_ENTRIES)
+    return _llm_cache
+
+_quota_ledger = None
+
+def get_quota_ledger():
+    global _quota_ledger
+    if _quota_ledger is None:
+        _quota_ledger = QuotaLedger(
+            get_api_usage_collection(),
+            {
+                "youtube": {"units": YOUTUBE_DAILY_QUOTA},
+                "gemini": {"tokens": GEMINI_DAILY_TOKENS, "requests": GEMINI_DAILY_REQUESTS}
+            },
+            QUOTA_TIMEZONE
+        )
+    return _quota_ledger
+
+def charge_quota(api, units=0, tokens=0):
+    get_quota_ledger().charge(api, units=units, tokens=tokens)
+
+def estimate_tokens(prompt):
+    # Prompt tokens plus room for the generated output
+    return count_tokens(prompt) + GEMINI_OUTPUT_TOKENS
+
+def _post_gemini(payload):
+    started = time.perf_counter()
+    try:
+        response = requests.post(
+            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
+            json=payload,
+            timeout=30
+        )
+    except (requests.Timeout, requests.ConnectionError) as e:
+        if recorder:
+            recorder.record("gemini", gemini_key(payload), 0, str(e), time.perf_counter() - started)
+        raise RetryableError(f"Gemini API request failed: {e}")
+    if recorder:
+        recorder.record("gemini", gemini_key(payload), response.status_code, response.text,
+                        time.perf_counter() - started, response.headers.get("Retry-After"))
+    if response.status_code in RETRYABLE_STATUSES:
+        raise RetryableError(
+            f"Gemini API error: HTTP {response.status_code}",
+            parse_retry_after(response.headers.get("Retry-After"))
+        )
+    return response
+
+def gemini_generate(prompt):
+    """Send ``prompt`` to Gemini through the shared rate limiter.
+
+    Returns the generated text, or None if the response had no candidates.
+    Raises once retries are exhausted or on a non-retryable HTTP error.
+    """
     payload = {
         "contents": [
             {
@@ -140,194 +470,788 @@ def summarize_with_gemini(text, title):
             }
         ]
     }
+    response = gemini_limiter.call(_post_gemini, payload, tokens=estimate_tokens(prompt))
+    if response.status_code != 200:
+        charge_quota("gemini")
+    if response.status_code == 403:
+        logging.error("Quota limit reached for Gemini API.")
+        print("Quota limit reached for Gemini API.")
+        raise QuotaExceededError("Gemini API quota error: HTTP 403")
+    if response.status_code != 200:
+        logging.error(f"Gemini API error: HTTP {response.status_code} - {response.text}")
+        print(f"Gemini API error: HTTP {response.status_code} - {response.text}")
+        raise Exception(f"Gemini API error: HTTP {response.status_code}")
+    data = response.json()
+    usage = data.get("usageMetadata") or {}
+    charge_quota("gemini", tokens=usage.get("totalTokenCount") or estimate_tokens(prompt))
+    if "candidates" in data and data["candidates"] and "content" in data["candidates"][0] and "parts" in data["candidates"][0]["content"] and data["candidates"][0]["content"]["parts"]:
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+    logging.error(f"Gemini API returned no candidates: {data}")
+    print(f"Gemini API returned no candidates: {data}")
+    return None
+
+def summarize_with_gemini(text, title):
+    prompt = f"Summarize the following YouTube video transcript for the video titled '{title}' in less than 200 words.\n\n{text}\n\nSummary:"
+    cache = get_llm_cache()
+    if cache:
+        cached = cache.get(GEMINI_API_URL, prompt)
+        if cached:
+            print(f"Gemini summary served from cache: {cached[:200]}...")
+            return cached
     try:
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-            json=payload,
-            timeout=30
-        )
-        if response.status_code == 403:
-            logging.error("Quota limit reached for Gemini API.")
-            print("Quota limit reached for Gemini API.")
-            raise Exception(f"Gemini API quota error: HTTP 403")
-        if response.status_code != 200:
-            logging.error(f"Gemini API error: HTTP {response.status_code} - {response.text}")
-            print(f"Gemini API error: HTTP {response.status_code} - {response.text}")
-            raise Exception(f"Gemini API error: HTTP {response.status_code}")
-        data = response.json()
-        if "candidates" in data and data["candidates"] and "content" in data["candidates"][0] and "parts" in data["candidates"][0]["content"] and data["candidates"][0]["content"]["parts"]:
-            summary = data["candidates"][0]["content"]["parts"][0]["text"]
-            print(f"Gemini summary: {summary[:200]}...")
-            return summary
-        else:
-            logging.error(f"Gemini API error for text chunk: {data}")
-            print(f"Gemini API error for text chunk: {data}")
-            return None
-    except requests.Timeout:
-        logging.error("Gemini API request timed out.")
-        print("Gemini API request timed out.")
-        raise Exception("Gemini API request timed out.")
+        summary = gemini_generate(prompt)
     except Exception as e:
         logging.error(f"Gemini API request failed: {e}")
         print(f"Gemini API request failed: {e}")
         raise
+    if summary:
+        print(f"Gemini summary: {summary[:200]}...")
+        if cache:
+            cache.set(GEMINI_API_URL, prompt, summary)
+    return summary
+
+def pack_by_tokens(texts, max_tokens):
+    """Group consecutive texts so each group's combined length stays within ``max_tokens``.
+
+    Groups always take at least two texts (when available) so every reduce
+    level shrinks the list, even when individual summaries are long.
+    """
+    groups = []
+    current, current_tokens = [], 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if len(current) >= 2 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
 
-def combine_summaries_in_batches(chunk_summaries, title, batch_size=5):
-    # Combine summaries in batches to avoid token overflow
-    combined = chunk_summaries
+def combine_summaries_in_batches(chunk_summaries, title, max_tokens=None):
+    """Reduce chunk summaries to one summary as a tree of Gemini calls.
+
+    Every level is packed into groups that fit ``max_tokens`` and the groups
+    of a level are summarized concurrently on the shared reduce pool.
+    """
+    max_tokens = max_tokens or REDUCE_MAX_INPUT_TOKENS
+    combined = list(chunk_summaries)
     while len(combined) > 1:
-        new_combined = []
-        for i in range(0, len(combined), batch_size):
-            batch = combined[i:i+batch_size]
-            joined = " ".join(batch)
-            summary = summarize_with_gemini(joined, title)
-            if summary:
-                new_combined.append(summary)
-            else:
-                new_combined.append(joined)  # fallback to raw if summarization fails
-        combined = new_combined
+        groups = pack_by_tokens(combined, max_tokens)
+        joined = [" ".join(group) for group in groups]
+        futures = [_reduce_executor.submit(summarize_with_gemini, text, title) for text in joined]
+        # fallback to raw if summarization fails
+        combined = [future.result() or text for future, text in zip(futures, joined)]
     return combined[0] if combined else None
 
-def classify_video_type(title):
-    prompt = (
+def classify_by_title(title):
+    return "project" if "project" in title.lower() else "concept"
+
+def _classify_prompt(title):
+    # Single-title prompt; it also keys each title's label in the LLM cache.
+    return (
         "Classify the following YouTube video title as one of: concept or project.\n"
         f"Title: {title}\n"
         "Type:"
     )
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {"text": prompt}
-                ]
-            }
-        ]
-    }
+
+def _batch_classify_prompt(videos):
+    lines = [
+        "Classify each of the following YouTube videos as one of: concept or project.",
+        f"Answer with only a JSON array of {len(videos)} labels, in the same order as the videos.",
+        ""
+    ]
+    for i, video in enumerate(videos, 1):
+        lines.append(f"{i}. Title: {video['title']}")
+        tags = (video.get("tags") or [])[:CLASSIFY_MAX_TAGS]
+        if tags:
+            lines.append(f"   Tags: {', '.join(tags)}")
+    return "\n".join(lines)
+
+def parse_type_labels(text, count):
+    """Labels from a batch classification reply; None where one is missing or invalid."""
+    labels = [None] * count
+    if not text:
+        return labels
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end < start:
+        return labels
     try:
-        response = requests.post(
-            f"{GEMINI_API_URL}?key={GEMINI_API_KEY}",
-            json=payload,
-            timeout=30
-        )
-        if response.status_code == 429:
-            logging.error("Gemini API quota exceeded. Falling back to heuristic.")
-            if "project" in title.lower():
-                return "project"
-            return "concept"
-        if response.status_code != 200:
-            logging.error(f"Gemini API error (classification): HTTP {response.status_code} - {response.text}")
-            if "project" in title.lower():
-                return "project"
-            return "concept"
-        data = response.json()
-        if "candidates" in data and data["candidates"]:
-            type_text = data["candidates"][0]["content"]["parts"][0]["text"].strip().lower()
-            allowed_types = {"concept", "project"}
-            return type_text if type_text in allowed_types else "concept"
+        parsed = json.loads(text[start:end + 1])
+    except ValueError:
+        return labels
+    if not isinstance(parsed, list):
+        return labels
+    for i, label in enumerate(parsed[:count]):
+        if isinstance(label, str) and label.strip().lower() in VIDEO_TYPES:
+            labels[i] = label.strip().lower()
+    return labels
+
+def classify_video_types(videos):
+    """Classify many videos with one Gemini call per CLASSIFY_BATCH_SIZE titles.
+
+    ``videos`` are dicts with a ``title`` and optional ``tags``. Cached labels
+    are reused; a label the reply leaves out or garbles falls back to
+    classify_by_title for that video only.
+    """
+    cache = get_llm_cache()
+    types = [None] * len(videos)
+    if cache:
+        for i, video in enumerate(videos):
+            cached = cache.get(GEMINI_API_URL, _classify_prompt(video["title"]))
+            if cached in VIDEO_TYPES:
+                types[i] = cached
+    missing = [i for i, video_type in enumerate(types) if video_type is None]
+    for start in range(0, len(missing), CLASSIFY_BATCH_SIZE):
+        batch = missing[start:start + CLASSIFY_BATCH_SIZE]
+        try:
+            labels = parse_type_labels(gemini_generate(_batch_classify_prompt([videos[i] for i in batch])), len(batch))
+        except Exception as e:
+            logging.error(f"Type classification failed, falling back to heuristic: {e}")
+            labels = [None] * len(batch)
+        unlabeled = 0
+        for i, label in zip(batch, labels):
+            if label is None:
+                unlabeled += 1
+                types[i] = classify_by_title(videos[i]["title"])
+                continue
+            types[i] = label
+            if cache:
+                cache.set(GEMINI_API_URL, _classify_prompt(videos[i]["title"]), label)
+        if unlabeled:
+            print(f"Classified {unlabeled} of {len(batch)} title(s) by heuristic.")
+    return types
+
+def classify_video_type(title):
+    return classify_video_types([{"title": title}])[0]
+
+class _BatchBudget:
+    """Caps how many videos are in flight or finished during one run.
+
+    A slot is taken before a video enters the pipeline and handed back when
+    the video is dropped, so skipped videos never count towards BATCH_SIZE.
+    ``limit=None`` means no batch limit; ``max_in_flight`` still stops a
+    worker from leasing more jobs than it is working on.
+    """
+
+    def __init__(self, limit, max_in_flight=None):
+        self.limit = float("inf") if limit is None else limit
+        self.max_in_flight = max_in_flight or float("inf")
+        self.in_flight = 0
+        self.done = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, block=True, timeout=None):
+        """Take a slot; returns False once the batch is complete.
+
+        Returns None instead of waiting with ``block=False``, or once
+        ``timeout`` seconds have passed without a free slot.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self.done < self.limit and (
+                self.in_flight + self.done >= self.limit or self.in_flight >= self.max_in_flight
+            ):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0):
+                    return None
+                self._cond.wait(remaining)
+            if self.done >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, success=False):
+        with self._cond:
+            self.in_flight -= 1
+            if success:
+                self.done += 1
+            self._cond.notify_all()
+
+
+class _VideoJob:
+    """In-memory view of an ingest job document carried between stages."""
+
+    def __init__(self, doc):
+        self.id = doc["_id"]
+        self.state = doc["state"]
+        self.playlist_id = doc["playlistId"]
+        self.vid = doc["video"]
+        self.details = doc.get("details")
+        self.video_type = doc.get("type")
+        self.chunks = doc.get("chunks") or []
+        saved = doc.get("chunk_summaries") or {}
+        self.chunk_summaries = [saved.get(str(i)) for i in range(len(self.chunks))]
+        self.summary = doc.get("summary")
+        self.pending_chunks = 0
+        # Set when a chunk failed because of the API rather than the video
+        self.transient_error = None
+        self.lock = threading.Lock()
+
+    def video_doc(self, summary=None):
+        # Merge all metadata
+        video_doc = {
+            **self.vid,
+            **(self.details or {}),
+            "type": self.video_type,
+            "playlistId": self.playlist_id
+        }
+        if summary:
+            video_doc["summary"] = summary
+            # Powers /videos/mongo/<id>/related without any LLM call at request time
+            video_doc.update(embed_video(video_doc))
+        return video_doc
+
+
+_thread_local = threading.local()
+
+
+def get_youtube_client():
+    # googleapiclient/httplib2 objects are not thread-safe, so every worker
+    # thread builds its own client.
+    youtube = getattr(_thread_local, "youtube", None)
+    if youtube is None:
+        client_options = {"api_endpoint": YOUTUBE_API_ENDPOINT} if YOUTUBE_API_ENDPOINT else None
+        youtube = build('youtube', 'v3', developerKey=os.getenv("YOUTUBE_API_KEY"), client_options=client_options)
+        _thread_local.youtube = youtube
+    return youtube
+
+
+def load_known_video_ids(video_ids):
+    """Return the subset of ``video_ids`` already stored, in a single query."""
+    if not video_ids:
+        return set()
+    cursor = get_videos_collection().find({"videoId": {"$in": video_ids}}, {"videoId": 1, "_id": 0})
+    return {doc["videoId"] for doc in cursor}
+
+
+def parse_published_at(published_at):
+    # Parse publishedAt to datetime object if possible
+    if not published_at:
+        return published_at
+    try:
+        return datetime.strptime(published_at.replace('Z', ''), "%Y-%m-%dT%H:%M:%S")
     except Exception as e:
-        logging.error(f"Type classification failed: {e}")
-        if "project" in title.lower():
-            return "project"
-        return "concept"
+        logging.error(f"Failed to parse publishedAt: {published_at} ({e})")
+        return published_at
 
-def run_ingest_and_summarize():
-    check_env_vars()
-    youtube = build('youtube', 'v3', developerKey=os.getenv("YOUTUBE_API_KEY"))
-    processed = 0
-    # Fetch all active playlists from MongoDB
-    active_playlists = list(get_playlists_collection().find({"active": True}))
-    if not active_playlists:
-        print("No active playlists found in the database.")
-        return
-    for playlist in active_playlists:
-        playlist_id = playlist.get("playlistId")
-        if not playlist_id:
-            print(f"Skipping playlist with missing playlistId: {playlist}")
-            continue
+
+def claim_playlist(playlist_id, worker_id):
+    """Lease a playlist for discovery unless another worker holds it or paged it recently.
+
+    Returns the playlist with its stored ``sync`` state, or None if not claimed.
+    """
+    now = datetime.utcnow()
+    return get_playlists_collection().find_one_and_update(
+        {
+            "playlistId": playlist_id,
+            "$and": [
+                {"$or": [{"ingest_lease_expires_at": None}, {"ingest_lease_expires_at": {"$lt": now}}]},
+                {"$or": [
+                    {"last_discovered_at": None},
+                    {"last_discovered_at": {"$lt": now - timedelta(seconds=PLAYLIST_DISCOVERY_INTERVAL_SEC)}}
+                ]}
+            ]
+        },
+        {"$set": {
+            "ingest_lease_owner": worker_id,
+            "ingest_lease_expires_at": now + timedelta(seconds=INGEST_LEASE_SEC)
+        }},
+        projection={"_id": 1, "sync": 1}
+    )
+
+
+def release_playlist(playlist_id, worker_id, discovered, sync=None):
+    update = {"ingest_lease_owner": None, "ingest_lease_expires_at": None}
+    if discovered:
+        update["last_discovered_at"] = datetime.utcnow()
+    if sync:
+        update["sync"] = sync
+    get_playlists_collection().update_one(
+        {"playlistId": playlist_id, "ingest_lease_owner": worker_id},
+        {"$set": update}
+    )
+
+
+class _Heartbeat:
+    """Background thread renewing this worker's job and playlist leases."""
+
+    def __init__(self, job_queue, interval):
+        self.job_queue = job_queue
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="heartbeat", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.job_queue.heartbeat()
+                get_playlists_collection().update_many(
+                    {"ingest_lease_owner": self.job_queue.worker_id},
+                    {"$set": {"ingest_lease_expires_at": datetime.utcnow() + timedelta(seconds=INGEST_LEASE_SEC)}}
+                )
+            except Exception as e:
+                logging.error(f"Lease heartbeat failed: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def discover_new_videos(job_queue, playlist_ids):
+    """Sync every playlist and queue a pending job for each video not seen before."""
+    def discover(playlist_id):
+        playlist = claim_playlist(playlist_id, job_queue.worker_id)
+        if not playlist:
+            print(f"Playlist {playlist_id} is being or was recently discovered by another worker, skipping.")
+            return
+        discovered = False
+        sync = None
+        try:
+            sync = discover_playlist(playlist_id, playlist.get("sync"))
+            discovered = True
+        finally:
+            release_playlist(playlist_id, job_queue.worker_id, discovered, sync)
+
+    def discover_playlist(playlist_id, sync):
         print(f"Processing playlist: {playlist_id}")
-        playlist_videos = fetch_playlist_videos(youtube, playlist_id)
+        playlist_videos, known_ids, new_sync = fetch_playlist_videos(
+            get_youtube_client(),
+            playlist_id,
+            sync,
+            lambda video_ids: load_known_video_ids(video_ids) | job_queue.known_ids(video_ids)
+        )
+        new_jobs = []
         for vid in playlist_videos:
-            if processed >= BATCH_SIZE:
-                print(f"Batch size {BATCH_SIZE} reached, stopping for now.")
+            if vid["videoId"] in known_ids:
+                continue
+            known_ids.add(vid["videoId"])
+            vid["publishedAt"] = parse_published_at(vid.get("publishedAt"))
+            new_jobs.append({"_id": vid["videoId"], "playlistId": playlist_id, "video": vid})
+        # Jobs are keyed by videoId, so a video listed in two playlists is only queued once.
+        queued = job_queue.enqueue(new_jobs)
+        print(f"Playlist {playlist_id}: {len(known_ids) - len(new_jobs)} known, {queued} new video(s) queued.")
+        return new_sync
+
+    Pipeline([Stage("playlists", discover, INGEST_CONCURRENCY["playlists"])]).run(playlist_ids)
+
+
+def playlist_video_counts(playlist_ids):
+    pipeline = [
+        {"$match": {"playlistId": {"$in": playlist_ids}}},
+        {"$group": {"_id": "$playlistId", "count": {"$sum": 1}}}
+    ]
+    return {doc["_id"]: doc["count"] for doc in get_videos_collection().aggregate(pipeline)}
+
+
+def plan_ingest(job_queue, priority):
+    """Choose this run's jobs: ``priority`` order, packed into what is left of today's API budgets."""
+    docs = job_queue.candidates(INGEST_PLAN_MAX_CANDIDATES)
+    candidates = []
+    for doc in docs:
+        candidates.append({
+            "id": doc["_id"],
+            "playlistId": doc.get("playlistId"),
+            "publishedAt": (doc.get("video") or {}).get("publishedAt"),
+            "created_at": doc.get("created_at"),
+            "in_progress": doc["state"] != PENDING,
+            "cost": estimate_video_cost(
+                (doc.get("details") or {}).get("duration_sec"),
+                doc.get("transcript_tokens"),
+                CHUNK_SIZE,
+                GEMINI_OUTPUT_TOKENS,
+                needs_details=doc["state"] == PENDING,
+                needs_type=doc.get("type") is None,
+                classify_batch_size=CLASSIFY_BATCH_SIZE
+            )
+        })
+    remaining = get_quota_ledger().remaining()
+    sizes = playlist_video_counts(list({c["playlistId"] for c in candidates})) if priority == "underpopulated" else None
+    job_ids, deferred = plan_jobs(candidates, remaining, priority, sizes)
+    planned_ids = set(job_ids)
+    planned = [c for c in candidates if c["id"] in planned_ids]
+    left = ", ".join(f"{api} {metric} {amount:.0f}" for api, limits in remaining.items() for metric, amount in limits.items())
+    print(f"Planned {len(job_ids)} of {len(candidates)} queued video(s) by '{priority}' priority, "
+          f"~{sum(c['cost']['gemini']['tokens'] for c in planned):.0f} Gemini tokens; "
+          f"{deferred} deferred over budget. Left today: {left or 'no budgets set'}.")
+    return job_ids
+
+
+def admit_jobs(job_queue, budget, job_ids, batch_wait=None):
+    """Claim the planned jobs in order and yield them in batches, one budget slot per job.
+
+    Batches fill up to YOUTUBE_MAX_IDS so details and classification stay
+    batched; a partial batch is handed over once it has waited
+    ``batch_wait`` seconds for slots, or when the planned jobs run out.
+    """
+    batch_wait = INGEST_ADMIT_WAIT_SEC if batch_wait is None else batch_wait
+    batch = []
+    deadline = None
+    job_ids = iter(job_ids)
+    while True:
+        if batch:
+            admitted = budget.acquire(block=False)
+            # Slots only come back from jobs already downstream; if every held
+            # slot is in this batch, waiting cannot help.
+            if admitted is None and budget.in_flight > len(batch):
+                admitted = budget.acquire(timeout=max(0.0, deadline - time.monotonic()))
+        else:
+            admitted = budget.acquire()
+        if admitted is None:
+            # Hand over what we hold, or the slots we are waiting on could be
+            # the ones sitting in this batch.
+            yield batch
+            batch = []
+            continue
+        if not admitted:
+            print("Batch size reached, stopping for now.")
+            break
+        job_id = next(job_ids, None)
+        if job_id is None:
+            budget.release()
+            break
+        if job_queue.claim(job_id) is None:
+            # Another worker got there first
+            budget.release()
+            continue
+        if not batch:
+            deadline = time.monotonic() + batch_wait
+        batch.append(job_id)
+        if len(batch) == YOUTUBE_MAX_IDS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_ingest_pipeline(budget, writer, job_queue):
+    # Every admitted job holds one budget slot until it is released here,
+    # exactly once: a stage that raises after releasing some of its jobs'
+    # slots must not have them released again by release_on_error, or the
+    # budget over-admits.
+    released = set()
+    released_lock = threading.Lock()
+
+    def release(job_id, success=False):
+        with released_lock:
+            if job_id in released:
                 return
-            # Check if video already exists in MongoDB
-            if get_videos_collection().find_one({"videoId": vid["videoId"]}):
-                print(f"Video {vid['videoId']} already in DB, skipping.")
+            released.add(job_id)
+        budget.release(success=success)
+
+    def holds_slot(job_id):
+        with released_lock:
+            return job_id not in released
+
+    def save_video(job, final_state, summary=None):
+        # Upserts keyed on the unique videoId make the write idempotent; the
+        # job only leaves its current state once the write has been flushed.
+        # updated_at is stamped by the server when the buffered op is actually
+        # written, so export and related-index watermarks never skip it.
+        op = UpdateOne(
+            {"videoId": job.id},
+            {"$set": job.video_doc(summary), "$currentDate": {"updated_at": True}},
+            upsert=True
+        )
+        writer.add(op, key=(job.id, final_state))
+
+    def fail(job, error, transient=None):
+        if transient is None:
+            transient = is_transient_error(error)
+        if transient:
+            # Not the video's fault: retry later without using up an attempt.
+            print(f"Ingest of {job.id} deferred: {error}")
+            job_queue.defer(job.id, error)
+            release(job.id)
+            return
+        print(f"Ingest of {job.id} failed: {error}")
+        if job_queue.record_failure(job.id, error) and job.details:
+            # Out of attempts: keep the video listed, just without a summary.
+            save_video(job, FAILED)
+        release(job.id)
+
+    def fetch_details(job_ids):
+        docs = job_queue.load(job_ids)
+        jobs = []
+        for job_id in job_ids:
+            if job_id in docs and docs[job_id]["state"] in ACTIVE_STATES:
+                jobs.append(_VideoJob(docs[job_id]))
+            else:
+                release(job_id)
+        pending = [job for job in jobs if job.state == PENDING]
+        unavailable = set()
+        details_by_id = fetch_videos_details(get_youtube_client(), [job.id for job in pending], unavailable) if pending else {}
+        ready = []
+        for job in jobs:
+            if job.state != PENDING:
+                ready.append(job)
                 continue
-            # Fetch more details
-            details = fetch_video_details(youtube, vid["videoId"])
+            details = details_by_id.get(job.id)
             if not details:
-                print(f"Could not fetch details for {vid['videoId']}, skipping.")
+                fail(job, "Could not fetch details", transient=job.id in unavailable)
                 continue
             # Minimum duration check
             if details.get('duration_sec', 0) < MIN_VIDEO_DURATION_SEC:
-                print(f"Video {vid['videoId']} is too short ({details.get('duration_sec', 0)}s), skipping.")
+                print(f"Video {job.id} is too short ({details.get('duration_sec', 0)}s), skipping.")
+                job_queue.set_state([job.id], SKIPPED)
+                release(job.id)
                 continue
-            # Classify video type using Gemini and title
-            video_type = classify_video_type(vid["title"])
             # Remove description from details if present
-            if "description" in details:
-                del details["description"]
-            # Parse publishedAt to datetime object if possible
-            published_at = vid.get("publishedAt")
-            if published_at:
-                try:
-                    dt = datetime.strptime(published_at.replace('Z', ''), "%Y-%m-%dT%H:%M:%S")
-                    vid["publishedAt"] = dt
-                except Exception as e:
-                    logging.error(f"Failed to parse publishedAt: {published_at} ({e})")
-            # Merge all metadata
-            video_doc = {**vid, **details, "type": video_type, "playlistId": playlist_id}
-            # Insert into MongoDB
-            get_videos_collection().insert_one(video_doc)
-            print(f"Inserted {vid['videoId']} into DB with type '{video_type}'.")
-            # Fetch transcript and summarize
-            transcript = fetch_transcript(vid["videoId"])
+            details.pop("description", None)
+            job.details = details
+            job.state = DETAILS_FETCHED
+            job_queue.update(job.id, {"details": details}, DETAILS_FETCHED)
+            ready.append(job)
+        return [ready] if ready else None
+
+    def classify(jobs):
+        # One batch of jobs from fetch_details shares a single Gemini call.
+        unclassified = [job for job in jobs if job.video_type is None]
+        if unclassified:
+            types = classify_video_types([
+                {"title": job.vid["title"], "tags": (job.details or {}).get("tags")} for job in unclassified
+            ])
+            for job, video_type in zip(unclassified, types):
+                job.video_type = video_type
+                job_queue.update(job.id, {"type": video_type})
+                print(f"Classified {job.id} with type '{video_type}'.")
+        return jobs
+
+    def transcribe(job):
+        if job.state == DETAILS_FETCHED:
+            transcript = fetch_transcript(job.id)
             if not transcript:
-                print(f"No transcript for {vid['videoId']}, skipping summarization.")
-                continue
+                print(f"No transcript for {job.id}, skipping summarization.")
+                save_video(job, DONE)
+                release(job.id)
+                return None
             # Chunk transcript if needed
             chunks = chunk_transcript(transcript)
-            chunk_summaries = []
-            for idx, chunk in enumerate(chunks):
-                print(f"Summarizing chunk {idx+1}/{len(chunks)} for {vid['videoId']}...")
-                summary = None
-                for attempt in range(3):
-                    try:
-                        summary = summarize_with_gemini(chunk, vid["title"])
-                        if summary:
-                            break
-                    except Exception as e:
-                        print(f"Retry {attempt+1}/3 failed for chunk {idx+1}: {e}")
-                        time.sleep(5)
-                if summary:
-                    chunk_summaries.append(summary)
-                else:
-                    logging.error(f"Failed to summarize chunk {idx+1} for {vid['videoId']}")
-                    print(f"Failed to summarize chunk {idx+1} for {vid['videoId']}")
-                time.sleep(1)  # Avoid hitting rate limits
-            if not chunk_summaries:
-                print(f"No summaries generated for {vid['videoId']}")
-                continue
+            if not chunks:
+                save_video(job, DONE)
+                release(job.id)
+                return None
+            job.chunks = chunks
+            job.chunk_summaries = [None] * len(chunks)
+            job.state = TRANSCRIBED
+            # Lets the scheduler cost a resumed job from its real transcript length
+            transcript_tokens = sum(count_tokens(chunk) for chunk in chunks)
+            job_queue.update(job.id, {"chunks": chunks, "chunk_summaries": {}, "transcript_tokens": transcript_tokens},
+                             TRANSCRIBED)
+        if job.state != TRANSCRIBED:
+            return [job]
+        missing = [idx for idx, summary in enumerate(job.chunk_summaries) if not summary]
+        if not missing:
+            return [job]
+        job.pending_chunks = len(missing)
+        return [(job, idx, job.chunks[idx]) for idx in missing]
+
+    def finish_chunk(job):
+        with job.lock:
+            job.pending_chunks -= 1
+            if job.pending_chunks:
+                return None
+        # Only the last chunk to finish decides what happens to the video.
+        failed = sum(1 for summary in job.chunk_summaries if not summary)
+        if failed:
+            # Successful chunks are checkpointed; only these are retried next run.
+            fail(job, f"{failed} chunk(s) failed to summarize", transient=job.transient_error is not None)
+            return None
+        return [job]
+
+    def summarize_chunk(item):
+        if isinstance(item, _VideoJob):
+            return [item]
+        job, idx, chunk = item
+        print(f"Summarizing chunk {idx+1}/{len(job.chunks)} for {job.id}...")
+        try:
+            # Retries and backoff happen inside the Gemini rate limiter.
+            summary = summarize_with_gemini(chunk, job.vid["title"])
+        except Exception as e:
+            print(f"Summarizing chunk {idx+1} for {job.id} failed: {e}")
+            if is_transient_error(e):
+                job.transient_error = e
+            summary = None
+        if summary:
+            job.chunk_summaries[idx] = summary
+            job_queue.update(job.id, {f"chunk_summaries.{idx}": summary})
+        else:
+            logging.error(f"Failed to summarize chunk {idx+1} for {job.id}")
+        return finish_chunk(job)
+
+    def reduce(job):
+        if job.state == TRANSCRIBED:
+            job.state = CHUNKS_SUMMARIZED
+            job_queue.update(job.id, state=CHUNKS_SUMMARIZED)
+        if not job.summary:
             # Combine chunk summaries into a final summary if needed
-            if len(chunk_summaries) == 1:
-                final_summary = chunk_summaries[0]
+            if len(job.chunk_summaries) == 1:
+                final_summary = job.chunk_summaries[0]
             else:
-                print(f"Combining {len(chunk_summaries)} chunk summaries for {vid['videoId']}...")
-                final_summary = combine_summaries_in_batches(chunk_summaries, vid["title"])
+                print(f"Combining {len(job.chunk_summaries)} chunk summaries for {job.id}...")
+                final_summary = combine_summaries_in_batches(job.chunk_summaries, job.vid["title"])
             if not final_summary:
-                print(f"Failed to generate final summary for {vid['videoId']}")
-                continue
-            get_videos_collection().update_one(
-                {"videoId": vid["videoId"]},
-                {"$set": {"summary": final_summary}}
-            )
-            print(f"Summary saved for {vid['videoId']}")
-            processed += 1
-            time.sleep(1)  # Avoid rate limits
+                fail(job, "Failed to generate final summary")
+                return None
+            job.summary = final_summary
+            job_queue.update(job.id, {"summary": final_summary})
+        save_video(job, DONE, job.summary)
+        print(f"Summary queued for {job.id}")
+        release(job.id, success=True)
+        return None
+
+    def release_on_error(item, exc):
+        # Jobs the stage already settled before raising keep that outcome.
+        if isinstance(item, list):
+            # A batch of job ids (details) or of jobs (classify)
+            for entry in item:
+                if isinstance(entry, _VideoJob):
+                    if holds_slot(entry.id):
+                        fail(entry, exc)
+                else:
+                    release(entry)
+        elif isinstance(item, tuple):
+            job = item[0]
+            print(f"Summarizing a chunk for {job.id} failed: {exc}")
+            results = finish_chunk(job)
+            if results:
+                reduce_stage.put(job)
+        elif isinstance(item, _VideoJob) and holds_slot(item.id):
+            fail(item, exc)
+
+    queue_size = INGEST_QUEUE_SIZE
+    reduce_stage = Stage("reduce", reduce, INGEST_CONCURRENCY["reduce"], queue_size, release_on_error)
+    return Pipeline([
+        Stage("details", fetch_details, INGEST_CONCURRENCY["details"], queue_size, release_on_error),
+        Stage("classify", classify, INGEST_CONCURRENCY["classify"], queue_size, release_on_error),
+        Stage("transcript", transcribe, INGEST_CONCURRENCY["transcript"], queue_size, release_on_error),
+        # Chunks fan out to many items, so this queue is left unbounded.
+        Stage("summarize", summarize_chunk, INGEST_CONCURRENCY["summarize"], 0, release_on_error),
+        reduce_stage,
+    ])
+
+
+def mark_jobs_finished(job_queue, keys):
+    if keys:
+        # Let the API processes drop their cached video listings.
+        bump_version('videos')
+    by_state = {}
+    for job_id, state in keys:
+        by_state.setdefault(state, []).append(job_id)
+    for state, job_ids in by_state.items():
+        job_queue.set_state(job_ids, state)
+
+
+def report_ingest_metrics():
+    """Print per-stage timing and API call counters; write them to INGEST_METRICS_FILE if set."""
+    items = stage_items.snapshot()
+    for (stage,), (count, total) in sorted(stage_latency.snapshot().items()):
+        errors = items.get((stage, "error"), 0)
+        print(f"Stage {stage}: {count} item(s), {errors} error(s), {total:.1f}s busy, {total / count * 1000:.0f}ms avg")
+    calls = api_calls.snapshot()
+    waits = api_wait.snapshot()
+    for (api,), (count, total) in sorted(api_latency.snapshot().items()):
+        outcomes = ", ".join(f"{outcome} {n}" for (name, outcome), n in sorted(calls.items()) if name == api)
+        print(f"API {api}: {count} call(s) ({outcomes}), {total / count * 1000:.0f}ms avg, "
+              f"{waits.get((api,), 0):.1f}s waiting on rate limits")
+    if INGEST_METRICS_FILE:
+        try:
+            REGISTRY.write(INGEST_METRICS_FILE)
+        except OSError as e:
+            logging.error(f"Could not write ingest metrics to {INGEST_METRICS_FILE}: {e}")
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_ingest_and_summarize(batch_size=BATCH_SIZE, worker_id=None, priority=None):
+    """Discover new videos, then work through claimable jobs.
+
+    Several processes may run this at once: playlists and jobs are claimed
+    through leases, so each piece of work is done by one worker. Stops after
+    ``batch_size`` summaries (None for no limit) or when nothing is left to
+    claim, and returns the number of videos summarized. Jobs are taken in
+    ``priority`` order (INGEST_PRIORITY by default) for as long as today's
+    API budgets are estimated to cover them.
+    """
+    check_env_vars()
+    worker_id = worker_id or default_worker_id()
+    # Fetch all active playlists from MongoDB
+    active_playlists = list(get_playlists_collection().find({"active": True}))
+    if not active_playlists:
+        print("No active playlists found in the database.")
+        return 0
+    playlist_ids = []
+    for playlist in active_playlists:
+        playlist_id = playlist.get("playlistId")
+        if not playlist_id:
+            print(f"Skipping playlist with missing playlistId: {playlist}")
+            continue
+        playlist_ids.append(playlist_id)
+    job_queue = JobQueue(
+        get_ingest_jobs_collection(),
+        INGEST_MAX_ATTEMPTS,
+        worker_id=worker_id,
+        lease_seconds=INGEST_LEASE_SEC,
+        retry_delay=INGEST_RETRY_DELAY_SEC
+    )
+    job_queue.ensure_indexes()
+    print(f"Ingest worker {worker_id} starting.")
+    budget = _BatchBudget(batch_size, INGEST_MAX_IN_FLIGHT)
+    writer = BulkWriter(
+        get_videos_collection(),
+        INGEST_WRITE_BATCH,
+        on_flush=lambda keys: mark_jobs_finished(job_queue, keys)
+    )
+    with _Heartbeat(job_queue, INGEST_LEASE_SEC / 3):
+        if get_quota_ledger().remaining().get("youtube", {}).get("units", 1) > 0:
+            discover_new_videos(job_queue, playlist_ids)
+        else:
+            print("YouTube quota for today is used up, skipping playlist discovery.")
+        # Unfinished jobs from earlier runs come first and resume where they stopped.
+        job_ids = plan_ingest(job_queue, priority or INGEST_PRIORITY)
+        try:
+            build_ingest_pipeline(budget, writer, job_queue).run(admit_jobs(job_queue, budget, job_ids))
+        finally:
+            writer.flush()
+            if get_llm_cache():
+                get_llm_cache().evict()
+    print(f"Ingest finished: {budget.done} video(s) summarized.")
+    report_ingest_metrics()
+    return budget.done
 
 @click.command('ingest_and_summarize')
+@click.option('--batch-size', default=BATCH_SIZE, show_default=True, help='Stop after summarizing this many videos.')
+@click.option('--priority', type=click.Choice(list(PRIORITIES)), default=INGEST_PRIORITY, show_default=True,
+              help='Order in which queued videos are scheduled.')
 @with_appcontext
-def ingest_and_summarize_command():
+def ingest_and_summarize_command(batch_size, priority):
     """Fetch and summarize videos using Gemini."""
-    run_ingest_and_summarize() 
\ No newline at end of file
+    run_ingest_and_summarize(batch_size, priority=priority)
+
+@click.command('ingest_worker')
+@click.option('--worker-id', default=None, help='Lease owner name; defaults to host-pid.')
+@click.option('--priority', type=click.Choice(list(PRIORITIES)), default=INGEST_PRIORITY, show_default=True,
+              help='Order in which queued videos are scheduled.')
+@click.option('--poll-interval', default=0, show_default=True,
+              help='Seconds to wait before looking for new work once the queue is drained; 0 exits instead.')
+@with_appcontext
+def ingest_worker_command(worker_id, priority, poll_interval):
+    """Claim and process ingest jobs until the queue is drained.
+
+    Start as many of these as needed, on one host or several.
+    """
+    worker_id = worker_id or default_worker_id()
+    while True:
+        run_ingest_and_summarize(batch_size=None, worker_id=worker_id, priority=priority)
+        if not poll_interval:
+            return
+        time.sleep(poll_interval) 
\ No newline at end of file
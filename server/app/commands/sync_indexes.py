@@ -0,0 +1,20 @@
+import click
+from flask.cli import with_appcontext
+from app.utils.mongo import get_db
+from app.utils.indexes import sync_indexes
+
+
+@click.command('sync_indexes')
+@click.option('--drop-unknown', is_flag=True, help='Also drop indexes that are not in the registry.')
+@click.option('--dry-run', is_flag=True, help='Only report what would change.')
+@with_appcontext
+def sync_indexes_command(drop_unknown, dry_run):
+    """Sync MongoDB indexes with app/utils/indexes.py. Run once per deploy, not on every worker boot."""
+    report = sync_indexes(get_db(), drop_unknown=drop_unknown, dry_run=dry_run)
+    for action, names in report.items():
+        for name in names:
+            print(f"{action}: {name}")
+    if not any(report.values()):
+        print("Indexes are up to date.")
+    if report['failed']:
+        raise SystemExit(1)
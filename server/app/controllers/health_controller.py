@@ -0,0 +1,4 @@
+from app.services.health_service import health_service
+
+def health_controller(request):
+    return health_service(request)
@@ -0,0 +1,4 @@
+from app.services.metrics_service import metrics_service
+
+def metrics_controller(request):
+    return metrics_service(request)
@@ -0,0 +1,4 @@
+from app.services.search_service import search_service
+
+def search_controller(request):
+    return search_service(request)
@@ -1,10 +1,18 @@
 from app.services.video_service import (
     get_videos_service,
-    get_video_by_mongo_id_service
+    get_video_by_mongo_id_service,
+    get_related_videos_service,
+    export_videos_service
 )
 
 def get_videos_controller(request):
     return get_videos_service(request)
 
 def get_video_by_mongo_id_controller(request, mongo_id):
-    return get_video_by_mongo_id_service(request, mongo_id) 
\ No newline at end of file
+    return get_video_by_mongo_id_service(request, mongo_id)
+
+def get_related_videos_controller(request, mongo_id):
+    return get_related_videos_service(request, mongo_id)
+
+def export_videos_controller(request):
+    return export_videos_service(request)
\ No newline at end of file
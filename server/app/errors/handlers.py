@@ -1,3 +1,7 @@
+import logging
+from flask import request
+from app.utils.metrics import unhandled_errors
+
 def register_error_handlers(app):
     @app.errorhandler(404)
     def not_found(error):
@@ -5,4 +9,8 @@ def register_error_handlers(app):
 
     @app.errorhandler(500)
     def internal_error(error):
+        # Flask logs the traceback; record which route failed and count it
+        original = getattr(error, 'original_exception', None) or error
+        unhandled_errors.inc(exception=type(original).__name__)
+        logging.error(f"Unhandled error on {request.method} {request.path}: {original!r}")
         return {"error": "Internal server error"}, 500 
\ No newline at end of file
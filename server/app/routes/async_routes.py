@@ -0,0 +1,71 @@
+"""The project, video, playlist and admin_project blueprints as async views.
+
+Same names, URL prefixes and routes as their sync counterparts; served by
+create_async_app.
+"""
+from quart import Blueprint, request
+from app.services.async_service import (
+    get_projects_service,
+    get_project_by_mongo_id_service,
+    get_videos_service,
+    get_video_by_mongo_id_service,
+    get_playlists_service,
+    add_playlist_service,
+    submit_project_service,
+    get_pending_projects_service,
+    approve_project_service,
+    delete_project_service,
+    get_approved_projects_service
+)
+
+project_bp = Blueprint('project', __name__, url_prefix='/projects')
+
+@project_bp.route('', methods=['GET'])
+async def get_projects():
+    return await get_projects_service(request)
+
+@project_bp.route('/mongo/<mongo_id>', methods=['GET'])
+async def get_project_by_mongo_id(mongo_id):
+    return await get_project_by_mongo_id_service(request, mongo_id)
+
+video_bp = Blueprint('video', __name__, url_prefix='/videos')
+
+@video_bp.route('', methods=['GET'])
+async def get_videos():
+    return await get_videos_service(request)
+
+@video_bp.route('/mongo/<mongo_id>', methods=['GET'])
+async def get_video_by_mongo_id(mongo_id):
+    return await get_video_by_mongo_id_service(request, mongo_id)
+
+playlist_bp = Blueprint('playlist', __name__, url_prefix='/playlists')
+
+@playlist_bp.route('', methods=['GET'])
+async def get_playlists():
+    return await get_playlists_service(request)
+
+@playlist_bp.route('', methods=['POST'])
+async def add_playlist():
+    return await add_playlist_service(request)
+
+admin_project_bp = Blueprint('admin_project', __name__, url_prefix='/api/projects')
+
+@admin_project_bp.route('/submit', methods=['POST'])
+async def submit():
+    return await submit_project_service(request)
+
+@admin_project_bp.route('/pending', methods=['GET'])
+async def pending():
+    return await get_pending_projects_service(request)
+
+@admin_project_bp.route('/<project_id>/approve', methods=['PATCH'])
+async def approve(project_id):
+    return await approve_project_service(request, project_id)
+
+@admin_project_bp.route('/<project_id>', methods=['DELETE'])
+async def delete(project_id):
+    return await delete_project_service(request, project_id)
+
+@admin_project_bp.route('/approved', methods=['GET'])
+async def approved():
+    return await get_approved_projects_service(request)
@@ -0,0 +1,8 @@
+from flask import Blueprint, request
+from app.controllers.health_controller import health_controller
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    return health_controller(request)
@@ -0,0 +1,8 @@
+from flask import Blueprint, request
+from app.controllers.metrics_controller import metrics_controller
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    return metrics_controller(request)
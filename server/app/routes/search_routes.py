@@ -0,0 +1,8 @@
+from flask import Blueprint, request
+from app.controllers.search_controller import search_controller
+
+search_bp = Blueprint('search', __name__, url_prefix='/search')
+
+@search_bp.route('', methods=['GET'])
+def search():
+    return search_controller(request)
@@ -1,7 +1,9 @@
 from flask import Blueprint, request
 from app.controllers.video_controller import (
     get_videos_controller,
-    get_video_by_mongo_id_controller
+    get_video_by_mongo_id_controller,
+    get_related_videos_controller,
+    export_videos_controller
 )
 
 video_bp = Blueprint('video', __name__, url_prefix='/videos')
@@ -12,4 +14,12 @@ def get_videos():
 
 @video_bp.route('/mongo/<mongo_id>', methods=['GET'])
 def get_video_by_mongo_id(mongo_id):
-    return get_video_by_mongo_id_controller(request, mongo_id) 
\ No newline at end of file
+    return get_video_by_mongo_id_controller(request, mongo_id)
+
+@video_bp.route('/mongo/<mongo_id>/related', methods=['GET'])
+def get_related_videos(mongo_id):
+    return get_related_videos_controller(request, mongo_id)
+
+@video_bp.route('/export', methods=['GET'])
+def export_videos():
+    return export_videos_controller(request)
\ No newline at end of file
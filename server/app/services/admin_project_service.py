@@ -1,7 +1,10 @@
-from flask import jsonify, request
+from flask import request
+from app.utils.serialization import json_response
 from app.utils.mongo import get_projects_collection
 from app.middlewares.auth import require_admin_token
+from app.utils.cache import cached_response, conditional_response, bump_version
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 import re
 import os
 
@@ -23,20 +26,11 @@ def submit_project_service(request):
     try:
         data = request.json
         if not data:
-            return jsonify({'error': 'No data provided'}), 400
+            return json_response({'error': 'No data provided'}), 400
         valid, error = validate_project(data)
         if not valid:
-            return jsonify({'error': error}), 400
+            return json_response({'error': error}), 400
         projects_collection = get_projects_collection()
-        duplicate = projects_collection.find_one({
-            '$or': [
-                {'github_url': data['github_url'].strip()},
-                {'title': data['title'].strip()}
-            ],
-            'status': {'$in': ['pending', 'approved']}
-        })
-        if duplicate:
-            return jsonify({'error': 'A project with this title or GitHub URL has already been submitted.'}), 409
         project = {
             'title': data['title'].strip(),
             'description': data['description'].strip(),
@@ -47,11 +41,15 @@ def submit_project_service(request):
             'status': 'pending',
             'created_at': datetime.utcnow()
         }
-        result = projects_collection.insert_one(project)
-        return jsonify({'message': 'Project submitted for review', 'id': str(result.inserted_id)}), 201
+        try:
+            # Unique indexes on title and github_url reject duplicates atomically
+            result = projects_collection.insert_one(project)
+        except DuplicateKeyError:
+            return json_response({'error': 'A project with this title or GitHub URL has already been submitted.'}), 409
+        return json_response({'message': 'Project submitted for review', 'id': str(result.inserted_id)}), 201
     except Exception as e:
         print(f"Error in submit_project: {e}")
-        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+        return json_response({'error': f'Internal server error: {str(e)}'}), 500
 
 def get_pending_projects_service(request):
     auth = require_admin_token(request)
@@ -59,9 +57,7 @@ def get_pending_projects_service(request):
         return auth
     projects_collection = get_projects_collection()
     projects = list(projects_collection.find({'status': 'pending'}))
-    for p in projects:
-        p['_id'] = str(p['_id'])
-    return jsonify(projects)
+    return json_response(projects)
 
 def approve_project_service(request, project_id):
     auth = require_admin_token(request)
@@ -69,10 +65,14 @@ def approve_project_service(request, project_id):
         return auth
     from bson.objectid import ObjectId
     projects_collection = get_projects_collection()
-    result = projects_collection.update_one({'_id': ObjectId(project_id)}, {'$set': {'status': 'approved'}})
+    result = projects_collection.update_one(
+        {'_id': ObjectId(project_id)},
+        {'$set': {'status': 'approved', 'updated_at': datetime.utcnow()}}
+    )
     if result.matched_count == 0:
-        return jsonify({'error': 'Project not found'}), 404
-    return jsonify({'message': 'Project approved'})
+        return json_response({'error': 'Project not found'}), 404
+    bump_version('projects')
+    return json_response({'message': 'Project approved'})
 
 def delete_project_service(request, project_id):
     auth = require_admin_token(request)
@@ -82,12 +82,13 @@ def delete_project_service(request, project_id):
     projects_collection = get_projects_collection()
     result = projects_collection.delete_one({'_id': ObjectId(project_id)})
     if result.deleted_count == 0:
-        return jsonify({'error': 'Project not found'}), 404
-    return jsonify({'message': 'Project deleted'})
+        return json_response({'error': 'Project not found'}), 404
+    bump_version('projects')
+    return json_response({'message': 'Project deleted'})
 
+@conditional_response('projects')
+@cached_response('projects')
 def get_approved_projects_service(request):
     projects_collection = get_projects_collection()
     projects = list(projects_collection.find({'status': 'approved'}))
-    for p in projects:
-        p['_id'] = str(p['_id'])
-    return jsonify(projects) 
\ No newline at end of file
+    return json_response(projects) 
\ No newline at end of file
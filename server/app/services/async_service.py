@@ -0,0 +1,153 @@
+"""Async versions of the catalogue and admin services, for the ASGI mode.
+
+Each function mirrors the sync service of the same name, minus the
+in-process response cache, on the async Mongo client. Validation, paging,
+JSON and admin-token helpers are shared with the sync services; Quart
+serves their Werkzeug responses as-is.
+"""
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+from app.utils.serialization import json_response
+from app.middlewares.auth import require_admin_token
+from app.utils.async_mongo import (
+    get_async_videos_collection,
+    get_async_playlists_collection,
+    get_async_projects_collection
+)
+from app.utils.cache import bump_version_async
+from app.utils.pagination import parse_page_args, find_page_async, add_next_page_headers, hide_fields
+from app.services.video_service import HIDDEN_VIDEO_FIELDS
+from app.services.playlist_service import HIDDEN_PLAYLIST_FIELDS
+from app.services.admin_project_service import validate_project
+
+# --- Videos and projects (both read the videos collection) ---
+
+async def _list_videos(request, default_type):
+    try:
+        limit, after, projection = parse_page_args(request.args)
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
+    playlist_id = request.args.get('playlistId')
+    query = {'playlistId': playlist_id} if playlist_id else {'type': default_type}
+    projection = hide_fields(projection, HIDDEN_VIDEO_FIELDS)
+    videos, next_after = await find_page_async(get_async_videos_collection(), query, limit, after, projection)
+    return add_next_page_headers(json_response(videos), request, next_after)
+
+async def _video_by_mongo_id(mongo_id):
+    try:
+        video = await get_async_videos_collection().find_one(
+            {'_id': ObjectId(mongo_id)}, hide_fields(None, HIDDEN_VIDEO_FIELDS)
+        )
+        if video:
+            return json_response(video)
+        else:
+            return json_response({'error': 'Video not found'}, 404)
+    except Exception as e:
+        return json_response({'error': f'Invalid id: {e}'}, 400)
+
+async def get_videos_service(request):
+    return await _list_videos(request, 'concept')
+
+async def get_video_by_mongo_id_service(request, mongo_id):
+    return await _video_by_mongo_id(mongo_id)
+
+async def get_projects_service(request):
+    return await _list_videos(request, 'project')
+
+async def get_project_by_mongo_id_service(request, mongo_id):
+    return await _video_by_mongo_id(mongo_id)
+
+# --- Playlists ---
+
+async def get_playlists_service(request):
+    playlists = await get_async_playlists_collection().find(
+        {'active': True}, hide_fields(None, HIDDEN_PLAYLIST_FIELDS)
+    ).to_list(None)
+    return json_response(playlists)
+
+async def add_playlist_service(request):
+    auth = require_admin_token(request)
+    if auth:
+        return auth
+    data = await request.get_json()
+    if not data or not data.get("name"):
+        return json_response({"error": "Playlist name is required"}, 400)
+    playlist = {
+        "name": data["name"],
+        "playlistId": data.get("playlistId", ""),
+        "author": data.get("author", ""),
+        "active": True,
+        "updated_at": datetime.utcnow(),
+    }
+    try:
+        await get_async_playlists_collection().insert_one(playlist)
+    except DuplicateKeyError as e:
+        if "playlistId" in (e.details or {}).get("keyPattern", {}):
+            return json_response({"error": "A playlist with this ID already exists."}, 400)
+        return json_response({"error": "A playlist with this name already exists."}, 400)
+    await bump_version_async('playlists')
+    return json_response({"message": "Playlist added successfully"}, 201)
+
+# --- Submitted projects ---
+
+async def submit_project_service(request):
+    try:
+        data = await request.get_json()
+        if not data:
+            return json_response({'error': 'No data provided'}, 400)
+        valid, error = validate_project(data)
+        if not valid:
+            return json_response({'error': error}, 400)
+        project = {
+            'title': data['title'].strip(),
+            'description': data['description'].strip(),
+            'tech_stack': [tech.strip() for tech in data['tech_stack']],
+            'github_url': data['github_url'].strip(),
+            'demo_url': data['demo_url'].strip(),
+            'linkedin': data['linkedin'].strip(),
+            'status': 'pending',
+            'created_at': datetime.utcnow()
+        }
+        try:
+            result = await get_async_projects_collection().insert_one(project)
+        except DuplicateKeyError:
+            return json_response({'error': 'A project with this title or GitHub URL has already been submitted.'}, 409)
+        return json_response({'message': 'Project submitted for review', 'id': str(result.inserted_id)}, 201)
+    except Exception as e:
+        print(f"Error in submit_project: {e}")
+        return json_response({'error': f'Internal server error: {str(e)}'}, 500)
+
+async def get_pending_projects_service(request):
+    auth = require_admin_token(request)
+    if auth:
+        return auth
+    projects = await get_async_projects_collection().find({'status': 'pending'}).to_list(None)
+    return json_response(projects)
+
+async def approve_project_service(request, project_id):
+    auth = require_admin_token(request)
+    if auth:
+        return auth
+    result = await get_async_projects_collection().update_one(
+        {'_id': ObjectId(project_id)},
+        {'$set': {'status': 'approved', 'updated_at': datetime.utcnow()}}
+    )
+    if result.matched_count == 0:
+        return json_response({'error': 'Project not found'}, 404)
+    await bump_version_async('projects')
+    return json_response({'message': 'Project approved'})
+
+async def delete_project_service(request, project_id):
+    auth = require_admin_token(request)
+    if auth:
+        return auth
+    result = await get_async_projects_collection().delete_one({'_id': ObjectId(project_id)})
+    if result.deleted_count == 0:
+        return json_response({'error': 'Project not found'}, 404)
+    await bump_version_async('projects')
+    return json_response({'message': 'Project deleted'})
+
+async def get_approved_projects_service(request):
+    projects = await get_async_projects_collection().find({'status': 'approved'}).to_list(None)
+    return json_response(projects)
@@ -0,0 +1,23 @@
+import time
+from app.utils.serialization import json_response
+from app.utils.mongo import get_client, pool_stats
+
+def health_service(request):
+    client = get_client()
+    mongo = {'pool': pool_stats.snapshot()}
+    started = time.perf_counter()
+    try:
+        client.admin.command('ping')
+    except Exception as e:
+        mongo['error'] = str(e)
+        return json_response({'status': 'error', 'mongo': mongo}), 503
+    mongo['ping_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    mongo['servers'] = [
+        {
+            'address': f'{host}:{port}',
+            'type': server.server_type_name,
+            'rtt_ms': round(server.round_trip_time * 1000, 2) if server.round_trip_time is not None else None
+        }
+        for (host, port), server in client.topology_description.server_descriptions().items()
+    ]
+    return json_response({'status': 'ok', 'mongo': mongo})
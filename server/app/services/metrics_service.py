@@ -0,0 +1,9 @@
+from flask import Response, current_app
+from app.utils.serialization import json_response
+from app.utils.metrics import REGISTRY
+
+def metrics_service(request):
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return json_response({'error': 'Unauthorized'}), 401
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
@@ -1,20 +1,30 @@
-from flask import jsonify, request
+from datetime import datetime
+from flask import request
+from pymongo.errors import DuplicateKeyError
+from app.utils.serialization import json_response
 from app.utils.mongo import get_playlists_collection
 from app.middlewares.auth import require_admin_token
+from app.utils.cache import cached_response, conditional_response, bump_version
+from app.utils.pagination import hide_fields
 
+# Ingest's sync state and discovery lease, never sent to clients
+HIDDEN_PLAYLIST_FIELDS = ('sync', 'ingest_lease_owner', 'ingest_lease_expires_at', 'last_discovered_at')
+
+@conditional_response('playlists')
+@cached_response('playlists')
 def get_playlists_service(request):
     playlists_collection = get_playlists_collection()
-    playlists = list(playlists_collection.find({'active': True}))
-    for pl in playlists:
-        pl['_id'] = str(pl['_id'])
-    return jsonify(playlists)
+    playlists = list(playlists_collection.find({'active': True}, hide_fields(None, HIDDEN_PLAYLIST_FIELDS)))
+    return json_response(playlists)
 
 def add_playlist_service(request):
-    require_admin_token(request)
+    auth = require_admin_token(request)
+    if auth:
+        return auth
     data = request.get_json()
 
     if not data or not data.get("name"):
-        return jsonify({"error": "Playlist name is required"}), 400
+        return json_response({"error": "Playlist name is required"}), 400
 
     playlistId = data.get("playlistId", "")
     name = data["name"]
@@ -22,23 +32,20 @@ def add_playlist_service(request):
 
     playlists_collection = get_playlists_collection()
 
-    # ✅ Check for existing playlist with same playlistId
-    if playlistId:
-        existing = playlists_collection.find_one({"playlistId": playlistId})
-        if existing:
-            return jsonify({"error": "A playlist with this ID already exists."}), 400
-
-    # Optionally also check for duplicate by name
-    existing_name = playlists_collection.find_one({"name": name})
-    if existing_name:
-        return jsonify({"error": "A playlist with this name already exists."}), 400
-
     playlist = {
         "name": name,
         "playlistId": playlistId,
         "author": author,
         "active": True,
+        "updated_at": datetime.utcnow(),
     }
 
-    playlists_collection.insert_one(playlist)
-    return jsonify({"message": "Playlist added successfully"}), 201
+    # Unique indexes on playlistId and name reject duplicates atomically
+    try:
+        playlists_collection.insert_one(playlist)
+    except DuplicateKeyError as e:
+        if "playlistId" in (e.details or {}).get("keyPattern", {}):
+            return json_response({"error": "A playlist with this ID already exists."}), 400
+        return json_response({"error": "A playlist with this name already exists."}), 400
+    bump_version('playlists')
+    return json_response({"message": "Playlist added successfully"}), 201
@@ -1,27 +1,35 @@
-from flask import jsonify, request
+from flask import request
+from app.utils.serialization import json_response
 from app.utils.mongo import get_videos_collection
+from app.utils.cache import cached_response, conditional_response
+from app.utils.pagination import parse_page_args, find_page, add_next_page_headers, hide_fields
+from app.services.video_service import HIDDEN_VIDEO_FIELDS
 
+@conditional_response('videos')
+@cached_response('videos')
 def get_projects_service(request):
+    try:
+        limit, after, projection = parse_page_args(request.args)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
     playlist_id = request.args.get('playlistId')
     videos_collection = get_videos_collection()
     if playlist_id:
         query = {'playlistId': playlist_id}
     else:
         query = {'type': 'project'}
-    videos = list(videos_collection.find(query))
-    for video in videos:
-        video['_id'] = str(video['_id'])
-    return jsonify(videos)
+    projection = hide_fields(projection, HIDDEN_VIDEO_FIELDS)
+    videos, next_after = find_page(videos_collection, query, limit, after, projection)
+    return add_next_page_headers(json_response(videos), request, next_after)
 
 def get_project_by_mongo_id_service(request, mongo_id):
     from bson.objectid import ObjectId
     videos_collection = get_videos_collection()
     try:
-        video = videos_collection.find_one({'_id': ObjectId(mongo_id)})
+        video = videos_collection.find_one({'_id': ObjectId(mongo_id)}, hide_fields(None, HIDDEN_VIDEO_FIELDS))
         if video:
-            video['_id'] = str(video['_id'])
-            return jsonify(video)
+            return json_response(video)
         else:
-            return jsonify({'error': 'Video not found'}), 404
+            return json_response({'error': 'Video not found'}), 404
     except Exception as e:
-        return jsonify({'error': f'Invalid id: {e}'}), 400 
\ No newline at end of file
+        return json_response({'error': f'Invalid id: {e}'}), 400 
\ No newline at end of file
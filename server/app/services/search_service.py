@@ -0,0 +1,92 @@
+from flask import request
+from app.utils.serialization import json_response
+from app.utils.mongo import get_videos_collection, get_projects_collection
+from app.utils.cache import cached_response, conditional_response
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+FACET_LIMIT = 20
+
+VIDEO_FIELDS = ['title', 'videoId', 'type', 'playlistId', 'duration', 'youtubeUrl', 'tags', 'publishedAt']
+PROJECT_FIELDS = ['title', 'description', 'tech_stack', 'github_url', 'demo_url', 'linkedin', 'created_at']
+
+def facet_search(collection, match, filters, skip, limit, fields, facets):
+    """Ranked text search with facet counts in a single aggregation.
+
+    ``match`` must contain the ``$text`` clause. ``filters`` narrow the
+    results and total, while facet counts cover every text match so clients
+    can show how many hits each other facet value would give.
+    """
+    results_pipeline = [
+        {'$match': filters},
+        {'$sort': {'score': -1, '_id': 1}},
+        {'$skip': skip},
+        {'$limit': limit},
+        {'$project': {**{field: 1 for field in fields}, 'score': 1}}
+    ]
+    pipeline = [
+        {'$match': match},
+        {'$addFields': {'score': {'$meta': 'textScore'}}},
+        {'$facet': {
+            'results': results_pipeline,
+            'total': [{'$match': filters}, {'$count': 'count'}],
+            **facets
+        }}
+    ]
+    data = next(collection.aggregate(pipeline), {})
+    total = data.pop('total', [])
+    response = {
+        'total': total[0]['count'] if total else 0,
+        'results': data.pop('results', []),
+        'facets': {
+            name: [{'value': bucket['_id'], 'count': bucket['count']} for bucket in buckets]
+            for name, buckets in data.items()
+        }
+    }
+    return response
+
+def search_videos(q, args, skip, limit):
+    filters = {}
+    if args.get('type'):
+        filters['type'] = args['type']
+    if args.get('playlistId'):
+        filters['playlistId'] = args['playlistId']
+    facets = {
+        'type': [{'$sortByCount': '$type'}, {'$limit': FACET_LIMIT}],
+        'playlistId': [{'$sortByCount': '$playlistId'}, {'$limit': FACET_LIMIT}]
+    }
+    return facet_search(get_videos_collection(), {'$text': {'$search': q}}, filters, skip, limit, VIDEO_FIELDS, facets)
+
+def search_projects(q, args, skip, limit):
+    filters = {}
+    if args.get('tech'):
+        filters['tech_stack'] = args['tech']
+    facets = {
+        'tech_stack': [{'$unwind': '$tech_stack'}, {'$sortByCount': '$tech_stack'}, {'$limit': FACET_LIMIT}]
+    }
+    match = {'$text': {'$search': q}, 'status': 'approved'}
+    return facet_search(get_projects_collection(), match, filters, skip, limit, PROJECT_FIELDS, facets)
+
+@conditional_response('videos', 'projects')
+@cached_response('videos', 'projects')
+def search_service(request):
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return json_response({'error': 'Query parameter q is required'}), 400
+    scope = request.args.get('scope', 'all')
+    if scope not in ('all', 'videos', 'projects'):
+        return json_response({'error': 'scope must be one of: all, videos, projects'}), 400
+    try:
+        page = int(request.args.get('page', 1))
+        limit = int(request.args.get('limit', SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        return json_response({'error': 'page and limit must be integers'}), 400
+    if page < 1 or not 1 <= limit <= SEARCH_MAX_LIMIT:
+        return json_response({'error': f'page must be >= 1 and limit between 1 and {SEARCH_MAX_LIMIT}'}), 400
+    skip = (page - 1) * limit
+    result = {'query': q, 'page': page, 'limit': limit}
+    if scope in ('all', 'videos'):
+        result['videos'] = search_videos(q, request.args, skip, limit)
+    if scope in ('all', 'projects'):
+        result['projects'] = search_projects(q, request.args, skip, limit)
+    return json_response(result)
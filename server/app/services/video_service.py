@@ -1,27 +1,122 @@
-from flask import jsonify, request
+from datetime import datetime, timedelta, timezone
+from flask import request, Response, current_app
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from werkzeug.http import parse_date
+from app.utils.serialization import json_response, dumps
+from app.middlewares.auth import require_admin_token
 from app.utils.mongo import get_videos_collection
+from app.utils.cache import cached_response, conditional_response
+from app.utils.embeddings import get_video_index
+from app.utils.pagination import parse_page_args, find_page, add_next_page_headers, hide_fields
 
+# Internal fields never sent to clients
+HIDDEN_VIDEO_FIELDS = ('embedding',)
+
+EXPORT_BATCH_SIZE = 500
+MAX_EXPORT_BATCH_SIZE = 5000
+# The returned watermark trails the request by this much, covering writes in
+# flight during the export and clock skew between the app and the database
+EXPORT_WATERMARK_LAG = timedelta(seconds=60)
+RELATED_DEFAULT_LIMIT = 10
+RELATED_MAX_LIMIT = 50
+RELATED_FIELDS = ['title', 'videoId', 'type', 'playlistId', 'duration', 'youtubeUrl', 'tags', 'publishedAt']
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 or HTTP date into a naive UTC datetime; None if invalid."""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = parse_date(value)
+    if parsed is None:
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@conditional_response('videos')
+@cached_response('videos')
 def get_videos_service(request):
+    try:
+        limit, after, projection = parse_page_args(request.args)
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
     playlist_id = request.args.get('playlistId')
     videos_collection = get_videos_collection()
     if playlist_id:
         query = {'playlistId': playlist_id}
     else:
         query = {'type': 'concept'}
-    videos = list(videos_collection.find(query))
-    for video in videos:
-        video['_id'] = str(video['_id'])
-    return jsonify(videos)
+    projection = hide_fields(projection, HIDDEN_VIDEO_FIELDS)
+    videos, next_after = find_page(videos_collection, query, limit, after, projection)
+    return add_next_page_headers(json_response(videos), request, next_after)
 
 def get_video_by_mongo_id_service(request, mongo_id):
     from bson.objectid import ObjectId
     videos_collection = get_videos_collection()
     try:
-        video = videos_collection.find_one({'_id': ObjectId(mongo_id)})
+        video = videos_collection.find_one({'_id': ObjectId(mongo_id)}, hide_fields(None, HIDDEN_VIDEO_FIELDS))
         if video:
-            video['_id'] = str(video['_id'])
-            return jsonify(video)
+            return json_response(video)
         else:
-            return jsonify({'error': 'Video not found'}), 404
+            return json_response({'error': 'Video not found'}), 404
     except Exception as e:
-        return jsonify({'error': f'Invalid id: {e}'}), 400 
\ No newline at end of file
+        return json_response({'error': f'Invalid id: {e}'}), 400
+
+@conditional_response('videos')
+@cached_response('videos')
+def get_related_videos_service(request, mongo_id):
+    try:
+        video_id = ObjectId(mongo_id)
+    except (InvalidId, TypeError) as e:
+        return json_response({'error': f'Invalid id: {e}'}), 400
+    try:
+        limit = int(request.args.get('limit', RELATED_DEFAULT_LIMIT))
+    except ValueError:
+        return json_response({'error': 'limit must be an integer'}), 400
+    if not 1 <= limit <= RELATED_MAX_LIMIT:
+        return json_response({'error': f'limit must be between 1 and {RELATED_MAX_LIMIT}'}), 400
+    videos_collection = get_videos_collection()
+    index = get_video_index(videos_collection, current_app.config.get('RELATED_INDEX_REFRESH_SEC', 30))
+    neighbours = index.related(video_id, limit)
+    if neighbours is None:
+        if not videos_collection.find_one({'_id': video_id}, {'_id': 1}):
+            return json_response({'error': 'Video not found'}), 404
+        # Not summarized (so not embedded) yet
+        neighbours = []
+    scores = dict(neighbours)
+    docs = {doc['_id']: doc for doc in videos_collection.find({'_id': {'$in': list(scores)}}, RELATED_FIELDS)}
+    related = [{**docs[doc_id], 'score': round(score, 4)} for doc_id, score in neighbours if doc_id in docs]
+    return json_response(related)
+
+def export_videos_service(request):
+    auth = require_admin_token(request)
+    if auth:
+        return auth
+    query = {}
+    updated_since = request.args.get('updated_since')
+    if updated_since:
+        since = parse_timestamp(updated_since)
+        if since is None:
+            return json_response({'error': 'updated_since must be an ISO 8601 or HTTP date'}), 400
+        # Inclusive, so documents written in the same instant as the last sync are not missed
+        query['updated_at'] = {'$gte': since}
+    try:
+        batch_size = int(request.args.get('batch_size', EXPORT_BATCH_SIZE))
+    except ValueError:
+        return json_response({'error': 'batch_size must be an integer'}), 400
+    batch_size = max(1, min(batch_size, MAX_EXPORT_BATCH_SIZE))
+    # Consumers pass this back as updated_since on their next sync; documents
+    # inside the lag window are sent again then, so they must upsert by _id.
+    watermark = (datetime.utcnow() - EXPORT_WATERMARK_LAG).isoformat() + 'Z'
+    cursor = get_videos_collection().find(query, hide_fields(None, HIDDEN_VIDEO_FIELDS)).sort([('updated_at', 1), ('_id', 1)]).batch_size(batch_size)
+
+    def generate():
+        # Only one server-side batch is held in memory at a time.
+        try:
+            for video in cursor:
+                yield dumps(video) + b'\n'
+        finally:
+            cursor.close()
+
+    return Response(generate(), mimetype='application/x-ndjson', headers={'X-Export-Watermark': watermark})
@@ -0,0 +1,51 @@
+from pymongo import AsyncMongoClient
+import os
+from dotenv import load_dotenv
+from app.utils import mongo
+from app.utils.metrics import mongo_command_metrics
+
+# Async counterpart of app/utils/mongo.py for the ASGI serving mode. It uses
+# the same Config settings and pool counters; only the driver API differs.
+
+async_mongo_client = None
+_client_pid = None
+
+
+def get_async_client():
+    """The process-wide AsyncMongoClient, created lazily and again after a fork.
+
+    It binds to the event loop it is first used on, i.e. the ASGI worker's.
+    """
+    global async_mongo_client, _client_pid
+    pid = os.getpid()
+    if async_mongo_client is None or _client_pid != pid:
+        if mongo._settings is None:
+            load_dotenv()
+            mongo._settings = mongo._load_settings()
+        uri = mongo._settings['MONGO_URI'] or os.getenv("MONGO_URI")
+        mongo.pool_stats.reset()
+        async_mongo_client = AsyncMongoClient(
+            uri,
+            connect=False,
+            event_listeners=[mongo.pool_stats, mongo_command_metrics],
+            **mongo._client_options(mongo._settings)
+        )
+        _client_pid = pid
+    return async_mongo_client
+
+# Collection getters
+
+def get_async_db():
+    return get_async_client()[mongo._settings['MONGO_DB_NAME'] or 'genai']
+
+def get_async_videos_collection():
+    return get_async_db()['videos']
+
+def get_async_playlists_collection():
+    return get_async_db()['playlists']
+
+def get_async_projects_collection():
+    return get_async_db()['projects']
+
+def get_async_versions_collection():
+    return get_async_db()['collection_versions']
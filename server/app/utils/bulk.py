@@ -0,0 +1,45 @@
+import logging
+import threading
+from pymongo.errors import BulkWriteError
+
+
+class BulkWriter:
+    """Thread-safe buffer of write operations flushed with unordered bulk_write.
+
+    Each op may carry a ``key``; after a flush, ``on_flush`` is called with the
+    keys of the ops that were written successfully.
+    """
+
+    def __init__(self, collection, batch_size=100, on_flush=None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self._ops = []
+        self._lock = threading.Lock()
+
+    def add(self, op, key=None):
+        with self._lock:
+            self._ops.append((op, key))
+            if len(self._ops) < self.batch_size:
+                return
+            ops, self._ops = self._ops, []
+        self._write(ops)
+
+    def flush(self):
+        with self._lock:
+            ops, self._ops = self._ops, []
+        if ops:
+            self._write(ops)
+
+    def _write(self, ops):
+        failed = set()
+        try:
+            result = self.collection.bulk_write([op for op, _ in ops], ordered=False)
+            print(f"Bulk write to {self.collection.name}: {result.upserted_count} upserted, {result.modified_count} modified.")
+        except BulkWriteError as e:
+            # Unordered writes keep going past individual failures; just report them.
+            errors = e.details.get('writeErrors', [])
+            failed = {err['index'] for err in errors}
+            logging.error(f"Bulk write to {self.collection.name} had errors: {errors}")
+        if self.on_flush:
+            self.on_flush([key for i, (_, key) in enumerate(ops) if i not in failed])
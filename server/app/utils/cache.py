@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from flask import current_app, request
+from pymongo import ReturnDocument
+from app.utils.mongo import get_versions_collection
+from app.utils.metrics import REGISTRY
+
+
+class LRUCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# --- Collection version stamps ---
+# Every write path bumps the version of the collection it touched. Versions
+# live in Mongo so writes from other processes (the ingest CLI, other
+# gunicorn workers) are seen here within CACHE_VERSION_POLL_SEC.
+
+_versions = {}
+_versions_checked_at = 0.0
+_versions_lock = threading.Lock()
+
+
+def _store_version(doc):
+    _versions[doc['_id']] = {'version': doc['version'], 'updated_at': doc['updated_at']}
+
+
+def bump_version(name):
+    """Record a write to collection ``name``, invalidating everything cached from it."""
+    try:
+        doc = get_versions_collection().find_one_and_update(
+            {'_id': name},
+            {'$inc': {'version': 1}, '$set': {'updated_at': datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except Exception as e:
+        logging.error(f"Failed to bump version of {name}: {e}")
+        return
+    with _versions_lock:
+        _store_version(doc)
+
+
+async def bump_version_async(name):
+    """bump_version for the async serving mode; sync workers see it on their next poll."""
+    # Imported here so the sync app never loads the async driver
+    from app.utils.async_mongo import get_async_versions_collection
+    try:
+        await get_async_versions_collection().update_one(
+            {'_id': name},
+            {'$inc': {'version': 1}, '$set': {'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        logging.error(f"Failed to bump version of {name}: {e}")
+
+
+def get_versions(names, poll_interval=2):
+    """Current ``{'version', 'updated_at'}`` stamps of ``names``, refreshed at most every ``poll_interval`` seconds."""
+    global _versions_checked_at
+    with _versions_lock:
+        if time.monotonic() - _versions_checked_at >= poll_interval:
+            for doc in get_versions_collection().find({}):
+                _store_version(doc)
+            _versions_checked_at = time.monotonic()
+        return [_versions.get(name, {'version': 0, 'updated_at': None}) for name in names]
+
+
+# --- Response cache ---
+
+_response_cache = None
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        config = current_app.config
+        _response_cache = LRUCache(config.get('CACHE_MAX_ENTRIES', 1024), config.get('CACHE_TTL_SEC', 300))
+    return _response_cache
+
+
+def _cache_stat(func):
+    return lambda: func(_response_cache) if _response_cache is not None else 0
+
+
+REGISTRY.gauge('response_cache_hits', 'Response cache hits since start.', _cache_stat(lambda c: c.hits))
+REGISTRY.gauge('response_cache_misses', 'Response cache misses since start.', _cache_stat(lambda c: c.misses))
+REGISTRY.gauge('response_cache_entries', 'Responses currently cached.', _cache_stat(len))
+REGISTRY.gauge(
+    'response_cache_hit_ratio', 'Response cache hits / lookups since start.',
+    _cache_stat(lambda c: c.hits / (c.hits + c.misses) if c.hits + c.misses else 0.0)
+)
+
+
+def _store_when_sent(chunks, store):
+    """Pass a streamed body through, then hand the whole of it to ``store``.
+
+    Nothing is stored if the client disconnects before the last chunk.
+    """
+    sent = []
+    for chunk in chunks:
+        sent.append(chunk)
+        yield chunk
+    store(b''.join(sent))
+
+
+def cached_response(*collections):
+    """Cache a GET service's 200 responses, keyed by route, query args and the
+    versions of the ``collections`` it reads from.
+
+    Streamed bodies (large lists, see serialization.json_response) are still
+    streamed on a miss and cached once fully sent.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('CACHE_ENABLED', True):
+                return func(*args, **kwargs)
+            try:
+                versions = get_versions(collections, current_app.config.get('CACHE_VERSION_POLL_SEC', 2))
+            except Exception as e:
+                logging.error(f"Response cache disabled for this request: {e}")
+                return func(*args, **kwargs)
+            key = (
+                request.path,
+                tuple(sorted(request.args.items(multi=True))),
+                tuple(v['version'] for v in versions)
+            )
+            cache = get_response_cache()
+            hit = cache.get(key)
+            if hit is not None:
+                body, status, headers = hit
+                response = current_app.response_class(body, status=status, headers=headers)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+            response = current_app.make_response(func(*args, **kwargs))
+            if response.status_code == 200:
+                headers = [(k, v) for k, v in response.headers if k.lower() not in ('content-length', 'set-cookie')]
+                if response.is_streamed:
+                    response.response = _store_when_sent(
+                        response.response, lambda body: cache.set(key, (body, 200, headers))
+                    )
+                else:
+                    cache.set(key, (response.get_data(), response.status_code, headers))
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_response(*collections):
+    """Add strong ETag / Last-Modified headers derived from collection versions.
+
+    The ETag is a hash of the route, query args and the versions of the
+    ``collections`` the service reads, so it changes exactly when the data
+    can. ``If-None-Match`` (or, failing that, ``If-Modified-Since``) is
+    answered with 304 before the service, and so MongoDB, is called at all.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                versions = get_versions(collections, current_app.config.get('CACHE_VERSION_POLL_SEC', 2))
+            except Exception as e:
+                logging.error(f"Conditional GET disabled for this request: {e}")
+                return func(*args, **kwargs)
+            stamp = repr((
+                request.path,
+                sorted(request.args.items(multi=True)),
+                [(name, v['version']) for name, v in zip(collections, versions)]
+            ))
+            etag = hashlib.sha1(stamp.encode('utf-8')).hexdigest()
+            modified = [v['updated_at'] for v in versions if v['updated_at']]
+            # HTTP dates have one-second resolution
+            last_modified = max(modified).replace(microsecond=0) if modified else None
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = bool(since and last_modified and last_modified <= since.replace(tzinfo=None))
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            # Let browsers keep the body but revalidate it on every use.
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
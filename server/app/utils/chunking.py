@@ -0,0 +1,137 @@
+import logging
+import math
+import os
+import re
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def approximate_token_count(text):
+    """Offline estimate of how many BPE tokens ``text`` encodes to.
+
+    Punctuation marks count as one token each. Common ASCII words up to ~7
+    characters are a single token and longer ones gain one per ~5 characters.
+    Other scripts (e.g. Hindi transcripts) split into far more tokens, so they
+    count one per ~2 characters.
+    """
+    tokens = 0
+    for piece in _TOKEN_RE.findall(text):
+        if piece.isascii():
+            tokens += max(1, math.ceil((len(piece) - 2) / 5))
+        else:
+            tokens += math.ceil(len(piece) / 2)
+    return tokens
+
+
+def _tiktoken_counter():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        encoding = tiktoken.get_encoding(os.getenv("TIKTOKEN_ENCODING", "cl100k_base"))
+    except Exception as e:
+        # The encoding file is downloaded on first use, which fails offline.
+        logging.error(f"tiktoken unavailable, using approximate token counts: {e}")
+        return None
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+_token_counter = None
+
+
+def set_token_counter(counter):
+    """Replace the function used to count tokens (None restores the default)."""
+    global _token_counter
+    _token_counter = counter
+
+
+def count_tokens(text):
+    """Count tokens with the configured counter.
+
+    TOKEN_COUNTER=tiktoken uses tiktoken when it is installed; anything else,
+    or a missing tiktoken, falls back to approximate_token_count.
+    """
+    global _token_counter
+    if _token_counter is None:
+        counter = None
+        if os.getenv("TOKEN_COUNTER", "approximate") == "tiktoken":
+            counter = _tiktoken_counter()
+        _token_counter = counter or approximate_token_count
+    return _token_counter(text)
+
+
+def _segment_fields(segment):
+    # Transcript segments are dicts from older youtube-transcript-api
+    # releases and snippet objects from newer ones.
+    if isinstance(segment, dict):
+        return segment.get("text", ""), segment.get("start", 0.0), segment.get("duration", 0.0)
+    return segment.text, segment.start, segment.duration
+
+
+def _split_long_segment(text, start, duration, max_tokens):
+    """Break a single oversized segment on word boundaries, spreading its duration."""
+    words = text.split()
+    total = len(words) or 1
+    piece, piece_tokens, first = [], 0, 0
+    for i, word in enumerate(words):
+        word_tokens = count_tokens(word)
+        if piece and piece_tokens + word_tokens > max_tokens:
+            yield " ".join(piece), start + duration * first / total, duration * (i - first) / total, piece_tokens
+            piece, piece_tokens, first = [], 0, i
+        piece.append(word)
+        piece_tokens += word_tokens
+    if piece:
+        yield " ".join(piece), start + duration * first / total, duration * (total - first) / total, piece_tokens
+
+
+def iter_transcript_chunks(segments, max_tokens, overlap_tokens=0):
+    """Stream transcript segments into chunks of at most ``max_tokens`` tokens.
+
+    Chunks only break between segments, so each one maps to a
+    ``start``/``end`` time range of the video. Consecutive chunks share up to
+    ``overlap_tokens`` tokens of trailing segments. ``segments`` may be any
+    iterable; only the segments of the chunk being built are held in memory.
+    Yields dicts with ``text``, ``start``, ``end`` and ``tokens``.
+    """
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    window = []  # (text, start, end, tokens)
+    window_tokens = 0
+    fresh = False  # whether the window holds anything not already emitted
+
+    def emit():
+        return {
+            "text": " ".join(item[0] for item in window),
+            "start": window[0][1],
+            "end": window[-1][2],
+            "tokens": window_tokens,
+        }
+
+    for segment in segments:
+        text, start, duration = _segment_fields(segment)
+        text = " ".join(text.split())
+        if not text:
+            continue
+        tokens = count_tokens(text)
+        if tokens > max_tokens:
+            pieces = _split_long_segment(text, start, duration, max_tokens)
+        else:
+            pieces = [(text, start, duration, tokens)]
+        for piece_text, piece_start, piece_duration, piece_tokens in pieces:
+            if fresh and window_tokens + piece_tokens > max_tokens:
+                yield emit()
+                # Keep the trailing segments that fit in the overlap budget.
+                kept, kept_tokens = [], 0
+                for item in reversed(window):
+                    if kept_tokens + item[3] > overlap_tokens:
+                        break
+                    kept.insert(0, item)
+                    kept_tokens += item[3]
+                window, window_tokens, fresh = kept, kept_tokens, False
+            while window and window_tokens + piece_tokens > max_tokens:
+                window_tokens -= window.pop(0)[3]
+            window.append((piece_text, piece_start, piece_start + piece_duration, piece_tokens))
+            window_tokens += piece_tokens
+            fresh = True
+    if fresh:
+        yield emit()
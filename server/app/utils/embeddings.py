@@ -0,0 +1,175 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+from bson.binary import Binary
+
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", 512))
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def hashing_vectorize(text, dim=EMBEDDING_DIM):
+    """Offline embedding of ``text``: signed feature hashing of words and word pairs.
+
+    Counts are dampened with log1p and the vector is L2-normalised, so dot
+    products are cosine similarities.
+    """
+    words = [word for word in _WORD_RE.findall(text.lower()) if len(word) > 2]
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[digest % dim] += 1.0 if digest >> 63 else -1.0
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _sentence_transformer_embedder():
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    try:
+        model = SentenceTransformer(name)
+    except Exception as e:
+        # Model weights are downloaded on first use, which fails offline.
+        logging.error(f"Embedding model {name} unavailable, using hashing vectorizer: {e}")
+        return None
+    embedder = lambda text: model.encode(text, normalize_embeddings=True).astype(np.float32)
+    return f"st:{name}", embedder
+
+
+_embedder = None
+
+
+def set_embedder(name, embedder):
+    """Replace the embedding function; ``embedder`` maps text to a unit vector (None restores the default)."""
+    global _embedder
+    _embedder = (name, embedder) if embedder else None
+
+
+def get_embedder():
+    """``(model_name, embed)`` for the configured backend.
+
+    EMBEDDING_BACKEND=sentence-transformers uses a local model when the
+    package is installed; anything else, or a missing package, falls back to
+    hashing_vectorize. The name is stored next to each vector so vectors from
+    different backends are never compared.
+    """
+    global _embedder
+    if _embedder is None:
+        embedder = None
+        if os.getenv("EMBEDDING_BACKEND", "hashing") == "sentence-transformers":
+            embedder = _sentence_transformer_embedder()
+        _embedder = embedder or (f"hashing:{EMBEDDING_DIM}", hashing_vectorize)
+    return _embedder
+
+
+def embed_video(video):
+    """Fields to store on a video document: its embedding and the model that made it."""
+    name, embed = get_embedder()
+    text = f"{video.get('title', '')}\n{video.get('summary', '')}"
+    return {"embedding": encode_vector(embed(text)), "embedding_model": name}
+
+
+def encode_vector(vector):
+    # float32 bytes are a quarter the size of a BSON array of doubles.
+    return Binary(np.asarray(vector, dtype=np.float32).tobytes())
+
+
+def decode_vector(data):
+    return np.frombuffer(data, dtype=np.float32)
+
+
+class VectorIndex:
+    """In-memory nearest-neighbour index over the ``embedding`` field of a collection.
+
+    The first query loads every vector; after that, at most every
+    ``refresh_interval`` seconds, only documents whose ``updated_at`` moved
+    past the last one seen are re-read, so new ingests show up without a
+    full reload. Each refresh re-reads the last ``overlap`` seconds too, so a
+    write committed late with a slightly older stamp (another worker, clock
+    skew) is still picked up.
+    """
+
+    def __init__(self, collection, model, refresh_interval=30, overlap=60):
+        self.collection = collection
+        self.model = model
+        self.refresh_interval = refresh_interval
+        self.overlap = timedelta(seconds=overlap)
+        self._ids = []
+        self._positions = {}
+        self._matrix = None
+        self._watermark = None
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._refreshed_at is not None and now - self._refreshed_at < self.refresh_interval:
+                return
+            query = {"embedding_model": self.model}
+            if self._watermark is not None:
+                query["updated_at"] = {"$gte": self._watermark - self.overlap}
+            projection = {"embedding": 1, "updated_at": 1}
+            rows = []
+            for doc in self.collection.find(query, projection).sort([("updated_at", 1), ("_id", 1)]):
+                rows.append((doc["_id"], decode_vector(doc["embedding"])))
+                if doc.get("updated_at") and (self._watermark is None or doc["updated_at"] > self._watermark):
+                    self._watermark = doc["updated_at"]
+            self._add(rows)
+            self._refreshed_at = now
+
+    def _add(self, rows):
+        new_ids, new_vectors = [], []
+        for doc_id, vector in rows:
+            position = self._positions.get(doc_id)
+            if position is not None:
+                self._matrix[position] = vector
+                continue
+            self._positions[doc_id] = len(self._ids) + len(new_ids)
+            new_ids.append(doc_id)
+            new_vectors.append(vector)
+        if new_ids:
+            block = np.vstack(new_vectors)
+            self._matrix = block if self._matrix is None else np.vstack([self._matrix, block])
+            self._ids.extend(new_ids)
+
+    def related(self, doc_id, k=10):
+        """The ``k`` nearest documents to ``doc_id`` as ``[(id, score)]``; None if it has no vector."""
+        self.refresh()
+        with self._lock:
+            position = self._positions.get(doc_id)
+            if position is None:
+                return None
+            scores = self._matrix @ self._matrix[position]
+            ids = list(self._ids)
+        scores[position] = -np.inf
+        k = min(k, len(ids) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top]
+
+
+_video_index = None
+_video_index_lock = threading.Lock()
+
+
+def get_video_index(collection, refresh_interval=30):
+    global _video_index
+    with _video_index_lock:
+        if _video_index is None:
+            _video_index = VectorIndex(collection, get_embedder()[0], refresh_interval)
+        return _video_index
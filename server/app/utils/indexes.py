@@ -0,0 +1,101 @@
+import logging
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+# Every index the API relies on, by collection. Indexes are matched by name
+# (PyMongo's default <field>_<direction> unless given), so existing indexes
+# are recognised. ingest_jobs and llm_cache manage their own indexes
+# (JobQueue.ensure_indexes, LLMCache) and are not listed.
+INDEXES = {
+    'videos': [
+        # Unique videoId lets ingest upsert in bulk without duplicate checks
+        IndexModel([('videoId', ASCENDING)], unique=True),
+        # Keyset pagination over the listing filters
+        IndexModel([('type', ASCENDING), ('_id', ASCENDING)]),
+        IndexModel([('playlistId', ASCENDING), ('_id', ASCENDING)]),
+        # Incremental export and related-index refresh by updated_at
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)]),
+        # Full-text search, ranked by weighted field matches
+        IndexModel(
+            [('title', TEXT), ('tags', TEXT), ('summary', TEXT)],
+            name='videos_text',
+            weights={'title': 10, 'tags': 5, 'summary': 1}
+        ),
+    ],
+    'playlists': [
+        IndexModel([('active', ASCENDING)]),
+        # Playlists may be added without an id, so only non-empty ids must be unique
+        IndexModel(
+            [('playlistId', ASCENDING)],
+            unique=True,
+            partialFilterExpression={'playlistId': {'$type': 'string', '$gt': ''}}
+        ),
+        IndexModel([('name', ASCENDING)], unique=True),
+    ],
+    'projects': [
+        IndexModel([('status', ASCENDING)]),
+        IndexModel([('github_url', ASCENDING)], unique=True),
+        IndexModel([('title', ASCENDING)], unique=True),
+        IndexModel(
+            [('title', TEXT), ('tech_stack', TEXT), ('description', TEXT)],
+            name='projects_text',
+            weights={'title': 10, 'tech_stack': 5, 'description': 1}
+        ),
+    ],
+}
+
+# Index options compared when deciding whether an existing index still matches
+_COMPARED_OPTIONS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds', 'weights')
+
+
+def _normalise(spec):
+    """Comparable form of an IndexModel document or an index_information() entry."""
+    key = spec['key']
+    key = list(key.items()) if hasattr(key, 'items') else list(key)
+    options = {name: spec[name] for name in _COMPARED_OPTIONS if spec.get(name) not in (None, False)}
+    if 'weights' in options:
+        # Text indexes report their key as _fts/_ftsx; the weights name the fields.
+        key = []
+        options['weights'] = dict(options['weights'])
+    return key, options
+
+
+def sync_indexes(db, drop_unknown=False, dry_run=False):
+    """Bring the indexes of ``db`` in line with INDEXES.
+
+    Missing indexes are created and indexes whose definition changed are
+    rebuilt. Indexes not in the registry are dropped only with
+    ``drop_unknown``. Returns ``{'created': [...], 'rebuilt': [...],
+    'dropped': [...], 'failed': [...]}`` of ``collection.index`` names.
+    """
+    report = {'created': [], 'rebuilt': [], 'dropped': [], 'failed': []}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = collection.index_information()
+        wanted = {model.document['name']: model for model in models}
+        for name, model in wanted.items():
+            label = f'{collection_name}.{name}'
+            current = existing.get(name)
+            if current is not None and _normalise(current) == _normalise(model.document):
+                continue
+            action = 'created' if current is None else 'rebuilt'
+            if dry_run:
+                report[action].append(label)
+                continue
+            try:
+                if current is not None:
+                    collection.drop_index(name)
+                collection.create_indexes([model])
+                report[action].append(label)
+            except OperationFailure as e:
+                # e.g. existing duplicates block a new unique index
+                logging.error(f"Could not build index {label}: {e}")
+                report['failed'].append(label)
+        if drop_unknown:
+            for name in existing:
+                if name == '_id_' or name in wanted:
+                    continue
+                if not dry_run:
+                    collection.drop_index(name)
+                report['dropped'].append(f'{collection_name}.{name}')
+    return report
@@ -0,0 +1,170 @@
+import logging
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Job states, in the order a video moves through them
+PENDING = "pending"
+DETAILS_FETCHED = "details_fetched"
+TRANSCRIBED = "transcribed"
+CHUNKS_SUMMARIZED = "chunks_summarized"
+DONE = "done"
+# Terminal states for videos that will not be summarized
+SKIPPED = "skipped"
+FAILED = "failed"
+
+ACTIVE_STATES = [PENDING, DETAILS_FETCHED, TRANSCRIBED, CHUNKS_SUMMARIZED]
+
+
+class JobQueue:
+    """Durable per-video ingest jobs stored in a Mongo collection.
+
+    Each job is keyed by its videoId and carries every intermediate result
+    (details, type, transcript chunks, chunk summaries, final summary), so a
+    restarted worker resumes from the last checkpoint instead of repeating
+    API calls.
+
+    Workers claim jobs with an expiring lease (``lease_owner`` and
+    ``lease_expires_at``) and must renew it while they work. Writes are
+    scoped to jobs this worker still holds, so a worker whose lease expired
+    cannot clobber the worker that took over.
+    """
+
+    def __init__(self, collection, max_attempts=3, worker_id=None, lease_seconds=300, retry_delay=60):
+        self.collection = collection
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+
+    def _owned(self, query):
+        if self.worker_id:
+            query["lease_owner"] = self.worker_id
+        return query
+
+    def ensure_indexes(self):
+        self.collection.create_index([("state", ASCENDING), ("created_at", ASCENDING)])
+
+    def known_ids(self, job_ids):
+        if not job_ids:
+            return set()
+        return {doc["_id"] for doc in self.collection.find({"_id": {"$in": job_ids}}, {"_id": 1})}
+
+    def enqueue(self, jobs):
+        """Insert new pending jobs; jobs whose videoId is already queued are ignored."""
+        if not jobs:
+            return 0
+        now = datetime.utcnow()
+        docs = [
+            {**job, "state": PENDING, "attempts": 0, "lease_owner": None, "lease_expires_at": None,
+             "created_at": now, "updated_at": now}
+            for job in jobs
+        ]
+        try:
+            return len(self.collection.insert_many(docs, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            unexpected = [err for err in errors if err.get("code") != 11000]
+            if unexpected:
+                logging.error(f"Failed to enqueue ingest jobs: {unexpected}")
+            return e.details.get("nInserted", 0)
+
+    def _claimable(self, now):
+        return {
+            "state": {"$in": ACTIVE_STATES},
+            "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}]
+        }
+
+    def candidates(self, limit=0):
+        """Unfinished jobs nobody holds, oldest first, with the fields the scheduler plans from."""
+        return list(self.collection.find(
+            self._claimable(datetime.utcnow()),
+            {"state": 1, "playlistId": 1, "created_at": 1, "type": 1, "video.publishedAt": 1,
+             "details.duration_sec": 1, "transcript_tokens": 1},
+            sort=[("created_at", ASCENDING)],
+            limit=limit
+        ))
+
+    def claim(self, job_id=None):
+        """Atomically lease an unfinished job nobody holds; returns its id or None.
+
+        Takes the oldest such job, or ``job_id`` if given and still claimable.
+        """
+        now = datetime.utcnow()
+        query = self._claimable(now)
+        if job_id is not None:
+            query["_id"] = job_id
+        doc = self.collection.find_one_and_update(
+            query,
+            {"$set": {"lease_owner": self.worker_id, "lease_expires_at": now + timedelta(seconds=self.lease_seconds)}},
+            projection={"_id": 1},
+            sort=[("created_at", ASCENDING)]
+        )
+        return doc["_id"] if doc else None
+
+    def heartbeat(self):
+        """Extend the lease of every job this worker holds."""
+        self.collection.update_many(
+            {"lease_owner": self.worker_id, "state": {"$in": ACTIVE_STATES}},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+        )
+
+    def load(self, job_ids):
+        return {doc["_id"]: doc for doc in self.collection.find({"_id": {"$in": job_ids}})}
+
+    def update(self, job_id, fields=None, state=None):
+        update = {"updated_at": datetime.utcnow(), **(fields or {})}
+        if state:
+            update["state"] = state
+        self.collection.update_one(self._owned({"_id": job_id}), {"$set": update})
+
+    def set_state(self, job_ids, state):
+        """Move many jobs to ``state``; finished jobs also drop their transcript chunks."""
+        if not job_ids:
+            return
+        update = {"$set": {"state": state, "updated_at": datetime.utcnow()}}
+        if state not in ACTIVE_STATES:
+            update["$set"].update({"lease_owner": None, "lease_expires_at": None})
+            update["$unset"] = {"chunks": ""}
+        self.collection.bulk_write([UpdateOne(self._owned({"_id": job_id}), update) for job_id in job_ids], ordered=False)
+
+    def defer(self, job_id, reason):
+        """Hand a job back without using up an attempt.
+
+        For failures that are not the video's fault (API quota, outages,
+        exhausted retries); like a failure, the job is blocked for
+        ``retry_delay`` seconds before it can be claimed again.
+        """
+        now = datetime.utcnow()
+        self.collection.update_one(
+            self._owned({"_id": job_id}),
+            {"$set": {
+                "error": str(reason),
+                "updated_at": now,
+                "lease_owner": None,
+                "lease_expires_at": now + timedelta(seconds=self.retry_delay)
+            }}
+        )
+
+    def record_failure(self, job_id, error):
+        """Count a failed attempt; returns True once the job has run out of attempts.
+
+        The lease is handed back but kept blocked for ``retry_delay`` seconds
+        so the job is not immediately reclaimed and failed again.
+        """
+        now = datetime.utcnow()
+        doc = self.collection.find_one_and_update(
+            self._owned({"_id": job_id}),
+            {"$inc": {"attempts": 1}, "$set": {
+                "error": str(error),
+                "updated_at": now,
+                "lease_owner": None,
+                "lease_expires_at": now + timedelta(seconds=self.retry_delay)
+            }},
+            projection={"attempts": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc and doc["attempts"] >= self.max_attempts:
+            self.collection.update_one({"_id": job_id}, {"$set": {"state": FAILED}, "$unset": {"chunks": ""}})
+            return True
+        return False
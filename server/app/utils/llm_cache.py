@@ -0,0 +1,88 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+from app.utils.metrics import llm_cache_requests
+
+
+def cache_key(model_url, prompt):
+    """Content address of an LLM request: sha256 of the model URL and prompt."""
+    return hashlib.sha256(f"{model_url}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Persistent LLM response cache stored in a Mongo collection.
+
+    Entries expire through a TTL index on ``created_at``; once the collection
+    grows past ``max_entries`` the least recently used entries are evicted.
+    Cache failures are logged and treated as misses so they never break ingest.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(self, collection, ttl_seconds, max_entries):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+
+    def _ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        try:
+            self.collection.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+            self.collection.create_index([("last_used", ASCENDING)])
+        except Exception as e:
+            logging.error(f"Could not create LLM cache indexes: {e}")
+        self._indexes_ready = True
+
+    def get(self, model_url, prompt):
+        key = cache_key(model_url, prompt)
+        try:
+            self._ensure_indexes()
+            doc = self.collection.find_one_and_update(
+                {"_id": key, "created_at": {"$gt": datetime.utcnow() - timedelta(seconds=self.ttl_seconds)}},
+                {"$set": {"last_used": datetime.utcnow()}},
+                projection={"response": 1}
+            )
+        except Exception as e:
+            logging.error(f"LLM cache lookup failed: {e}")
+            return None
+        llm_cache_requests.inc(result='hit' if doc else 'miss')
+        return doc["response"] if doc else None
+
+    def set(self, model_url, prompt, response):
+        key = cache_key(model_url, prompt)
+        now = datetime.utcnow()
+        try:
+            self._ensure_indexes()
+            self.collection.update_one(
+                {"_id": key},
+                {"$set": {"model_url": model_url, "response": response, "created_at": now, "last_used": now}},
+                upsert=True
+            )
+        except Exception as e:
+            logging.error(f"LLM cache write failed: {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries beyond ``max_entries``."""
+        try:
+            excess = self.collection.estimated_document_count() - self.max_entries
+            if excess <= 0:
+                return
+            stale = self.collection.find({}, {"_id": 1}).sort("last_used", ASCENDING).limit(excess)
+            ids = [doc["_id"] for doc in stale]
+            if ids:
+                self.collection.delete_many({"_id": {"$in": ids}})
+                print(f"Evicted {len(ids)} LLM cache entries.")
+        except Exception as e:
+            logging.error(f"LLM cache eviction failed: {e}")
@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import g, request
+from pymongo.monitoring import CommandListener
+
+# Latency buckets in seconds, from a cache hit to a slow Gemini call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_number(value)}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Metric):
+    """A value read from ``func`` at scrape time."""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, func):
+        super().__init__(name, documentation)
+        self.func = func
+
+    def render(self):
+        try:
+            value = self.func()
+        except Exception:
+            return []
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge',
+                f'{self.name} {_format_number(value)}']
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self):
+        """``{labels: (count, sum)}``, for summaries outside Prometheus."""
+        with self._lock:
+            return {key: (state[2], state[1]) for key, state in self._values.items()}
+
+    def _render_value(self, key, state):
+        counts, total, count = state
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.label_names, key, [('le', _format_number(bound))])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.label_names, key)
+        lines.append(f'{self.name}_sum{labels} {_format_number(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labels=()):
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(self, name, documentation, func):
+        return self.register(Gauge(name, documentation, func))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write render() to ``path`` atomically, e.g. for node_exporter's textfile collector."""
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+# Metrics are per process; with several gunicorn workers, each scrape sees
+# the worker that answered it.
+REGISTRY = Registry()
+
+http_requests = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests by route and status.', ('method', 'route', 'status'))
+http_latency = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency.', ('method', 'route'))
+http_response_size = REGISTRY.histogram(
+    'http_response_size_bytes', 'HTTP response body size (non-streamed responses).', ('route',), SIZE_BUCKETS)
+mongo_latency = REGISTRY.histogram(
+    'mongodb_command_duration_seconds', 'MongoDB command latency.', ('command',))
+mongo_failures = REGISTRY.counter(
+    'mongodb_command_failures_total', 'Failed MongoDB commands.', ('command',))
+stage_latency = REGISTRY.histogram(
+    'pipeline_stage_duration_seconds', 'Time spent per item in each pipeline stage.', ('stage',))
+stage_items = REGISTRY.counter(
+    'pipeline_stage_items_total', 'Items processed per pipeline stage.', ('stage', 'outcome'))
+api_calls = REGISTRY.counter(
+    'api_calls_total', 'External API calls by outcome (ok, retry, error).', ('api', 'outcome'))
+api_latency = REGISTRY.histogram(
+    'api_call_duration_seconds', 'External API call latency, excluding rate-limit waits.', ('api',))
+api_wait = REGISTRY.counter(
+    'api_rate_limit_wait_seconds_total', 'Time spent waiting on rate limits and backoff.', ('api',))
+unhandled_errors = REGISTRY.counter(
+    'http_unhandled_errors_total', 'Requests that ended in an unhandled exception.', ('exception',))
+llm_cache_requests = REGISTRY.counter(
+    'llm_cache_requests_total', 'LLM response cache lookups by result (hit, miss).', ('result',))
+
+
+class MongoCommandMetrics(CommandListener):
+    """Feeds PyMongo command monitoring events into the MongoDB metrics."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_latency.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        mongo_latency.observe(event.duration_micros / 1e6, command=event.command_name)
+        mongo_failures.inc(command=event.command_name)
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+def init_metrics(app):
+    """Record latency, status and response size of every request."""
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_latency.observe(time.perf_counter() - started, method=request.method, route=route)
+        http_requests.inc(method=request.method, route=route, status=response.status_code)
+        if not response.is_streamed and response.content_length is not None:
+            http_response_size.observe(response.content_length, route=route)
+        return response
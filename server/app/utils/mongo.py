@@ -1,25 +1,162 @@
 from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
 import os
+import threading
 from dotenv import load_dotenv
+from app.utils.metrics import REGISTRY, mongo_command_metrics
+
+# Client options read from Config, overridable per app in init_mongo
+MONGO_SETTINGS = (
+    'MONGO_URI',
+    'MONGO_DB_NAME',
+    'MONGO_MAX_POOL_SIZE',
+    'MONGO_MIN_POOL_SIZE',
+    'MONGO_MAX_IDLE_TIME_MS',
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS',
+    'MONGO_CONNECT_TIMEOUT_MS',
+    'MONGO_SOCKET_TIMEOUT_MS',
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS',
+    'MONGO_COMPRESSORS',
+)
 
 mongo_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+_settings = None
+
+
+class PoolStats(ConnectionPoolListener):
+    """Connection pool counters for this process, fed by PyMongo's CMAP events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.checked_out = 0
+            self.created = 0
+            self.checkout_failures = 0
+            self.pool_clears = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'open': self.open,
+                'checked_out': self.checked_out,
+                'created': self.created,
+                'checkout_failures': self.checkout_failures,
+                'pool_clears': self.pool_clears,
+            }
+
+    def _inc(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def connection_created(self, event):
+        self._inc('open')
+        self._inc('created')
+
+    def connection_closed(self, event):
+        self._inc('open', -1)
+
+    def connection_checked_out(self, event):
+        self._inc('checked_out')
+
+    def connection_checked_in(self, event):
+        self._inc('checked_out', -1)
+
+    def connection_check_out_failed(self, event):
+        self._inc('checkout_failures')
+
+    def pool_cleared(self, event):
+        self._inc('pool_clears')
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+
+pool_stats = PoolStats()
+REGISTRY.gauge('mongodb_pool_open_connections', 'Open MongoDB connections in this process.', lambda: pool_stats.open)
+REGISTRY.gauge('mongodb_pool_checked_out_connections', 'MongoDB connections in use.', lambda: pool_stats.checked_out)
+
+
+def _load_settings(config=None):
+    if config is None:
+        # Outside an app (e.g. scripts), fall back to the Config defaults.
+        from config import Config
+        config = {name: getattr(Config, name, None) for name in MONGO_SETTINGS}
+    return {name: config.get(name) for name in MONGO_SETTINGS}
+
 
 def init_mongo(app=None):
-    global mongo_client
+    """Record the app's Mongo settings. No connection is made here: the
+    client is created on first use, in the process that uses it, so gunicorn
+    workers forked from a preloaded master each get their own pool.
+
+    Indexes are managed separately by the ``sync_indexes`` command.
+    """
+    global _settings
     load_dotenv()
-    mongo_uri = os.getenv("MONGO_URI")
-    mongo_client = MongoClient(mongo_uri)
-    if app is not None:
-        app.db = mongo_client['genai']
-        # Ensure index on status for efficient queries
-        app.db['projects'].create_index('status')
-        print(f"MongoDB connection successful: {mongo_client.address}")
+    _settings = _load_settings(app.config if app is not None else None)
+
+
+def _client_options(settings):
+    options = {
+        'maxPoolSize': settings['MONGO_MAX_POOL_SIZE'],
+        'minPoolSize': settings['MONGO_MIN_POOL_SIZE'],
+        'maxIdleTimeMS': settings['MONGO_MAX_IDLE_TIME_MS'],
+        'waitQueueTimeoutMS': settings['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        'connectTimeoutMS': settings['MONGO_CONNECT_TIMEOUT_MS'],
+        'socketTimeoutMS': settings['MONGO_SOCKET_TIMEOUT_MS'],
+        'serverSelectionTimeoutMS': settings['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+        'compressors': settings['MONGO_COMPRESSORS'],
+    }
+    return {key: value for key, value in options.items() if value not in (None, '')}
+
+
+def get_client():
+    """The process-wide MongoClient, created lazily and again after a fork."""
+    global mongo_client, _client_pid, _settings
+    pid = os.getpid()
+    if mongo_client is not None and _client_pid == pid:
+        return mongo_client
+    with _client_lock:
+        if mongo_client is None or _client_pid != pid:
+            if _settings is None:
+                load_dotenv()
+                _settings = _load_settings()
+            uri = _settings['MONGO_URI'] or os.getenv("MONGO_URI")
+            # A client inherited from the parent process must not be used
+            # (or closed) here; its sockets belong to the parent.
+            pool_stats.reset()
+            mongo_client = MongoClient(
+                uri,
+                connect=False,
+                event_listeners=[pool_stats, mongo_command_metrics],
+                **_client_options(_settings)
+            )
+            _client_pid = pid
+    return mongo_client
 
 # Collection getters
 
 def get_db():
-    global mongo_client
-    return mongo_client['genai']
+    get_client()
+    return mongo_client[_settings['MONGO_DB_NAME'] or 'genai']
 
 def get_videos_collection():
     return get_db()['videos']
@@ -28,4 +165,17 @@ def get_playlists_collection():
     return get_db()['playlists']
 
 def get_projects_collection():
-    return get_db()['projects'] 
\ No newline at end of file
+    return get_db()['projects']
+
+def get_llm_cache_collection():
+    return get_db()['llm_cache']
+
+def get_ingest_jobs_collection():
+    return get_db()['ingest_jobs']
+
+def get_api_usage_collection():
+    return get_db()['api_usage']
+
+def get_versions_collection():
+    return get_db()['collection_versions']
+
@@ -0,0 +1,90 @@
+import re
+from urllib.parse import urlencode
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+MAX_PAGE_LIMIT = 500
+_FIELD_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def parse_page_args(args):
+    """Read ``limit``, ``after`` and ``fields`` query args.
+
+    Returns ``(limit, after, projection)``; ``limit`` is None when the client
+    did not ask for a page. Raises ValueError on malformed values.
+    """
+    limit = args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError('limit must be an integer')
+        if not 1 <= limit <= MAX_PAGE_LIMIT:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_LIMIT}')
+    after = args.get('after')
+    if after is not None:
+        try:
+            after = ObjectId(after)
+        except (InvalidId, TypeError):
+            raise ValueError('after must be an id returned by a previous page')
+    projection = None
+    fields = args.get('fields')
+    if fields:
+        names = [name.strip() for name in fields.split(',') if name.strip()]
+        invalid = [name for name in names if not _FIELD_RE.match(name)]
+        if invalid:
+            raise ValueError(f"Invalid field name(s): {', '.join(invalid)}")
+        projection = {name: 1 for name in names}
+    return limit, after, projection
+
+
+def hide_fields(projection, hidden):
+    """Keep internal ``hidden`` fields out of a projection from ``parse_page_args``."""
+    if projection is None:
+        return {name: 0 for name in hidden}
+    projection = {name: 1 for name in projection if name not in hidden}
+    return projection or {'_id': 1}
+
+
+def find_page(collection, query, limit=None, after=None, projection=None):
+    """Keyset page over ``_id``: documents after ``after``, in ``_id`` order.
+
+    Returns ``(docs, next_after)`` where ``next_after`` is the cursor for the
+    following page, or None on the last page. Backed by ``(<filter>, _id)``
+    compound indexes, each page costs the same however deep it is.
+    """
+    if after is not None:
+        query = {**query, '_id': {'$gt': after}}
+    cursor = collection.find(query, projection).sort('_id', 1)
+    if limit is None:
+        return list(cursor), None
+    # One extra document tells us whether another page exists.
+    docs = list(cursor.limit(limit + 1))
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, str(docs[-1]['_id'])
+
+
+async def find_page_async(collection, query, limit=None, after=None, projection=None):
+    """find_page for an async (PyMongo AsyncCollection) collection."""
+    if after is not None:
+        query = {**query, '_id': {'$gt': after}}
+    cursor = collection.find(query, projection).sort('_id', 1)
+    if limit is None:
+        return await cursor.to_list(None), None
+    docs = await cursor.limit(limit + 1).to_list(None)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, str(docs[-1]['_id'])
+
+
+def add_next_page_headers(response, request, next_after):
+    """Advertise the next page via ``X-Next-After`` and an RFC 8288 Link header."""
+    if next_after:
+        args = request.args.to_dict()
+        args['after'] = next_after
+        response.headers['X-Next-After'] = next_after
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
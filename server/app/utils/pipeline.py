@@ -0,0 +1,84 @@
+import logging
+import queue
+import threading
+import time
+from app.utils.metrics import stage_latency, stage_items
+
+_DONE = object()
+
+
+class Stage:
+    """A named pool of worker threads fed through a bounded queue.
+
+    ``func`` is called with each item and may return (or yield) any number of
+    results, which are forwarded to the downstream stage. ``on_error`` is
+    called with ``(item, exc)`` when ``func`` raises so callers can release
+    whatever the item was holding.
+    """
+
+    def __init__(self, name, func, workers=1, maxsize=0, on_error=None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.on_error = on_error
+        self.downstream = None
+        self._threads = []
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                return
+            started = time.perf_counter()
+            try:
+                results = self.func(item)
+                if results is not None:
+                    for result in results:
+                        if self.downstream is not None:
+                            self.downstream.put(result)
+                stage_items.inc(stage=self.name, outcome='ok')
+            except Exception as e:
+                stage_items.inc(stage=self.name, outcome='error')
+                logging.error(f"Stage '{self.name}' failed: {e}")
+                if self.on_error:
+                    self.on_error(item, e)
+            finally:
+                # Includes time blocked handing results to a full downstream queue.
+                stage_latency.observe(time.perf_counter() - started, stage=self.name)
+
+    def close(self):
+        """Wait for every queued item to be processed, then stop the workers."""
+        for _ in self._threads:
+            self.queue.put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+class Pipeline:
+    """A linear chain of stages; items fed to the first stage flow to the last."""
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        for upstream, downstream in zip(self.stages, self.stages[1:]):
+            upstream.downstream = downstream
+
+    def run(self, items):
+        for stage in self.stages:
+            stage.start()
+        for item in items:
+            self.stages[0].put(item)
+        # Closing in order guarantees each stage has flushed its output
+        # downstream before the next one is told to stop.
+        for stage in self.stages:
+            stage.close()
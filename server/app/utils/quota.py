@@ -0,0 +1,163 @@
+import heapq
+import logging
+import math
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# Speech runs at roughly 150 words a minute, about 3.3 tokens a second
+SPEECH_TOKENS_PER_SEC = 3.3
+# Assumed length of videos whose details have not been fetched yet
+DEFAULT_DURATION_SEC = 900
+# Instructions and title wrapped around every summarize/combine prompt
+PROMPT_OVERHEAD_TOKENS = 40
+# One classify prompt line per title, plus its label
+CLASSIFY_TOKENS_PER_VIDEO = 30
+# videos.list resolves up to 50 videos for one quota unit
+YOUTUBE_IDS_PER_UNIT = 50
+
+
+class QuotaLedger:
+    """Daily API usage counters stored in a Mongo collection.
+
+    One document per API per day (``<api>:<YYYY-MM-DD>``) accumulates
+    ``units``, ``tokens`` and ``requests`` with atomic increments, so every
+    worker charges the same ledger. Days roll over at midnight in
+    ``timezone``; YouTube resets its quota at midnight Pacific time.
+    ``budgets`` maps an API to its daily limits, e.g.
+    ``{"youtube": {"units": 10000}, "gemini": {"tokens": 1000000}}``.
+    Ledger failures are logged and never break ingest.
+    """
+
+    def __init__(self, collection, budgets, timezone="America/Los_Angeles"):
+        self.collection = collection
+        self.budgets = {api: {metric: limit for metric, limit in limits.items() if limit}
+                        for api, limits in budgets.items()}
+        self.timezone = ZoneInfo(timezone)
+
+    def today(self):
+        return datetime.now(self.timezone).strftime("%Y-%m-%d")
+
+    def charge(self, api, units=0, tokens=0, requests=1):
+        day = self.today()
+        try:
+            self.collection.update_one(
+                {"_id": f"{api}:{day}"},
+                {"$inc": {"units": units, "tokens": tokens, "requests": requests},
+                 "$set": {"api": api, "day": day, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            logging.error(f"Could not record {api} usage: {e}")
+
+    def usage(self):
+        """Today's ``{api: {"units", "tokens", "requests"}}``."""
+        try:
+            docs = list(self.collection.find({"day": self.today()}))
+        except Exception as e:
+            logging.error(f"Could not read API usage: {e}")
+            return {}
+        return {doc["api"]: {metric: doc.get(metric, 0) for metric in ("units", "tokens", "requests")}
+                for doc in docs}
+
+    def remaining(self):
+        """What is left of today's budgets, ``{api: {metric: amount}}``; unbudgeted metrics are omitted."""
+        usage = self.usage()
+        return {
+            api: {metric: max(0, limit - usage.get(api, {}).get(metric, 0)) for metric, limit in limits.items()}
+            for api, limits in self.budgets.items()
+        }
+
+
+def estimate_video_cost(duration_sec=None, transcript_tokens=None, chunk_size=3000, output_tokens=300,
+                        needs_details=True, needs_type=True, classify_batch_size=25):
+    """Estimated ``{"youtube": {...}, "gemini": {...}}`` usage of ingesting one video.
+
+    The transcript length comes from ``transcript_tokens`` when the
+    transcript has been fetched, otherwise from the duration. Gemini cost
+    covers one summarize call per chunk plus the combine tree above them.
+    """
+    if transcript_tokens is None:
+        transcript_tokens = (duration_sec or DEFAULT_DURATION_SEC) * SPEECH_TOKENS_PER_SEC
+    chunks = max(1, math.ceil(transcript_tokens / chunk_size))
+    requests = chunks
+    tokens = transcript_tokens + chunks * (PROMPT_OVERHEAD_TOKENS + output_tokens)
+    # Each combine call takes as many summaries as fit in one chunk
+    per_group = max(2, chunk_size // output_tokens)
+    level = chunks
+    while level > 1:
+        calls = math.ceil(level / per_group)
+        requests += calls
+        tokens += level * output_tokens + calls * (PROMPT_OVERHEAD_TOKENS + output_tokens)
+        level = calls
+    if needs_type:
+        requests += 1 / classify_batch_size
+        tokens += CLASSIFY_TOKENS_PER_VIDEO
+    youtube_units = 1 / YOUTUBE_IDS_PER_UNIT if needs_details else 0
+    return {"youtube": {"units": youtube_units}, "gemini": {"tokens": tokens, "requests": requests}}
+
+
+def _fits(cost, remaining):
+    return all(cost.get(api, {}).get(metric, 0) <= left
+               for api, limits in remaining.items() for metric, left in limits.items())
+
+
+def _spend(cost, remaining):
+    for api, limits in remaining.items():
+        for metric in limits:
+            limits[metric] -= cost.get(api, {}).get(metric, 0)
+
+
+def _underpopulated_order(candidates, playlist_sizes):
+    """Round-robin over playlists, always drawing from the one with the fewest videos."""
+    by_playlist = {}
+    for candidate in sorted(candidates, key=PRIORITIES["newest"]):
+        by_playlist.setdefault(candidate["playlistId"], []).append(candidate)
+    heap = [(playlist_sizes.get(playlist_id, 0), playlist_id) for playlist_id in by_playlist]
+    heapq.heapify(heap)
+    positions = dict.fromkeys(by_playlist, 0)
+    while heap:
+        size, playlist_id = heapq.heappop(heap)
+        yield by_playlist[playlist_id][positions[playlist_id]]
+        positions[playlist_id] += 1
+        if positions[playlist_id] < len(by_playlist[playlist_id]):
+            heapq.heappush(heap, (size + 1, playlist_id))
+
+
+PRIORITIES = {
+    # Queue order, as jobs were discovered
+    "oldest": lambda c: c["created_at"],
+    # Most recently published first
+    "newest": lambda c: -c["publishedAt"].timestamp() if isinstance(c.get("publishedAt"), datetime) else 0,
+    # Cheapest first, so the most videos fit in the budget
+    "shortest": lambda c: c["cost"]["gemini"]["tokens"],
+    # Playlists with the fewest stored videos first; see _underpopulated_order
+    "underpopulated": None,
+}
+
+
+def plan_jobs(candidates, remaining, priority="underpopulated", playlist_sizes=None):
+    """Pick the jobs to run within today's remaining budget.
+
+    ``candidates`` are dicts with ``id``, ``playlistId``, ``publishedAt``,
+    ``created_at``, ``in_progress`` and an estimated ``cost``. Jobs already
+    under way go first, then the rest in ``priority`` order; a job that does
+    not fit what is left is deferred and cheaper ones behind it still get a
+    chance. Returns ``(job_ids, deferred)``.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown ingest priority '{priority}'; choose from {', '.join(PRIORITIES)}")
+    remaining = {api: dict(limits) for api, limits in remaining.items()}
+    started = sorted((c for c in candidates if c["in_progress"]), key=PRIORITIES["oldest"])
+    fresh = [c for c in candidates if not c["in_progress"]]
+    if priority == "underpopulated":
+        fresh = _underpopulated_order(fresh, playlist_sizes or {})
+    else:
+        fresh = sorted(fresh, key=PRIORITIES[priority])
+    planned, deferred = [], 0
+    for candidate in [*started, *fresh]:
+        if not _fits(candidate["cost"], remaining):
+            deferred += 1
+            continue
+        _spend(candidate["cost"], remaining)
+        planned.append(candidate["id"])
+    return planned, deferred
@@ -0,0 +1,144 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from app.utils.metrics import api_calls, api_latency, api_wait
+
+
+class RetryableError(Exception):
+    """Raised by a rate-limited call when it may succeed if retried later.
+
+    ``retry_after`` is the server-requested delay in seconds, if any.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class NotModified(Exception):
+    """Raised by a rate-limited call whose conditional request found nothing changed.
+
+    Counted as a ``not_modified`` outcome rather than an error.
+    """
+
+
+class QuotaExceededError(Exception):
+    """Raised when an API refuses a call because its quota is used up."""
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        # Requests bigger than the bucket would wait forever; let them drain it instead.
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Per-API limiter: request and token buckets plus backoff with jitter.
+
+    Every call waits for its share of both buckets. When a call raises
+    RetryableError the whole API is paused (Retry-After if the server sent
+    one, otherwise exponential backoff with full jitter) so concurrent
+    workers back off together instead of hammering the quota.
+    """
+
+    def __init__(self, name, requests_per_minute, tokens_per_minute=None,
+                 max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def backoff_delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _pause(self, delay):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def _wait_if_paused(self):
+        while True:
+            with self._lock:
+                remaining = self._paused_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def call(self, fn, *args, tokens=0, **kwargs):
+        """Run ``fn(*args, **kwargs)`` within the limits, retrying RetryableError."""
+        for attempt in range(self.max_retries + 1):
+            waited = time.perf_counter()
+            self._wait_if_paused()
+            self.requests.acquire()
+            if self.tokens and tokens:
+                self.tokens.acquire(tokens)
+            started = time.perf_counter()
+            api_wait.inc(started - waited, api=self.name)
+            try:
+                result = fn(*args, **kwargs)
+            except RetryableError as e:
+                api_latency.observe(time.perf_counter() - started, api=self.name)
+                if attempt == self.max_retries:
+                    api_calls.inc(api=self.name, outcome='error')
+                    logging.error(f"{self.name}: giving up after {attempt + 1} attempts: {e}")
+                    raise
+                api_calls.inc(api=self.name, outcome='retry')
+                delay = e.retry_after if e.retry_after is not None else self.backoff_delay(attempt)
+                delay = min(delay, self.max_delay)
+                print(f"{self.name}: {e}; retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                self._pause(delay)
+                continue
+            except NotModified:
+                api_latency.observe(time.perf_counter() - started, api=self.name)
+                api_calls.inc(api=self.name, outcome='not_modified')
+                raise
+            except Exception:
+                api_latency.observe(time.perf_counter() - started, api=self.name)
+                api_calls.inc(api=self.name, outcome='error')
+                raise
+            api_latency.observe(time.perf_counter() - started, api=self.name)
+            api_calls.inc(api=self.name, outcome='ok')
+            return result
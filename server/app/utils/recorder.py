@@ -0,0 +1,58 @@
+import hashlib
+import json
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+
+def youtube_key(uri):
+    """Cassette key of a YouTube Data API request: path and query, minus the API key."""
+    parts = urlsplit(uri)
+    params = sorted((k, v) for k, v in parse_qsl(parts.query) if k not in ("key", "alt"))
+    return f"{parts.path}?{urlencode(params)}"
+
+
+def transcript_key(video_id, languages):
+    return f"{video_id}?languages={','.join(languages)}"
+
+
+def gemini_key(payload):
+    """Cassette key of a Gemini request: sha256 of its prompt text."""
+    text = "\n".join(part.get("text", "") for content in payload.get("contents", []) for part in content.get("parts", []))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Recorder:
+    """Appends external API exchanges to a JSON-lines cassette.
+
+    Each line holds ``api``, ``key``, ``status`` (0 for a timeout or
+    connection error), ``body``, ``retry_after`` and ``latency`` in seconds;
+    benchmarks/fake_apis.py replays them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, api, key, status, body=None, latency=0.0, retry_after=None):
+        line = json.dumps({
+            "api": api,
+            "key": key,
+            "status": status,
+            "body": body,
+            "retry_after": retry_after,
+            "latency": round(latency, 4),
+        }, default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+def load_cassette(path):
+    """``{(api, key): [entries in recorded order]}`` from a cassette file."""
+    cassette = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                cassette.setdefault((entry["api"], entry["key"]), []).append(entry)
+    return cassette
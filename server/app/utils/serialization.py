@@ -0,0 +1,52 @@
+import json
+import os
+from datetime import datetime
+from bson.objectid import ObjectId
+from flask import Response
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+# Lists longer than this are streamed in pieces instead of encoded in one go
+STREAM_THRESHOLD = int(os.getenv('JSON_STREAM_THRESHOLD', 2000))
+STREAM_BATCH = 200
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        # Same wire format Flask's jsonify has always produced
+        return http_date(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Encode ``obj`` as compact JSON bytes, handling ObjectId and datetime."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def _stream_array(items):
+    yield b'['
+    for start in range(0, len(items), STREAM_BATCH):
+        batch = b','.join(dumps(item) for item in items[start:start + STREAM_BATCH])
+        yield batch if start == 0 else b',' + batch
+    yield b']'
+
+
+def json_response(data, status=200, headers=None):
+    """Build a JSON response; MongoDB documents can be passed as-is.
+
+    Large lists are streamed so the full body never sits in memory as one
+    string.
+    """
+    if isinstance(data, list) and len(data) > STREAM_THRESHOLD:
+        body = _stream_array(data)
+    else:
+        body = dumps(data)
+    return Response(body, status=status, headers=headers, mimetype='application/json')
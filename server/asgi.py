@@ -0,0 +1,4 @@
+from app.asgi import create_async_app
+
+# Async mode: hypercorn asgi:app
+app = create_async_app()
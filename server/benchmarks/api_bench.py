@@ -0,0 +1,361 @@
+"""Load test and micro-benchmarks for the project, video, playlist and
+admin_project routes.
+
+Seeds a scratch database (a local mongod, or mongomock in memory) with
+realistic volumes, drives every route and reports p50/p99 latency,
+throughput and peak RSS. With --baseline it exits non-zero when a result
+regresses past --tolerance.
+
+Scenarios measure the service and Mongo path: every request carries
+different ids or args, so the in-process response cache misses. Those named
+"(cached)" repeat one URL on purpose and measure cache hits instead.
+/search ($text) and /healthz (driver topology) need a mongod, so they are
+skipped with --in-memory.
+
+    # In process, through Flask's test client
+    python -m benchmarks.api_bench --mongo-uri mongodb://localhost:27017
+    python -m benchmarks.api_bench --in-memory --scale 0.05
+
+    # Over HTTP against multi-worker gunicorn (needs a real mongod)
+    python -m benchmarks.api_bench --mongo-uri mongodb://localhost:27017 --gunicorn 4 --concurrency 32
+
+    # Record, then compare against, a baseline
+    python -m benchmarks.api_bench --in-memory --save-baseline benchmarks/baseline.json
+    python -m benchmarks.api_bench --in-memory --baseline benchmarks/baseline.json
+
+Run from the server/ directory.
+"""
+import json
+import math
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import click
+import requests
+
+BENCH_DB = 'genai_bench'
+ADMIN_TOKEN = 'bench-admin-token'
+P99_NOISE_MS = 1.0
+WORDS = ('python react docker kubernetes closures decorators hooks async tutorial project '
+         'api database mongo flask design patterns testing deploy cloud machine learning').split()
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed(db, videos, playlists, projects, rng):
+    """Fill ``db`` with ``videos`` across ``playlists`` playlists and ``projects`` projects.
+
+    Videos are embedded like ingest does, and their ``updated_at`` is spread
+    over the last week so incremental exports return a slice.
+    """
+    from app.utils.embeddings import embed_video
+    for name in ('videos', 'playlists', 'projects', 'collection_versions'):
+        db[name].drop()
+    now = datetime.utcnow()
+    db['playlists'].insert_many([
+        {'playlistId': f'PL{i:05d}', 'name': f'Playlist {i}', 'author': 'bench', 'active': i % 10 != 0,
+         'updated_at': now}
+        for i in range(playlists)
+    ])
+    batch = []
+    for i in range(videos):
+        video = {
+            'videoId': f'vid{i:07d}',
+            'title': _sentence(rng, 6),
+            'description': '',
+            'tags': rng.sample(WORDS, 4),
+            'summary': _sentence(rng, 250),
+            'type': 'project' if rng.random() < 0.3 else 'concept',
+            'playlistId': f'PL{rng.randrange(playlists):05d}',
+            'duration': rng.randrange(120, 7200),
+            'youtubeUrl': f'https://www.youtube.com/watch?v=vid{i:07d}',
+            'publishedAt': now - timedelta(days=rng.randrange(2000)),
+            'updated_at': now - timedelta(minutes=rng.randrange(7 * 24 * 60)),
+        }
+        batch.append({**video, **embed_video(video)})
+        if len(batch) == 1000:
+            db['videos'].insert_many(batch)
+            batch = []
+    if batch:
+        db['videos'].insert_many(batch)
+    db['projects'].insert_many([
+        {'title': f'Project {i}', 'description': _sentence(rng, 40), 'tech_stack': rng.sample(WORDS, 3),
+         'github_url': f'https://github.com/bench/project-{i}', 'demo_url': 'https://example.com',
+         'linkedin': 'https://linkedin.com/in/bench', 'status': 'approved' if i % 5 else 'pending',
+         'created_at': now}
+        for i in range(projects)
+    ])
+
+
+def scenarios(db, rng, mongod=True):
+    """``(name, iterations, make_request)`` for every route; ``make_request(i)`` returns
+    ``(method, path, kwargs)``.
+
+    Ids, pages and filters differ per request so each one runs the service
+    and its queries. Routes without arguments get a throwaway ``run`` arg the
+    services ignore, which makes every request a distinct cache key.
+    """
+    video_ids = [str(doc['_id']) for doc in db['videos'].find({}, {'_id': 1}).limit(5000)]
+    playlist_ids = [doc['playlistId'] for doc in db['playlists'].find({}, {'playlistId': 1})]
+    admin = {'headers': {'Authorization': f'Bearer {ADMIN_TOKEN}'}}
+    run_id = f'{os.getpid()}-{int(time.time())}'
+    now = datetime.utcnow()
+
+    def video_id(i):
+        return video_ids[i % len(video_ids)]
+
+    def since(i):
+        # A rolling 1-3 hour window of the week of seeded updates
+        return (now - timedelta(minutes=60 + i % 120)).isoformat() + 'Z'
+
+    def submitted(i):
+        return {
+            'title': f'Bench submission {run_id}-{i}', 'description': 'bench', 'tech_stack': ['python'],
+            'github_url': f'https://github.com/bench/{run_id}-{i}', 'demo_url': 'https://example.com',
+            'linkedin': 'https://linkedin.com/in/bench'
+        }
+
+    def project_id(i):
+        doc = db['projects'].find_one({'title': f'Bench submission {run_id}-{i}'}, {'_id': 1})
+        return str(doc['_id']) if doc else '000000000000000000000000'
+
+    runs = [
+        ('GET /videos?limit=50', 300, lambda i: ('GET', f'/videos?limit=50&after={video_id(i)}', {})),
+        ('GET /videos?limit=50 (cached)', 300, lambda i: ('GET', '/videos?limit=50', {})),
+        ('GET /videos?playlistId', 300, lambda i: (
+            'GET', f'/videos?playlistId={rng.choice(playlist_ids)}&limit=50&after={video_id(i)}', {})),
+        ('GET /videos (full list)', 5, lambda i: ('GET', f'/videos?run={run_id}-{i}', {})),
+        ('GET /videos/mongo/<id>', 300, lambda i: ('GET', f'/videos/mongo/{video_id(i)}', {})),
+        ('GET /videos/mongo/<id>/related', 300, lambda i: ('GET', f'/videos/mongo/{video_id(i)}/related', {})),
+        ('GET /videos/export?updated_since', 20, lambda i: (
+            'GET', f'/videos/export?updated_since={since(i)}', admin)),
+        ('GET /videos/export (full)', 3, lambda i: ('GET', '/videos/export', admin)),
+        ('GET /projects?limit=50', 300, lambda i: ('GET', f'/projects?limit=50&after={video_id(i)}', {})),
+        ('GET /projects?playlistId', 300, lambda i: (
+            'GET', f'/projects?playlistId={rng.choice(playlist_ids)}&limit=50&after={video_id(i)}', {})),
+        ('GET /projects/mongo/<id>', 300, lambda i: ('GET', f'/projects/mongo/{video_id(i)}', {})),
+        ('GET /playlists', 300, lambda i: ('GET', f'/playlists?run={run_id}-{i}', {})),
+        ('GET /playlists (cached)', 300, lambda i: ('GET', '/playlists', {})),
+        ('POST /playlists', 100, lambda i: ('POST', '/playlists', {
+            'json': {'name': f'Bench playlist {run_id}-{i}', 'playlistId': f'BENCH{run_id}-{i}'}, **admin})),
+        ('GET /api/projects/approved', 50, lambda i: ('GET', f'/api/projects/approved?run={run_id}-{i}', {})),
+        ('GET /api/projects/pending', 50, lambda i: ('GET', '/api/projects/pending', admin)),
+        ('POST /api/projects/submit', 100, lambda i: ('POST', '/api/projects/submit', {'json': submitted(i)})),
+        ('PATCH /api/projects/<id>/approve', 100,
+         lambda i: ('PATCH', f'/api/projects/{project_id(i)}/approve', admin)),
+        ('DELETE /api/projects/<id>', 100, lambda i: ('DELETE', f'/api/projects/{project_id(i)}', admin)),
+        ('GET /metrics', 100, lambda i: ('GET', '/metrics', {})),
+    ]
+    if mongod:
+        runs.append(('GET /healthz', 100, lambda i: ('GET', '/healthz', {})))
+        runs.append(('GET /search', 300, lambda i: (
+            'GET', f'/search?q={WORDS[i % len(WORDS)]}+{WORDS[(i * 7) % len(WORDS)]}&page={1 + i % 3}', {})))
+    return runs
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, rank - 1)]
+
+
+def summarize(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def run_scenario(send, make_request, iterations, concurrency):
+    """Send ``iterations`` requests, ``concurrency`` at a time; a warm-up tenth is not timed."""
+    for i in range(max(1, iterations // 10)):
+        send(*make_request(-1 - i))
+    # Requests are prepared up front so the timing covers the server only.
+    prepared = [make_request(i) for i in range(iterations)]
+
+    def timed(request):
+        started = time.perf_counter()
+        status = send(*request)
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, prepared))
+    else:
+        results = [timed(request) for request in prepared]
+    elapsed = time.perf_counter() - started
+    # No scenario expects a 4xx, so any is a harness or app bug worth surfacing
+    errors = sum(1 for _, status in results if status >= 400)
+    return summarize([latency for latency, _ in results], elapsed, errors)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _peak_rss_kb(pid):
+    """Peak RSS of ``pid`` and its children, from /proc (Linux only)."""
+    total = 0
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total
+
+
+def start_gunicorn(workers, env):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}', 'app:create_app()'],
+        env=env
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            requests.get(f'{base_url}/', timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise click.ClickException('gunicorn did not start')
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of ``results`` against ``baseline``, as readable strings."""
+    failures = []
+    for name, result in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        # Sub-millisecond p99 swings are timer noise, not regressions
+        if result['p99_ms'] > max(base['p99_ms'] * (1 + tolerance), base['p99_ms'] + P99_NOISE_MS):
+            failures.append(f"{name}: p99 {result['p99_ms']}ms > baseline {base['p99_ms']}ms")
+        if result['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            failures.append(f"{name}: {result['throughput_rps']} req/s < baseline {base['throughput_rps']} req/s")
+        if result['errors'] > base['errors']:
+            failures.append(f"{name}: {result['errors']} failed requests (baseline {base['errors']})")
+    base_rss = baseline.get('peak_rss_kb')
+    if base_rss and results['peak_rss_kb'] > base_rss * (1 + tolerance):
+        failures.append(f"peak RSS {results['peak_rss_kb']}kB > baseline {base_rss}kB")
+    return failures
+
+
+@click.command()
+@click.option('--mongo-uri', default=None, help='Local mongod to seed; the bench database is dropped and recreated.')
+@click.option('--in-memory', is_flag=True, help='Use mongomock instead of a mongod (test client only).')
+@click.option('--scale', default=1.0, show_default=True, help='Multiplier on 100k videos / 500 playlists / 10k projects.')
+@click.option('--iterations', default=1.0, show_default=True, help='Multiplier on requests per route.')
+@click.option('--no-cache', is_flag=True, help='Disable the in-process response cache.')
+@click.option('--gunicorn', 'workers', default=0, help='Serve with this many gunicorn workers and drive over HTTP.')
+@click.option('--concurrency', default=1, show_default=True, help='Concurrent requests (HTTP mode).')
+@click.option('--baseline', type=click.Path(exists=True), help='Fail if results regress against this JSON file.')
+@click.option('--save-baseline', type=click.Path(), help='Write the results to this JSON file.')
+@click.option('--tolerance', default=0.25, show_default=True, help='Allowed regression, as a fraction.')
+@click.option('--seed', 'random_seed', default=42, show_default=True)
+def main(mongo_uri, in_memory, scale, iterations, no_cache, workers, concurrency, baseline, save_baseline,
+         tolerance, random_seed):
+    if bool(mongo_uri) == in_memory:
+        raise click.UsageError('Pass exactly one of --mongo-uri or --in-memory.')
+    if workers and in_memory:
+        raise click.UsageError('--gunicorn needs a real mongod (--mongo-uri).')
+    env = {**os.environ, 'MONGO_DB_NAME': BENCH_DB, 'ADMIN_TOKEN': ADMIN_TOKEN,
+           'CACHE_ENABLED': 'false' if no_cache else 'true'}
+    if mongo_uri:
+        env['MONGO_URI'] = mongo_uri
+    os.environ.update(env)
+
+    from app import create_app
+    from app.utils import mongo
+    from app.utils.indexes import sync_indexes
+    app = create_app()
+    if in_memory:
+        import mongomock
+        mongo.mongo_client = mongomock.MongoClient()
+        mongo._client_pid = os.getpid()
+    db = mongo.get_db()
+
+    rng = random.Random(random_seed)
+    counts = (int(100_000 * scale), max(1, int(500 * scale)), int(10_000 * scale))
+    started = time.perf_counter()
+    seed(db, *counts, rng)
+    sync_indexes(db)
+    print(f"Seeded {counts[0]} videos, {counts[1]} playlists, {counts[2]} projects "
+          f"in {time.perf_counter() - started:.1f}s.")
+
+    process = None
+    if workers:
+        process, base_url = start_gunicorn(workers, env)
+        session = requests.Session()
+
+        def send(method, path, kwargs):
+            return session.request(method, base_url + path, **kwargs).status_code
+    else:
+        client = app.test_client()
+
+        def send(method, path, kwargs):
+            return client.open(path, method=method, **kwargs).status_code
+
+    results = {
+        'mode': f'gunicorn x{workers}, concurrency {concurrency}' if workers else 'test client',
+        'store': 'mongomock' if in_memory else 'mongod',
+        'scale': scale,
+        'scenarios': {},
+    }
+    try:
+        for name, count, make_request in scenarios(db, rng, mongod=not in_memory):
+            count = max(1, int(count * iterations))
+            result = run_scenario(send, make_request, count, concurrency if workers else 1)
+            results['scenarios'][name] = result
+            print(f"{name:<36} p50 {result['p50_ms']:>9.2f}ms  p99 {result['p99_ms']:>9.2f}ms  "
+                  f"{result['throughput_rps']:>8.1f} req/s  {result['errors']} errors")
+        # ru_maxrss is in kB on Linux
+        results['peak_rss_kb'] = _peak_rss_kb(process.pid) if process else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f"Peak RSS: {results['peak_rss_kb'] / 1024:.1f} MB")
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+        if not in_memory:
+            mongo.get_client().drop_database(BENCH_DB)
+
+    if save_baseline:
+        with open(save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {save_baseline}.")
+    if baseline:
+        with open(baseline) as f:
+            failures = compare(results, json.load(f), tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Local stand-in for the YouTube Data, transcript and Gemini APIs.
+
+Replays a cassette recorded with INGEST_RECORD_FILE: each request gets the
+recorded responses for its key in order, status codes (429, 403, ...),
+Retry-After and timeouts included, after sleeping the recorded latency.
+Requests that were never recorded get deterministic synthetic responses,
+so ingest can also be benchmarked with no recording at all.
+
+    python -m benchmarks.fake_apis --cassette ingest.jsonl --port 8765
+
+then run ingest with
+
+    YOUTUBE_API_ENDPOINT=http://127.0.0.1:8765/
+    TRANSCRIPT_API_URL=http://127.0.0.1:8765/transcripts
+    GEMINI_API_URL=http://127.0.0.1:8765/gemini
+
+benchmarks/ingest_bench.py does all of this in one process.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import click
+from app.utils.recorder import youtube_key, transcript_key, gemini_key, load_cassette
+
+# Latency of synthetic responses, in seconds (mean, jitter)
+SYNTHETIC_LATENCY = {'youtube': (0.08, 0.04), 'transcript': (0.3, 0.15), 'gemini': (1.5, 0.8)}
+WORDS = ('python react docker closures decorators hooks async tutorial project api database mongo '
+         'flask design patterns testing deploy cloud learning the a of to and is in').split()
+
+
+def _rng(key):
+    return random.Random(hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+
+class FakeApis:
+    """Cassette replay plus synthetic responses and fault injection.
+
+    ``faults`` maps an API name to ``[(status, rate)]``; status 0 drops the
+    connection like a timeout. ``speed`` divides every latency.
+    """
+
+    def __init__(self, cassette=None, videos_per_playlist=20, transcript_words=3000,
+                 faults=None, speed=1.0, seed=0):
+        self.cassette = cassette or {}
+        self.videos_per_playlist = videos_per_playlist
+        self.transcript_words = transcript_words
+        self.faults = faults or {}
+        self.speed = speed
+        self.random = random.Random(seed)
+        self.hits = {}
+        self._served = {}
+        self._lock = threading.Lock()
+
+    def _count(self, api, outcome):
+        with self._lock:
+            self.hits[(api, outcome)] = self.hits.get((api, outcome), 0) + 1
+
+    def respond(self, api, key, synthesize):
+        """``(status, body, retry_after)`` for a request, after its latency; status 0 means drop."""
+        with self._lock:
+            fault = None
+            for status, rate in self.faults.get(api, []):
+                if self.random.random() < rate:
+                    fault = status
+                    break
+            entries = self.cassette.get((api, key))
+            entry = None
+            if entries and fault is None:
+                index = self._served.get((api, key), 0)
+                # Recorded retries replay in order; the last response then repeats
+                entry = entries[min(index, len(entries) - 1)]
+                self._served[(api, key)] = index + 1
+            mean, jitter = SYNTHETIC_LATENCY[api]
+            latency = entry['latency'] if entry else max(0.0, self.random.gauss(mean, jitter))
+        time.sleep(latency / self.speed)
+        if fault is not None:
+            self._count(api, f'fault {fault}')
+            error = {'code': fault, 'message': 'Injected fault'}
+            if api == 'youtube' and fault == 403:
+                # YouTube names the cause of a 403; see ingest's YOUTUBE_*_REASONS
+                error['errors'] = [{'reason': 'quotaExceeded', 'domain': 'youtube.quota'}]
+            return fault, {'error': error}, '1'
+        if entry:
+            self._count(api, 'replayed')
+            return entry['status'], entry['body'], entry.get('retry_after')
+        self._count(api, 'synthetic')
+        return 200, synthesize(), None
+
+    # --- Synthetic responses ---
+
+    def playlist_items(self, playlist_id, page_token):
+        start = int(page_token or 0)
+        end = min(start + 50, self.videos_per_playlist)
+        items = [{
+            'contentDetails': {'videoId': f'{playlist_id}-v{i}', 'videoPublishedAt': '2024-01-01T00:00:00Z'},
+            'snippet': {'title': f'Video {i} of {playlist_id}', 'publishedAt': '2024-01-01T00:00:00Z'},
+        } for i in range(start, end)]
+        page = {'items': items, 'pageInfo': {'totalResults': self.videos_per_playlist, 'resultsPerPage': 50}}
+        if end < self.videos_per_playlist:
+            page['nextPageToken'] = str(end)
+        page['etag'] = hashlib.sha256(json.dumps(page, sort_keys=True).encode('utf-8')).hexdigest()[:27]
+        return page
+
+    def videos(self, ids):
+        items = []
+        for video_id in ids:
+            rng = _rng(video_id)
+            items.append({
+                'id': video_id,
+                'contentDetails': {'duration': f'PT{rng.randrange(5, 90)}M{rng.randrange(60)}S'},
+                'snippet': {'tags': rng.sample(WORDS, 3), 'description': ''},
+            })
+        return {'items': items}
+
+    def transcript(self, video_id):
+        rng = _rng(video_id)
+        segments, start = [], 0.0
+        for _ in range(self.transcript_words // 12):
+            duration = rng.uniform(2, 6)
+            segments.append({'text': ' '.join(rng.choice(WORDS) for _ in range(12)),
+                             'start': round(start, 2), 'duration': round(duration, 2)})
+            start += duration
+        return segments
+
+    def gemini(self, payload):
+        prompt = payload['contents'][0]['parts'][0]['text']
+        if prompt.startswith('Summarize'):
+            rng = _rng(prompt)
+            text = ' '.join(rng.choice(WORDS) for _ in range(150))
+        elif prompt.startswith('Classify each'):
+            titles = [line.split('Title:', 1)[1] for line in prompt.splitlines() if 'Title:' in line]
+            text = json.dumps(['project' if 'project' in title.lower() else 'concept' for title in titles])
+        else:
+            text = 'concept'
+        return {'candidates': [{'content': {'parts': [{'text': text}]}}]}
+
+
+def make_handler(apis):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, retry_after=None):
+            if status == 0:
+                # A dropped connection, as a client timeout would see it
+                self.close_connection = True
+                return
+            data = body if isinstance(body, str) else json.dumps(body)
+            data = data.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            if retry_after:
+                self.send_header('Retry-After', str(retry_after))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+            if parts.path == '/youtube/v3/playlistItems':
+                status, body, retry_after = apis.respond('youtube', youtube_key(self.path), lambda: apis.playlist_items(
+                    query.get('playlistId', ''), query.get('pageToken')))
+                etag = body.get('etag') if isinstance(body, dict) else None
+                if status == 200 and etag and self.headers.get('If-None-Match') == etag:
+                    status, body = 304, ''
+                self._send(status, body, retry_after)
+            elif parts.path == '/youtube/v3/videos':
+                self._send(*apis.respond('youtube', youtube_key(self.path), lambda: apis.videos(
+                    query.get('id', '').split(','))))
+            elif parts.path.startswith('/transcripts/'):
+                video_id = parts.path.rsplit('/', 1)[1]
+                languages = query.get('languages', 'en').split(',')
+                self._send(*apis.respond('transcript', transcript_key(video_id, languages),
+                                         lambda: apis.transcript(video_id)))
+            else:
+                self._send(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if urlsplit(self.path).path == '/gemini':
+                self._send(*apis.respond('gemini', gemini_key(payload), lambda: apis.gemini(payload)))
+            else:
+                self._send(404, {'error': 'Not found'})
+
+    return Handler
+
+
+def serve(apis, port=0):
+    """Start the fake server on a background thread; returns ``(server, base_url)``."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(apis))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def parse_faults(specs):
+    """``('gemini:429:0.05', ...)`` -> ``{'gemini': [(429, 0.05)]}``; status 0 is a timeout."""
+    faults = {}
+    for spec in specs:
+        api, status, rate = spec.split(':')
+        faults.setdefault(api, []).append((int(status), float(rate)))
+    return faults
+
+
+@click.command()
+@click.option('--cassette', type=click.Path(exists=True), help='Recorded INGEST_RECORD_FILE to replay.')
+@click.option('--port', default=8765, show_default=True)
+@click.option('--videos-per-playlist', default=20, show_default=True, help='Size of synthetic playlists.')
+@click.option('--transcript-words', default=3000, show_default=True, help='Length of synthetic transcripts.')
+@click.option('--fault', multiple=True, help='api:status:rate, e.g. gemini:429:0.05 or youtube:0:0.01 (timeout).')
+@click.option('--speed', default=1.0, show_default=True, help='Divide every latency by this.')
+def main(cassette, port, videos_per_playlist, transcript_words, fault, speed):
+    apis = FakeApis(load_cassette(cassette) if cassette else None, videos_per_playlist,
+                    transcript_words, parse_faults(fault), speed)
+    server, base_url = serve(apis, port)
+    print(f"Fake APIs listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""End-to-end ingest benchmark against benchmarks/fake_apis.py, with no network.
+
+Seeds playlists into a scratch database (genai_ingest_bench on a local
+mongod), points ingest at an in-process fake API server and reports
+throughput, API calls by outcome, per-stage timing and peak RSS.
+
+    # Synthetic responses: 10 playlists x 20 videos, latencies 10x faster than real
+    python -m benchmarks.ingest_bench --mongo-uri mongodb://localhost:27017 --playlists 10 --speed 10
+
+    # Replay a recording (INGEST_RECORD_FILE=ingest.jsonl flask ingest_and_summarize)
+    python -m benchmarks.ingest_bench --mongo-uri mongodb://localhost:27017 --cassette ingest.jsonl
+
+Run from the server/ directory. Rate limits apply as configured unless
+--no-rate-limits is given.
+"""
+import json
+import os
+import resource
+import time
+from urllib.parse import parse_qs
+import click
+from benchmarks.fake_apis import FakeApis, serve, parse_faults
+from app.utils.recorder import load_cassette
+
+BENCH_DB = 'genai_ingest_bench'
+
+
+def cassette_playlists(cassette):
+    ids = []
+    for api, key in cassette:
+        if api == 'youtube' and key.startswith('/youtube/v3/playlistItems?'):
+            for playlist_id in parse_qs(key.split('?', 1)[1]).get('playlistId', []):
+                if playlist_id not in ids:
+                    ids.append(playlist_id)
+    return ids
+
+
+@click.command()
+@click.option('--mongo-uri', required=True, help='Local mongod; the bench database is dropped and recreated.')
+@click.option('--cassette', type=click.Path(exists=True), help='Recorded INGEST_RECORD_FILE to replay.')
+@click.option('--playlists', default=5, show_default=True, help='Synthetic playlists (ignored with --cassette).')
+@click.option('--videos-per-playlist', default=20, show_default=True)
+@click.option('--transcript-words', default=3000, show_default=True)
+@click.option('--fault', multiple=True, help='api:status:rate, e.g. gemini:429:0.05 or youtube:0:0.01 (timeout).')
+@click.option('--speed', default=1.0, show_default=True, help='Divide every API latency by this.')
+@click.option('--no-rate-limits', is_flag=True, help='Lift the Gemini/YouTube/transcript rate limits.')
+@click.option('--output', type=click.Path(), help='Write the results as JSON.')
+def main(mongo_uri, cassette, playlists, videos_per_playlist, transcript_words, fault, speed,
+         no_rate_limits, output):
+    recorded = load_cassette(cassette) if cassette else None
+    apis = FakeApis(recorded, videos_per_playlist, transcript_words, parse_faults(fault), speed)
+    server, base_url = serve(apis)
+    # Ingest reads its settings at import time, so the environment comes first.
+    os.environ.update({
+        'MONGO_URI': mongo_uri,
+        'MONGO_DB_NAME': BENCH_DB,
+        'YOUTUBE_API_KEY': 'bench',
+        'GEMINI_API_KEY': 'bench',
+        'YOUTUBE_API_ENDPOINT': f'{base_url}/',
+        'TRANSCRIPT_API_URL': f'{base_url}/transcripts',
+        'GEMINI_API_URL': f'{base_url}/gemini',
+        # Every run should reach the APIs rather than last run's cache
+        'LLM_CACHE_ENABLED': 'false',
+    })
+    os.environ.pop('INGEST_RECORD_FILE', None)
+    if no_rate_limits:
+        os.environ.update({'GEMINI_RPM': '1000000', 'GEMINI_TPM': '1000000000',
+                           'YOUTUBE_RPM': '1000000', 'TRANSCRIPT_RPM': '1000000'})
+
+    from app import create_app
+    from app.utils import mongo
+    from app.utils.indexes import sync_indexes
+    from app.utils.metrics import api_calls
+    from app.commands import ingest_and_summarize as ingest
+
+    app = create_app()
+    with app.app_context():
+        db = mongo.get_db()
+        for name in ('videos', 'playlists', 'ingest_jobs', 'llm_cache', 'collection_versions', 'api_usage'):
+            db[name].drop()
+        sync_indexes(db)
+        playlist_ids = cassette_playlists(recorded) if recorded else [f'BENCHPL{i:03d}' for i in range(playlists)]
+        db['playlists'].insert_many([
+            {'playlistId': playlist_id, 'name': playlist_id, 'author': 'bench', 'active': True}
+            for playlist_id in playlist_ids
+        ])
+
+        started = time.perf_counter()
+        summarized = ingest.run_ingest_and_summarize(batch_size=None)
+        elapsed = time.perf_counter() - started
+        stored = db['videos'].count_documents({})
+        mongo.get_client().drop_database(BENCH_DB)
+    server.shutdown()
+
+    results = {
+        'playlists': len(playlist_ids),
+        'videos_stored': stored,
+        'videos_summarized': summarized,
+        'elapsed_sec': round(elapsed, 2),
+        'videos_per_sec': round(stored / elapsed, 3) if elapsed else 0.0,
+        # ru_maxrss is in kB on Linux
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'api_calls': {f'{api} {outcome}': n for (api, outcome), n in sorted(api_calls.snapshot().items())},
+        'server_responses': {f'{api} {outcome}': n for (api, outcome), n in sorted(apis.hits.items())},
+    }
+    print(json.dumps(results, indent=2))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,4 +3,25 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'changeme')
     MONGO_URI = os.getenv('MONGO_URI')
+    MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'genai')
+    # Connection pool and timeouts, per worker process
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 60000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 30000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    # Wire compression, e.g. "zstd,zlib" (zstd and snappy need extra packages)
+    MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', '')
+    # In-process response cache for the public catalogue endpoints
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_TTL_SEC = int(os.getenv('CACHE_TTL_SEC', 300))
+    # How often collection version stamps are re-read from MongoDB
+    CACHE_VERSION_POLL_SEC = float(os.getenv('CACHE_VERSION_POLL_SEC', 2))
+    # How often the related-videos vector index picks up newly embedded videos
+    RELATED_INDEX_REFRESH_SEC = float(os.getenv('RELATED_INDEX_REFRESH_SEC', 30))
+    # Bearer token required by /metrics when set
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
     # Add any other config variables you need 
\ No newline at end of file
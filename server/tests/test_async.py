@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import unittest
+from datetime import datetime
+from unittest import mock
+from bson.objectid import ObjectId
+
+try:
+    import quart
+except ImportError:  # requirements-async.txt is optional
+    quart = None
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, count):
+        return FakeCursor(self.docs[:count])
+
+    async def to_list(self, length):
+        return list(self.docs)
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(self.docs)
+
+class LazyImportTestCase(unittest.TestCase):
+    def test_sync_app_does_not_load_the_async_driver(self):
+        code = "import sys, app.utils.cache; sys.exit('app.utils.async_mongo' in sys.modules)"
+        server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(subprocess.run([sys.executable, '-c', code], cwd=server_dir).returncode, 0)
+
+@unittest.skipUnless(quart, 'requirements-async.txt is not installed')
+class AsyncAppSmokeTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        from app.asgi import create_async_app
+        self.client = create_async_app().test_client()
+        patcher = mock.patch.dict(os.environ, {'ADMIN_TOKEN': 'secret'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def collection(self, name, docs):
+        patcher = mock.patch(f'app.services.async_service.get_async_{name}_collection', return_value=FakeCollection(docs))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_lists_playlists(self):
+        self.collection('playlists', [{'_id': ObjectId(), 'name': 'Python', 'active': True,
+                                       'updated_at': datetime(2024, 1, 1)}])
+        response = await self.client.get('/playlists')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        playlists = await response.get_json()
+        self.assertEqual([playlist['name'] for playlist in playlists], ['Python'])
+        self.assertIsInstance(playlists[0]['_id'], str)
+
+    async def test_pages_videos(self):
+        ids = [ObjectId() for _ in range(3)]
+        self.collection('videos', [{'_id': _id, 'type': 'concept'} for _id in ids])
+        response = await self.client.get('/videos?limit=2')
+        self.assertEqual(len(await response.get_json()), 2)
+        self.assertEqual(response.headers['X-Next-After'], str(ids[1]))
+
+    async def test_admin_routes_require_the_token(self):
+        self.collection('projects', [])
+        response = await self.client.get('/api/projects/pending')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(await response.get_json(), {'error': 'Unauthorized'})
+        response = await self.client.get('/api/projects/pending', headers={'Authorization': 'Bearer secret'})
+        self.assertEqual((response.status_code, await response.get_json()), (200, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import time
+import unittest
+from unittest import mock
+from flask import Flask
+from app.utils import cache, serialization
+from app.utils.cache import LRUCache, cached_response, conditional_response, bump_version
+from app.utils.serialization import json_response
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_entries=2, ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+class CachedResponseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+        self.app = Flask(__name__)
+
+        @self.app.route('/items')
+        @cached_response('videos')
+        def items():
+            self.calls += 1
+            return json_response([{'n': n} for n in range(5)])
+
+        self.client = self.app.test_client()
+        for patcher in (
+            mock.patch.object(cache, '_response_cache', None),
+            mock.patch.object(cache, 'get_versions', return_value=[{'version': 1, 'updated_at': None}]),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_streamed_lists_are_cached(self):
+        with mock.patch.object(serialization, 'STREAM_THRESHOLD', 3):
+            first = self.client.get('/items')
+            self.assertTrue(first.is_streamed)
+            # Stored once the whole body has gone out
+            first_body = first.get_json()
+            second = self.client.get('/items')
+        self.assertEqual((first.headers['X-Cache'], second.headers['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(second.get_json(), first_body)
+        self.assertEqual(len(second.get_json()), 5)
+        self.assertEqual(self.calls, 1)
+
+class FakeVersions:
+    """The collection_versions collection: ``{_id, version, updated_at}`` per collection."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find(self, query):
+        return list(self.docs.values())
+
+    def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        doc = self.docs.setdefault(query['_id'], {'_id': query['_id'], 'version': 0})
+        doc['version'] += update['$inc']['version']
+        doc.update(update['$set'])
+        return dict(doc)
+
+class ConditionalResponseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+        self.app = Flask(__name__)
+        self.app.config['CACHE_VERSION_POLL_SEC'] = 0
+
+        @self.app.route('/items')
+        @conditional_response('videos')
+        def items():
+            self.calls += 1
+            return json_response([{'n': 1}])
+
+        self.client = self.app.test_client()
+        self.versions = FakeVersions()
+        for patcher in (
+            mock.patch.object(cache, 'get_versions_collection', return_value=self.versions),
+            mock.patch.dict(cache._versions, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        bump_version('videos')
+
+    def test_strong_etag_and_revalidation_headers(self):
+        res = self.client.get('/items')
+        self.assertEqual(res.status_code, 200)
+        etag, weak = res.get_etag()
+        self.assertTrue(etag)
+        self.assertFalse(weak)
+        self.assertFalse(res.headers['ETag'].startswith('W/'))
+        self.assertEqual(res.headers['Cache-Control'], 'no-cache')
+        self.assertIsNotNone(res.last_modified)
+
+    def test_if_none_match_returns_304_without_calling_the_service(self):
+        etag = self.client.get('/items').headers['ETag']
+        res = self.client.get('/items', headers={'If-None-Match': etag})
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.headers['ETag'], etag)
+        self.assertEqual(res.data, b'')
+        self.assertEqual(self.calls, 1)
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.client.get('/items').headers['Last-Modified']
+        res = self.client.get('/items', headers={'If-Modified-Since': last_modified})
+        self.assertEqual(res.status_code, 304)
+        res = self.client.get('/items', headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'})
+        self.assertEqual(res.status_code, 200)
+
+    def test_etag_changes_after_a_write(self):
+        etag = self.client.get('/items').headers['ETag']
+        bump_version('videos')
+        res = self.client.get('/items', headers={'If-None-Match': etag})
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res.headers['ETag'], etag)
+        self.assertEqual(self.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
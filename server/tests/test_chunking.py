@@ -0,0 +1,38 @@
+import unittest
+from app.utils.chunking import approximate_token_count, iter_transcript_chunks, set_token_counter
+
+def segments(n, words_per_segment=10):
+    for i in range(n):
+        yield {"text": " ".join(f"w{i}" for _ in range(words_per_segment)), "start": i * 5.0, "duration": 5.0}
+
+class ChunkingTestCase(unittest.TestCase):
+    def setUp(self):
+        # One token per word keeps the expected sizes easy to reason about.
+        set_token_counter(lambda text: len(text.split()))
+
+    def tearDown(self):
+        set_token_counter(None)
+
+    def test_chunks_respect_token_budget_and_timestamps(self):
+        chunks = list(iter_transcript_chunks(segments(10), max_tokens=30))
+        self.assertEqual([c["tokens"] for c in chunks], [30, 30, 30, 10])
+        self.assertEqual((chunks[0]["start"], chunks[0]["end"]), (0.0, 15.0))
+        self.assertEqual(chunks[1]["start"], 15.0)
+
+    def test_overlap_repeats_trailing_segments(self):
+        chunks = list(iter_transcript_chunks(segments(6), max_tokens=30, overlap_tokens=10))
+        self.assertTrue(chunks[1]["text"].startswith("w2"))
+        self.assertEqual(chunks[1]["start"], chunks[0]["end"] - 5.0)
+        self.assertTrue(chunks[-1]["text"].endswith("w5"))
+
+    def test_oversized_segment_is_split(self):
+        chunks = list(iter_transcript_chunks(segments(1, words_per_segment=25), max_tokens=10))
+        self.assertEqual([c["tokens"] for c in chunks], [10, 10, 5])
+
+    def test_approximate_token_count(self):
+        set_token_counter(None)
+        self.assertEqual(approximate_token_count("Hello, world!"), 4)
+        self.assertGreater(approximate_token_count("नमस्ते दुनिया"), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from app.utils.embeddings import hashing_vectorize, VectorIndex, encode_vector
+
+class FakeCursor(list):
+    def sort(self, keys):
+        return FakeCursor(sorted(self, key=lambda doc: tuple(doc[key] for key, _ in keys)))
+
+class FakeVideos:
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query, projection=None):
+        since = query.get('updated_at', {}).get('$gte')
+        return FakeCursor(doc for doc in self.docs if since is None or doc['updated_at'] >= since)
+
+class HashingVectorizeTestCase(unittest.TestCase):
+    def test_similar_texts_score_higher(self):
+        python = hashing_vectorize('python decorators wrap functions')
+        closures = hashing_vectorize('python closures and decorators')
+        docker = hashing_vectorize('docker containers and images')
+        self.assertAlmostEqual(float(np.linalg.norm(python)), 1.0, places=5)
+        self.assertGreater(python @ closures, python @ docker)
+
+class VectorIndexTestCase(unittest.TestCase):
+    def test_related_excludes_query_and_orders_by_score(self):
+        index = VectorIndex(collection=None, model='test')
+        index._refreshed_at = float('inf')  # no collection to refresh from
+        index._add([
+            ('a', np.array([1.0, 0.0], dtype=np.float32)),
+            ('b', np.array([0.6, 0.8], dtype=np.float32)),
+            ('c', np.array([0.0, 1.0], dtype=np.float32)),
+        ])
+        self.assertEqual([doc_id for doc_id, _ in index.related('a', 2)], ['b', 'c'])
+        self.assertIsNone(index.related('missing'))
+
+    def test_refresh_picks_up_late_writes_with_older_stamps(self):
+        videos = FakeVideos()
+        now = datetime(2024, 1, 1, 12)
+        vector = encode_vector(np.array([1.0, 0.0], dtype=np.float32))
+        videos.docs.append({'_id': 'a', 'embedding': vector, 'updated_at': now})
+        index = VectorIndex(videos, model='test', overlap=60)
+        index.refresh(force=True)
+        # Flushed by another worker after the refresh, stamped just before it
+        videos.docs.append({'_id': 'b', 'embedding': vector, 'updated_at': now - timedelta(seconds=5)})
+        videos.docs.append({'_id': 'old', 'embedding': vector, 'updated_at': now - timedelta(hours=1)})
+        index.refresh(force=True)
+        self.assertIn('b', index._positions)
+        self.assertNotIn('old', index._positions)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from bson.objectid import ObjectId
+from app import create_app
+from app.services.video_service import EXPORT_WATERMARK_LAG
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.closed = False
+
+    def sort(self, keys):
+        return FakeCursor(sorted(self.docs, key=lambda doc: tuple(doc[key] for key, _ in keys)))
+
+    def batch_size(self, size):
+        return self
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        return iter(self.docs)
+
+class FakeVideos:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        since = query.get('updated_at', {}).get('$gte', datetime.min)
+        hidden = set(projection or {})
+        return FakeCursor([{k: v for k, v in doc.items() if k not in hidden}
+                           for doc in self.docs if doc['updated_at'] >= since])
+
+class ExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.client = self.app.test_client()
+        now = datetime.utcnow()
+        # One old video, and one written just now, inside the watermark lag
+        self.videos = FakeVideos([
+            {'_id': ObjectId(), 'videoId': 'recent', 'updated_at': now - timedelta(seconds=5), 'embedding': [0.1]},
+            {'_id': ObjectId(), 'videoId': 'old', 'updated_at': now - timedelta(hours=1), 'embedding': [0.1]},
+        ])
+        for patcher in (
+            mock.patch('app.services.video_service.get_videos_collection', return_value=self.videos),
+            mock.patch.dict('os.environ', {'ADMIN_TOKEN': 'secret'}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def export(self, query=''):
+        return self.client.get(f'/videos/export{query}', headers={'Authorization': 'Bearer secret'})
+
+    def test_requires_the_admin_token(self):
+        self.assertEqual(self.client.get('/videos/export').status_code, 401)
+
+    def test_ndjson_in_updated_at_order(self):
+        res = self.export()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.mimetype, 'application/x-ndjson')
+        lines = res.get_data().splitlines()
+        self.assertTrue(res.get_data().endswith(b'\n'))
+        videos = [json.loads(line) for line in lines]
+        self.assertEqual([video['videoId'] for video in videos], ['old', 'recent'])
+        self.assertNotIn('embedding', videos[0])
+        self.assertIsInstance(videos[0]['_id'], str)
+
+    def test_updated_since(self):
+        for since in ('2024-01-01T00:00:00Z', 'Mon, 01 Jan 2024 00:00:00 GMT'):
+            self.export(f'?updated_since={since}')
+            self.assertEqual(self.videos.queries[-1], {'updated_at': {'$gte': datetime(2024, 1, 1)}})
+        res = self.export('?updated_since=yesterday')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('updated_since', res.get_json()['error'])
+        self.assertEqual(self.export('?batch_size=lots').status_code, 400)
+
+    def test_watermark_lags_so_recent_writes_are_sent_again(self):
+        before = datetime.utcnow()
+        watermark = self.export().headers['X-Export-Watermark']
+        after = datetime.utcnow()
+        lagged = datetime.fromisoformat(watermark.rstrip('Z'))
+        self.assertTrue(before - EXPORT_WATERMARK_LAG <= lagged <= after - EXPORT_WATERMARK_LAG)
+        # The next sync repeats what was written inside the lag window, and only that
+        res = self.export(f'?updated_since={watermark}')
+        self.assertEqual([json.loads(line)['videoId'] for line in res.get_data().splitlines()], ['recent'])
+
+if __name__ == '__main__':
+    unittest.main()
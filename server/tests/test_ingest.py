@@ -0,0 +1,250 @@
+import json
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+import httplib2
+from googleapiclient.errors import HttpError
+from app.commands import ingest_and_summarize as ingest
+from app.utils.rate_limiter import RetryableError
+
+class FakeJobQueue:
+    def claim(self, job_id=None):
+        return job_id
+
+class AdmitJobsTestCase(unittest.TestCase):
+    def admitted_batch_sizes(self, job_count, batch_size=None, max_in_flight=100):
+        budget = ingest._BatchBudget(batch_size, max_in_flight)
+        sizes = []
+
+        def finish(batch):
+            # Downstream stages hand slots back one job at a time
+            for _ in batch:
+                time.sleep(0.001)
+                budget.release(success=True)
+
+        threads = []
+        for batch in ingest.admit_jobs(FakeJobQueue(), budget, [f"v{i}" for i in range(job_count)], batch_wait=1):
+            sizes.append(len(batch))
+            thread = threading.Thread(target=finish, args=(batch,))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        return sizes
+
+    def test_freed_slots_refill_full_batches(self):
+        self.assertEqual(self.admitted_batch_sizes(215), [50, 50, 50, 50, 15])
+
+    def test_small_batch_size_is_admitted_without_waiting(self):
+        started = time.monotonic()
+        self.assertEqual(self.admitted_batch_sizes(10, batch_size=2), [2])
+        self.assertLess(time.monotonic() - started, 0.5)
+
+class FakePipelineJobQueue:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def load(self, job_ids):
+        return {job_id: self.docs[job_id] for job_id in job_ids if job_id in self.docs}
+
+    def defer(self, job_id, reason):
+        pass
+
+    def record_failure(self, job_id, error):
+        return False
+
+class PipelineBudgetTestCase(unittest.TestCase):
+    def test_failure_partway_through_a_stage_releases_each_slot_once(self):
+        budget = ingest._BatchBudget(None)
+        for _ in range(3):
+            budget.acquire()
+        docs = {job_id: {"_id": job_id, "state": ingest.PENDING, "playlistId": "P", "video": {"title": job_id}}
+                for job_id in ("a", "b")}
+        pipeline = ingest.build_ingest_pipeline(budget, mock.Mock(), FakePipelineJobQueue(docs))
+        # "c" is gone from the queue, so its slot is released before details are fetched
+        with mock.patch.object(ingest, 'get_youtube_client'), \
+                mock.patch.object(ingest, 'fetch_videos_details', side_effect=RuntimeError('boom')):
+            pipeline.run([["a", "b", "c"]])
+        self.assertEqual((budget.in_flight, budget.done), (0, 0))
+
+def youtube_error(status, reason=None):
+    body = {'error': {'code': status, 'errors': [{'reason': reason}] if reason else []}}
+    return HttpError(httplib2.Response({'status': status, 'retry-after': '0'}), json.dumps(body).encode())
+
+class FakeRequest:
+    def __init__(self, responses):
+        self.responses = responses
+        self.uri = '/youtube/v3/videos'
+
+    def execute(self):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+class FakeYouTube:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def videos(self):
+        return self
+
+    def list(self, **kwargs):
+        self.calls += 1
+        # The last response repeats
+        return FakeRequest(self.responses if len(self.responses) > 1 else self.responses * 2)
+
+class TransientErrorTestCase(unittest.TestCase):
+    def test_quota_and_outages_are_transient(self):
+        self.assertTrue(ingest.is_transient_error(RetryableError('HTTP 429')))
+        self.assertTrue(ingest.is_transient_error(youtube_error(403, 'quotaExceeded')))
+        self.assertTrue(ingest.is_transient_error(youtube_error(403, 'userRateLimitExceeded')))
+        self.assertFalse(ingest.is_transient_error(youtube_error(403, 'forbidden')))
+        self.assertFalse(ingest.is_transient_error(HttpError(httplib2.Response({'status': 403}), b'')))
+        self.assertFalse(ingest.is_transient_error(HttpError(httplib2.Response({'status': 404}), b'')))
+        self.assertFalse(ingest.is_transient_error(Exception('Could not fetch details')))
+
+    @mock.patch.object(ingest, 'charge_quota')
+    def test_quota_error_marks_remaining_ids_unavailable(self, _):
+        unavailable = set()
+        ids = [f'v{i}' for i in range(120)]
+        youtube = FakeYouTube(youtube_error(403, 'quotaExceeded'))
+        self.assertEqual(ingest.fetch_videos_details(youtube, ids, unavailable), {})
+        self.assertEqual(unavailable, set(ids))
+        # The quota is gone for the day, so the later batches are not tried
+        self.assertEqual(youtube.calls, 1)
+
+    @mock.patch.object(ingest, 'charge_quota')
+    def test_rate_limit_reasons_are_retried(self, _):
+        for reason in sorted(ingest.YOUTUBE_RATE_LIMIT_REASONS):
+            youtube = FakeYouTube(youtube_error(403, reason), {'items': [{'id': 'v1'}]})
+            with mock.patch.object(ingest, 'parse_video_item', return_value={'title': 'v1'}):
+                self.assertEqual(ingest.fetch_videos_details(youtube, ['v1']), {'v1': {'title': 'v1'}})
+
+    @mock.patch.object(ingest, 'charge_quota')
+    def test_other_403s_fail_only_their_batch(self, _):
+        unavailable = set()
+        youtube = FakeYouTube(youtube_error(403, 'forbidden'))
+        ingest.fetch_videos_details(youtube, [f'v{i}' for i in range(60)], unavailable)
+        self.assertEqual(youtube.calls, 2)
+
+class FakePlaylistRequest:
+    def __init__(self, pages, page_token, log):
+        self.pages = pages
+        self.page = int(page_token or 0)
+        self.headers = {}
+        self.uri = '/youtube/v3/playlistItems'
+        self.log = log
+
+    def execute(self):
+        self.log.append(self.page)
+        page = self.pages[self.page]
+        if self.page == 0 and self.headers.get('If-None-Match') == page['etag']:
+            raise HttpError(httplib2.Response({'status': 304}), b'')
+        return page
+
+class FakePlaylistYouTube:
+    """Newest-first playlist of ``count`` videos, 50 per page."""
+
+    def __init__(self, count):
+        self.log = []
+        self.pages = []
+        for start in range(0, count, 50):
+            items = [{
+                'contentDetails': {'videoId': f'v{n}', 'videoPublishedAt': f'2024-01-01T00:{n // 60:02d}:{n % 60:02d}Z'},
+                'snippet': {'title': f'Video {n}', 'publishedAt': '2024-01-01T00:00:00Z'},
+            } for n in range(count - 1 - start, max(count - 51 - start, -1), -1)]
+            page = {'items': items, 'etag': f'etag-{count}-{start}', 'pageInfo': {'totalResults': count}}
+            if start + 50 < count:
+                page['nextPageToken'] = str(len(self.pages) + 1)
+            self.pages.append(page)
+
+    def playlistItems(self):
+        return self
+
+    def list(self, pageToken=None, **kwargs):
+        return FakePlaylistRequest(self.pages, pageToken, self.log)
+
+@mock.patch.object(ingest, 'charge_quota')
+class PlaylistSyncTestCase(unittest.TestCase):
+    def first_sync(self, count):
+        youtube = FakePlaylistYouTube(count)
+        videos, known, sync = ingest.fetch_playlist_videos(youtube, 'P', None, lambda ids: set())
+        self.assertEqual((len(videos), len(youtube.log)), (count, len(youtube.pages)))
+        return {vid['videoId'] for vid in videos}, sync
+
+    def test_unchanged_playlist_costs_one_uncharged_request(self, charge_quota):
+        known_ids, sync = self.first_sync(120)
+        charge_quota.reset_mock()
+        youtube = FakePlaylistYouTube(120)
+        videos, known, new_sync = ingest.fetch_playlist_videos(youtube, 'P', sync, known_ids.intersection)
+        self.assertEqual((videos, new_sync, youtube.log), ([], None, [0]))
+        charge_quota.assert_not_called()
+
+    def test_stops_paging_at_known_items(self, _):
+        known_ids, sync = self.first_sync(120)
+        youtube = FakePlaylistYouTube(130)
+        videos, known, new_sync = ingest.fetch_playlist_videos(youtube, 'P', sync, known_ids.intersection)
+        self.assertEqual(youtube.log, [0])
+        self.assertEqual(len([vid for vid in videos if vid['videoId'] not in known]), 10)
+        self.assertEqual(new_sync['itemCount'], 130)
+        self.assertEqual(new_sync['lastPublishedAt'], '2024-01-01T00:02:09Z')
+        self.assertEqual(new_sync['fullSyncAt'], sync['fullSyncAt'])
+
+    def test_keeps_paging_until_the_item_count_is_accounted_for(self, _):
+        # 60 new items: the first page is all new, the second reaches known ones
+        known_ids, sync = self.first_sync(120)
+        youtube = FakePlaylistYouTube(180)
+        videos, known, _ = ingest.fetch_playlist_videos(youtube, 'P', sync, known_ids.intersection)
+        self.assertEqual(youtube.log, [0, 1])
+        self.assertEqual(len(videos) - len(known), 60)
+
+    def test_full_sync_when_due(self, _):
+        known_ids, sync = self.first_sync(120)
+        sync['fullSyncAt'] = datetime.utcnow() - timedelta(seconds=ingest.PLAYLIST_FULL_SYNC_SEC + 1)
+        youtube = FakePlaylistYouTube(130)
+        videos, _, new_sync = ingest.fetch_playlist_videos(youtube, 'P', sync, known_ids.intersection)
+        self.assertEqual((len(videos), youtube.log), (130, [0, 1, 2]))
+        self.assertGreater(new_sync['fullSyncAt'], sync['fullSyncAt'])
+
+    def test_reached_known_items_respects_the_watermark(self, _):
+        page = [{'videoId': 'a', 'publishedAt': '2024-05-01T00:00:00Z'}]
+        first_page = {'pageInfo': {'totalResults': 10}}
+        sync = {'itemCount': 10, 'lastPublishedAt': '2024-04-01T00:00:00Z'}
+        self.assertFalse(ingest._reached_known_items(page, {'a'}, sync, first_page, 0))
+        sync['lastPublishedAt'] = '2024-06-01T00:00:00Z'
+        self.assertTrue(ingest._reached_known_items(page, {'a'}, sync, first_page, 0))
+        self.assertFalse(ingest._reached_known_items(page, set(), sync, first_page, 0))
+
+class ClassifyTestCase(unittest.TestCase):
+    def test_parse_type_labels(self):
+        self.assertEqual(ingest.parse_type_labels('["concept", "Project"]', 2), ['concept', 'project'])
+        # Code fences and prose around the array are tolerated
+        self.assertEqual(ingest.parse_type_labels('Sure:\n```json\n["project"]\n```', 1), ['project'])
+        # Missing labels and invalid entries are None; extra labels are ignored
+        self.assertEqual(ingest.parse_type_labels('["concept", "tutorial", 3]', 4), ['concept', None, None, None])
+        self.assertEqual(ingest.parse_type_labels('["project", "concept", "concept"]', 2), ['project', 'concept'])
+        for malformed in (None, '', 'concept', '["concept"', '{"type": "concept"}', '[concept, project]'):
+            self.assertEqual(ingest.parse_type_labels(malformed, 2), [None, None])
+
+    @mock.patch.object(ingest, 'get_llm_cache', return_value=None)
+    def test_unlabelled_titles_fall_back_to_the_heuristic(self, _):
+        videos = [{'title': 'Closures explained'}, {'title': 'Build a todo project'}, {'title': 'Project setup'}]
+        with mock.patch.object(ingest, 'gemini_generate', return_value='["concept", "banana"]') as generate:
+            self.assertEqual(ingest.classify_video_types(videos), ['concept', 'project', 'project'])
+        self.assertEqual(generate.call_count, 1)
+        with mock.patch.object(ingest, 'gemini_generate', side_effect=RetryableError('HTTP 429')):
+            self.assertEqual(ingest.classify_video_types(videos), ['concept', 'project', 'project'])
+
+    @mock.patch.object(ingest, 'get_llm_cache', return_value=None)
+    def test_one_call_per_batch(self, _):
+        videos = [{'title': f'Video {i}'} for i in range(ingest.CLASSIFY_BATCH_SIZE + 1)]
+        with mock.patch.object(ingest, 'gemini_generate', return_value='[]') as generate:
+            ingest.classify_video_types(videos)
+        self.assertEqual(generate.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from app.utils.metrics import Registry
+
+class RegistryTestCase(unittest.TestCase):
+    def test_renders_counters_and_cumulative_histograms(self):
+        registry = Registry()
+        requests = registry.counter('requests_total', 'Requests.', ('route',))
+        latency = registry.histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1))
+        requests.inc(route='/videos')
+        requests.inc(route='/videos')
+        latency.observe(0.05, route='/videos')
+        latency.observe(0.5, route='/videos')
+        latency.observe(5, route='/videos')
+        text = registry.render()
+        self.assertIn('# TYPE requests_total counter', text)
+        self.assertIn('requests_total{route="/videos"} 2', text)
+        self.assertIn('latency_seconds_bucket{route="/videos",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/videos",le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{route="/videos",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{route="/videos"} 3', text)
+
+    def test_gauge_reads_value_at_render_time(self):
+        registry = Registry()
+        value = {'n': 1}
+        registry.gauge('entries', 'Entries.', lambda: value['n'])
+        value['n'] = 7
+        self.assertIn('entries 7', registry.render())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+from bson.objectid import ObjectId
+from app import create_app
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        return FakeCursor(sorted(self.docs, key=lambda doc: doc[key], reverse=direction < 0))
+
+    def limit(self, count):
+        return FakeCursor(self.docs[:count])
+
+    def __iter__(self):
+        return iter(self.docs)
+
+def _matches(doc, query):
+    for key, value in query.items():
+        if isinstance(value, dict):
+            if not doc[key] > value['$gt']:
+                return False
+        elif doc.get(key) != value:
+            return False
+    return True
+
+def _project(doc, projection):
+    if not projection:
+        return dict(doc)
+    if any(projection.values()):
+        return {k: v for k, v in doc.items() if k == '_id' or projection.get(k)}
+    return {k: v for k, v in doc.items() if k not in projection}
+
+class FakeVideos:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        return FakeCursor([_project(doc, projection) for doc in self.docs if _matches(doc, query)])
+
+class PaginationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['CACHE_ENABLED'] = False
+        self.client = self.app.test_client()
+        self.ids = sorted(ObjectId() for _ in range(5))
+        videos = FakeVideos([{'_id': _id, 'title': f'Video {n}', 'type': 'concept', 'embedding': [0.1, 0.2]}
+                             for n, _id in enumerate(self.ids)])
+        for patcher in (
+            mock.patch('app.services.video_service.get_videos_collection', return_value=videos),
+            mock.patch('app.utils.cache.get_versions', return_value=[{'version': 0, 'updated_at': None}]),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_after_cursor_walks_every_page(self):
+        seen, pages, url = [], 0, '/videos?limit=2'
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+            seen += [video['_id'] for video in res.get_json()]
+            pages += 1
+            after = res.headers.get('X-Next-After')
+            url = f'/videos?limit=2&after={after}' if after else None
+        self.assertEqual(seen, [str(_id) for _id in self.ids])
+        self.assertEqual(pages, 3)
+
+    def test_next_page_headers(self):
+        res = self.client.get('/videos?limit=2&fields=title')
+        self.assertEqual(res.headers['X-Next-After'], str(self.ids[1]))
+        link = res.headers['Link']
+        self.assertTrue(link.endswith('>; rel="next"'))
+        self.assertIn(f'after={self.ids[1]}', link)
+        self.assertIn('fields=title', link)
+        # The last page, exactly full or not, advertises nothing further
+        for url in (f'/videos?limit=2&after={self.ids[2]}', '/videos?limit=5'):
+            res = self.client.get(url)
+            self.assertNotIn('X-Next-After', res.headers)
+            self.assertNotIn('Link', res.headers)
+
+    def test_fields_never_include_embedding(self):
+        res = self.client.get('/videos?fields=title,embedding')
+        self.assertEqual(set(res.get_json()[0]), {'_id', 'title'})
+        res = self.client.get('/videos?fields=embedding')
+        self.assertEqual(set(res.get_json()[0]), {'_id'})
+        res = self.client.get('/videos')
+        self.assertNotIn('embedding', res.get_json()[0])
+
+    def test_malformed_args_are_rejected(self):
+        for url in ('/videos?after=not-an-id', '/videos?limit=0', '/videos?limit=ten', '/videos?fields=title,$where'):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 400, url)
+            self.assertIn('error', res.get_json())
+
+if __name__ == '__main__':
+    unittest.main()
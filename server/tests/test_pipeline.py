@@ -0,0 +1,32 @@
+import unittest
+import threading
+from app.utils.pipeline import Stage, Pipeline
+
+class PipelineTestCase(unittest.TestCase):
+    def test_items_flow_through_all_stages(self):
+        results = []
+        lock = threading.Lock()
+
+        def collect(item):
+            with lock:
+                results.append(item)
+
+        pipeline = Pipeline([
+            Stage("split", lambda n: range(n), workers=2),
+            Stage("square", lambda n: [n * n], workers=3, maxsize=2),
+            Stage("collect", collect),
+        ])
+        pipeline.run([3, 4])
+        self.assertEqual(sorted(results), [0, 0, 1, 1, 4, 4, 9])
+
+    def test_on_error_receives_failed_item(self):
+        failed = []
+
+        def explode(item):
+            raise ValueError(item)
+
+        Pipeline([Stage("explode", explode, on_error=lambda item, e: failed.append(item))]).run(["a"])
+        self.assertEqual(failed, ["a"])
+
+if __name__ == '__main__':
+    unittest.main()
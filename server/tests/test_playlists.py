@@ -0,0 +1,53 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+from bson.objectid import ObjectId
+from app import create_app
+
+class FakePlaylists:
+    def __init__(self, docs):
+        self.docs = docs
+        self.inserted = []
+
+    def find(self, query, projection=None):
+        hidden = {name for name, keep in (projection or {}).items() if not keep}
+        return [{k: v for k, v in doc.items() if k not in hidden}
+                for doc in self.docs if all(doc.get(k) == v for k, v in query.items())]
+
+    def insert_one(self, doc):
+        self.inserted.append(doc)
+
+class PlaylistServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['CACHE_ENABLED'] = False
+        self.client = self.app.test_client()
+        self.playlists = FakePlaylists([{
+            '_id': ObjectId(), 'name': 'Python', 'playlistId': 'PL1', 'active': True,
+            'sync': {'etag': 'abc', 'itemCount': 12}, 'ingest_lease_owner': 'host-1',
+            'ingest_lease_expires_at': datetime(2024, 1, 1), 'last_discovered_at': datetime(2024, 1, 1),
+        }])
+        for patcher in (
+            mock.patch('app.services.playlist_service.get_playlists_collection', return_value=self.playlists),
+            mock.patch('app.utils.cache.get_versions', return_value=[{'version': 0, 'updated_at': None}]),
+            mock.patch('app.services.playlist_service.bump_version'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_listing_hides_ingest_state(self):
+        res = self.client.get('/playlists')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(set(res.get_json()[0]), {'_id', 'name', 'playlistId', 'active'})
+
+    def test_add_playlist_requires_the_admin_token(self):
+        with mock.patch.dict('os.environ', {'ADMIN_TOKEN': 'secret'}):
+            res = self.client.post('/playlists', json={'name': 'Rust'})
+            self.assertEqual(res.status_code, 401)
+            self.assertEqual(self.playlists.inserted, [])
+            res = self.client.post('/playlists', json={'name': 'Rust'}, headers={'Authorization': 'Bearer secret'})
+            self.assertEqual(res.status_code, 201)
+            self.assertEqual([doc['name'] for doc in self.playlists.inserted], ['Rust'])
+
+if __name__ == '__main__':
+    unittest.main()
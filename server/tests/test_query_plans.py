@@ -0,0 +1,132 @@
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+from bson.objectid import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from app.utils.indexes import INDEXES, sync_indexes, _normalise
+from app.services.search_service import search_videos, search_projects
+
+# Every query shape issued by app/services (and the ingest reads of the same
+# collections): (collection, filter, sort). The harness fails if MongoDB
+# would answer any of them with a collection scan.
+QUERY_SHAPES = [
+    ('videos', {'type': 'concept'}, [('_id', 1)]),
+    ('videos', {'type': 'project', '_id': {'$gt': ObjectId()}}, [('_id', 1)]),
+    ('videos', {'playlistId': 'PL1'}, [('_id', 1)]),
+    ('videos', {'_id': ObjectId()}, None),
+    ('videos', {'_id': {'$in': [ObjectId()]}}, None),
+    ('videos', {'videoId': {'$in': ['v1', 'v2']}}, None),
+    ('videos', {'updated_at': {'$gte': datetime(2024, 1, 1)}}, [('updated_at', 1), ('_id', 1)]),
+    ('videos', {'embedding_model': 'hashing:512'}, [('updated_at', 1), ('_id', 1)]),
+    ('videos', {'$text': {'$search': 'python'}, 'type': 'concept'}, None),
+    ('playlists', {'active': True}, None),
+    ('playlists', {'playlistId': 'PL1'}, None),
+    ('playlists', {'name': 'Python'}, None),
+    ('projects', {'status': 'pending'}, None),
+    ('projects', {'status': 'approved'}, None),
+    ('projects', {'_id': ObjectId()}, None),
+    ('projects', {'github_url': 'https://github.com/a/b'}, None),
+    ('projects', {'title': 'Demo'}, None),
+    ('projects', {'$text': {'$search': 'react'}, 'status': 'approved'}, None),
+]
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+class RecordingCollection:
+    """Passes aggregations through to a real collection, keeping their pipelines."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return self.collection.aggregate(pipeline)
+
+
+class IndexRegistryTestCase(unittest.TestCase):
+    def test_index_information_matches_registry_entry(self):
+        model = INDEXES['playlists'][1].document
+        existing = {
+            'key': [('playlistId', 1)],
+            'v': 2,
+            'unique': True,
+            'partialFilterExpression': {'playlistId': {'$type': 'string', '$gt': ''}},
+        }
+        self.assertEqual(_normalise(existing), _normalise(model))
+        self.assertNotEqual(_normalise({'key': [('playlistId', 1)], 'v': 2}), _normalise(model))
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    """Runs against TEST_MONGO_URI (default: a local mongod); skipped when none is reachable."""
+
+    @classmethod
+    def setUpClass(cls):
+        uri = os.getenv('TEST_MONGO_URI', 'mongodb://localhost:27017')
+        cls.client = MongoClient(uri, serverSelectionTimeoutMS=500)
+        try:
+            cls.client.admin.command('ping')
+        except PyMongoError as e:
+            cls.client.close()
+            raise unittest.SkipTest(f'No MongoDB at {uri}: {e}')
+        cls.db = cls.client['genai_query_plan_test']
+        cls.client.drop_database(cls.db.name)
+        # A few documents so the planner has something to choose between
+        cls.db['videos'].insert_many([
+            {'videoId': f'v{i}', 'type': 'concept', 'playlistId': 'PL1', 'title': 'python',
+             'updated_at': datetime(2024, 1, 1)} for i in range(20)
+        ])
+        cls.db['playlists'].insert_one({'playlistId': 'PL1', 'name': 'Python', 'active': True})
+        cls.db['projects'].insert_one({'title': 'Demo', 'github_url': 'https://github.com/a/b',
+                                       'description': 'react', 'tech_stack': ['react'], 'status': 'approved'})
+        report = sync_indexes(cls.db)
+        assert not report['failed'], report
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.drop_database(cls.db.name)
+        cls.client.close()
+
+    def test_sync_is_idempotent(self):
+        report = sync_indexes(self.db)
+        self.assertFalse(any(report.values()), report)
+
+    def test_no_query_shape_scans_a_collection(self):
+        for collection, query, sort in QUERY_SHAPES:
+            with self.subTest(collection=collection, query=query):
+                cursor = self.db[collection].find(query)
+                if sort:
+                    cursor = cursor.sort(sort)
+                plan = cursor.explain()['queryPlanner']['winningPlan']
+                self.assertNotIn('COLLSCAN', list(_stages(plan)))
+    def test_search_aggregations_use_the_text_indexes(self):
+        videos = RecordingCollection(self.db['videos'])
+        projects = RecordingCollection(self.db['projects'])
+        with mock.patch('app.services.search_service.get_videos_collection', return_value=videos), \
+                mock.patch('app.services.search_service.get_projects_collection', return_value=projects):
+            video_hits = search_videos('python', {'type': 'concept'}, 0, 5)
+            project_hits = search_projects('react', {}, 0, 5)
+        self.assertEqual((video_hits['total'], len(video_hits['results'])), (20, 5))
+        self.assertEqual(video_hits['facets']['type'], [{'value': 'concept', 'count': 20}])
+        self.assertEqual(project_hits['total'], 1)
+        self.assertEqual(project_hits['facets']['tech_stack'], [{'value': 'react', 'count': 1}])
+        for recorder in (videos, projects):
+            name = recorder.collection.name
+            with self.subTest(collection=name):
+                explain = self.db.command('aggregate', name, pipeline=recorder.pipelines[0], explain=True)
+                self.assertNotIn('COLLSCAN', list(_stages(explain)))
+
+if __name__ == '__main__':
+    unittest.main()
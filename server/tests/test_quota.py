@@ -0,0 +1,51 @@
+import unittest
+from datetime import datetime
+from app.utils.quota import estimate_video_cost, plan_jobs
+
+def candidate(job_id, playlist_id, tokens, day=1, in_progress=False):
+    return {
+        "id": job_id,
+        "playlistId": playlist_id,
+        "publishedAt": datetime(2024, 1, day),
+        "created_at": datetime(2024, 2, 1, 0, 0, day),
+        "in_progress": in_progress,
+        "cost": {"youtube": {"units": 0.02}, "gemini": {"tokens": tokens, "requests": 1}},
+    }
+
+class EstimateVideoCostTestCase(unittest.TestCase):
+    def test_long_videos_cost_more_calls_and_tokens(self):
+        short = estimate_video_cost(duration_sec=300, chunk_size=3000)
+        long = estimate_video_cost(duration_sec=3600, chunk_size=3000)
+        self.assertEqual(short["gemini"]["requests"], 1 + 1 / 25)
+        self.assertGreater(long["gemini"]["requests"], 5)
+        self.assertGreater(long["gemini"]["tokens"], 5 * short["gemini"]["tokens"])
+
+    def test_transcript_length_wins_over_duration(self):
+        cost = estimate_video_cost(duration_sec=3600, transcript_tokens=100, needs_details=False, needs_type=False)
+        self.assertEqual(cost["gemini"]["requests"], 1)
+        self.assertEqual(cost["youtube"]["units"], 0)
+
+class PlanJobsTestCase(unittest.TestCase):
+    def test_packs_cheaper_jobs_behind_one_that_does_not_fit(self):
+        jobs = [candidate("a", "p", 500, day=3), candidate("b", "p", 2000, day=2), candidate("c", "p", 400, day=1)]
+        planned, deferred = plan_jobs(jobs, {"gemini": {"tokens": 1000}}, "newest")
+        self.assertEqual(planned, ["a", "c"])
+        self.assertEqual(deferred, 1)
+
+    def test_underpopulated_playlists_are_not_starved(self):
+        jobs = [candidate(f"big{i}", "big", 10, day=i + 1) for i in range(5)] + [candidate("small0", "small", 10)]
+        planned, _ = plan_jobs(jobs, {"gemini": {"tokens": 30}}, "underpopulated", {"big": 3, "small": 0})
+        self.assertEqual(planned[0], "small0")
+        self.assertEqual(len(planned), 3)
+
+    def test_jobs_in_progress_go_first(self):
+        jobs = [candidate("new", "p", 10, day=9), candidate("resumed", "p", 10, in_progress=True)]
+        planned, _ = plan_jobs(jobs, {}, "newest")
+        self.assertEqual(planned, ["resumed", "new"])
+
+    def test_rejects_unknown_priority(self):
+        with self.assertRaises(ValueError):
+            plan_jobs([], {}, "loudest")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from app.utils.metrics import api_calls
+from app.utils.rate_limiter import RateLimiter, RetryableError, NotModified, TokenBucket, parse_retry_after
+
+class RateLimiterTestCase(unittest.TestCase):
+    def test_retries_retryable_errors_then_succeeds(self):
+        limiter = RateLimiter("test", requests_per_minute=6000, max_retries=3, base_delay=0.001)
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RetryableError("HTTP 429", retry_after=0)
+            return "ok"
+
+        self.assertEqual(limiter.call(flaky), "ok")
+        self.assertEqual(len(attempts), 3)
+
+    def test_gives_up_after_max_retries(self):
+        limiter = RateLimiter("test", requests_per_minute=6000, max_retries=1, base_delay=0.001)
+
+        def always_limited():
+            raise RetryableError("HTTP 429", retry_after=0)
+
+        with self.assertRaises(RetryableError):
+            limiter.call(always_limited)
+
+    def test_not_modified_is_its_own_outcome(self):
+        limiter = RateLimiter("conditional", requests_per_minute=6000)
+
+        def unchanged():
+            raise NotModified("304")
+
+        with self.assertRaises(NotModified):
+            limiter.call(unchanged)
+        calls = api_calls.snapshot()
+        self.assertEqual(calls.get(("conditional", "not_modified")), 1)
+        self.assertNotIn(("conditional", "error"), calls)
+
+    def test_bucket_never_exceeds_capacity(self):
+        bucket = TokenBucket(rate_per_minute=60, capacity=5)
+        bucket.acquire(5)
+        self.assertLess(bucket.tokens, 1)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
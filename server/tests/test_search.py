@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+from app import create_app
+
+class FakeCollection:
+    """Records aggregation pipelines and answers with one canned ``$facet`` document."""
+
+    def __init__(self, facet_doc):
+        self.facet_doc = facet_doc
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return iter([dict(self.facet_doc)])
+
+class SearchServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['CACHE_ENABLED'] = False
+        self.client = self.app.test_client()
+        self.videos = FakeCollection({
+            'results': [{'_id': 'v1', 'title': 'Python basics', 'score': 1.5}],
+            'total': [{'count': 7}],
+            'type': [{'_id': 'concept', 'count': 5}, {'_id': 'project', 'count': 2}],
+            'playlistId': [{'_id': 'PL1', 'count': 7}],
+        })
+        self.projects = FakeCollection({'results': [], 'total': [], 'tech_stack': []})
+        for patcher in (
+            mock.patch('app.services.search_service.get_videos_collection', return_value=self.videos),
+            mock.patch('app.services.search_service.get_projects_collection', return_value=self.projects),
+            mock.patch('app.utils.cache.get_versions', return_value=[{'version': 0, 'updated_at': None}] * 2),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_text_query_and_filters(self):
+        res = self.client.get('/search?q=python+basics&type=concept&page=2&limit=5')
+        self.assertEqual(res.status_code, 200)
+        match, add_score, facet = self.videos.pipelines[0]
+        self.assertEqual(match, {'$match': {'$text': {'$search': 'python basics'}}})
+        self.assertEqual(add_score, {'$addFields': {'score': {'$meta': 'textScore'}}})
+        results = facet['$facet']['results']
+        self.assertEqual(results[0], {'$match': {'type': 'concept'}})
+        self.assertEqual(results[1:4], [{'$sort': {'score': -1, '_id': 1}}, {'$skip': 5}, {'$limit': 5}])
+        # Facet counts cover every text match, not just the filtered ones
+        self.assertEqual(facet['$facet']['type'][0], {'$sortByCount': '$type'})
+        # Projects only match approved submissions
+        self.assertEqual(self.projects.pipelines[0][0]['$match'],
+                         {'$text': {'$search': 'python basics'}, 'status': 'approved'})
+
+    def test_facet_counts_shape(self):
+        body = self.client.get('/search?q=python&scope=videos').get_json()
+        self.assertEqual((body['query'], body['page'], body['limit']), ('python', 1, 20))
+        self.assertNotIn('projects', body)
+        self.assertEqual(body['videos'], {
+            'total': 7,
+            'results': [{'_id': 'v1', 'title': 'Python basics', 'score': 1.5}],
+            'facets': {
+                'type': [{'value': 'concept', 'count': 5}, {'value': 'project', 'count': 2}],
+                'playlistId': [{'value': 'PL1', 'count': 7}],
+            },
+        })
+        body = self.client.get('/search?q=python&scope=projects').get_json()
+        self.assertEqual(body['projects'], {'total': 0, 'results': [], 'facets': {'tech_stack': []}})
+
+    def test_bad_requests(self):
+        for url in ('/search', '/search?q=', '/search?q=+++', '/search?q=a&scope=posts',
+                    '/search?q=a&page=0', '/search?q=a&limit=1000', '/search?q=a&page=two'):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, 400, url)
+            self.assertIn('error', res.get_json())
+        self.assertEqual(self.videos.pipelines, [])
+
+if __name__ == '__main__':
+    unittest.main()